@@ -12,6 +12,8 @@ from .ui.QCameraSource import QCameraSource
 from .ui.QFaceAligner import QFaceAligner
 from .ui.QFaceDetector import QFaceDetector
 from .ui.QFaceMarker import QFaceMarker
+from .ui.QFaceMerger import QFaceMerger
+from .ui.QFileSource import QFileSource
 from .ui.QStreamOutput import QStreamOutput
 from .ui.QFaceModifier import QFaceModifier
 from .ui.widgets.QBCFaceAlignViewer import QBCFaceAlignViewer
@@ -36,28 +38,34 @@ class QLiveSwap(qtx.QXWidget):
         face_marker_bc_out    = backend.BackendConnection()
         face_aligner_bc_out   = backend.BackendConnection()
         face_modifier_bc_out = backend.BackendConnection()
+        face_merger_bc_out    = backend.BackendConnection()
+        stream_output_bc_out  = backend.BackendConnection()
 
+        file_source    = self.file_source    = backend.FileSource   (weak_heap=backed_weak_heap, reemit_frame_signal=reemit_frame_signal, bc_out=multi_sources_bc_out, backend_db=backend_db)
         camera_source  = self.camera_source  = backend.CameraSource (weak_heap=backed_weak_heap, bc_out=multi_sources_bc_out, backend_db=backend_db)
         face_detector  = self.face_detector  = backend.FaceDetector (weak_heap=backed_weak_heap, reemit_frame_signal=reemit_frame_signal, bc_in=multi_sources_bc_out, bc_out=face_detector_bc_out, backend_db=backend_db )
         face_marker    = self.face_marker    = backend.FaceMarker   (weak_heap=backed_weak_heap, reemit_frame_signal=reemit_frame_signal, bc_in=face_detector_bc_out, bc_out=face_marker_bc_out, backend_db=backend_db)
         face_aligner   = self.face_aligner   = backend.FaceAligner  (weak_heap=backed_weak_heap, reemit_frame_signal=reemit_frame_signal, bc_in=face_marker_bc_out, bc_out=face_aligner_bc_out, backend_db=backend_db )
         face_modifier  = self.face_modifier  = backend.FaceModifier  (weak_heap=backed_weak_heap, reemit_frame_signal=reemit_frame_signal, bc_in=face_aligner_bc_out, bc_out=face_modifier_bc_out, backend_db=backend_db )
-        stream_output  = self.stream_output  = backend.StreamOutput (weak_heap=backed_weak_heap, reemit_frame_signal=reemit_frame_signal, bc_in=face_modifier_bc_out, save_default_path=userdata_path, backend_db=backend_db)
+        face_merger    = self.face_merger    = backend.FaceMerger   (weak_heap=backed_weak_heap, reemit_frame_signal=reemit_frame_signal, bc_in=face_modifier_bc_out, bc_out=face_merger_bc_out, backend_db=backend_db )
+        stream_output  = self.stream_output  = backend.StreamOutput (weak_heap=backed_weak_heap, reemit_frame_signal=reemit_frame_signal, bc_in=face_merger_bc_out, bc_out=stream_output_bc_out, save_default_path=userdata_path, backend_db=backend_db)
 
-        self.all_backends : List[backend.BackendHost] = [camera_source, face_detector, face_marker, face_aligner, face_modifier, stream_output]
+        self.all_backends : List[backend.BackendHost] = [file_source, camera_source, face_detector, face_marker, face_aligner, face_modifier, face_merger, stream_output]
 
+        self.q_file_source    = QFileSource(self.file_source)
         self.q_camera_source  = QCameraSource(self.camera_source)
         self.q_face_detector  = QFaceDetector(self.face_detector)
         self.q_face_marker    = QFaceMarker(self.face_marker)
         self.q_face_aligner   = QFaceAligner(self.face_aligner)
         self.q_face_modifier   = QFaceModifier(self.face_modifier)
-        self.q_stream_output  = QStreamOutput(self.stream_output)
+        self.q_face_merger    = QFaceMerger(self.face_merger)
+        self.q_stream_output  = QStreamOutput(self.stream_output, backed_weak_heap, stream_output_bc_out)
 
         self.q_ds_frame_viewer = QBCFrameViewer(backed_weak_heap, multi_sources_bc_out)
         self.q_ds_fa_viewer    = QBCFaceAlignViewer(backed_weak_heap, face_aligner_bc_out, preview_width=256)
 
-        q_nodes = qtx.QXWidgetHBox([    qtx.QXWidgetVBox([self.q_camera_source], spacing=5, fixed_width=256),
-                                        qtx.QXWidgetVBox([self.q_face_detector,  self.q_face_aligner,], spacing=5, fixed_width=256),
+        q_nodes = qtx.QXWidgetHBox([    qtx.QXWidgetVBox([self.q_file_source, self.q_camera_source], spacing=5, fixed_width=256),
+                                        qtx.QXWidgetVBox([self.q_face_detector,  self.q_face_aligner, self.q_face_merger], spacing=5, fixed_width=256),
                                         qtx.QXWidgetVBox([self.q_face_marker, self.q_face_modifier, self.q_stream_output], spacing=5, fixed_width=256),
                                     ], spacing=5, size_policy=('fixed', 'fixed') )
 
@@ -100,6 +108,7 @@ class QLiveSwap(qtx.QXWidget):
 
         self.q_ds_frame_viewer.clear()
         self.q_ds_fa_viewer.clear()
+        self.q_stream_output.finalize()
 
 class QDFLAppWindow(qtx.QXWindow):
 
@@ -1,8 +1,10 @@
 import multiprocessing
 import pickle
+from enum import IntEnum, IntFlag
 from typing import List, Union, Tuple
 
 import numpy as np
+from xlib import math as lib_math
 from xlib import mp as lib_mp
 from xlib import time as lib_time
 from xlib.mp import csw as lib_csw
@@ -21,6 +23,7 @@ class BackendFaceSwapInfo:
         self.face_align_image_name : str = None
         self.face_align_mask_name : str = None
         self.face_align_lmrks_mask_name : str = None
+        self.face_align_normalized_name : str = None
         self.face_swap_image_name : str = None
         self.face_swap_mask_name : str = None
 
@@ -34,6 +37,25 @@ class BackendFaceSwapInfo:
         self.__init__()
         self.__dict__.update(d)
 
+class TemporalFilterType(IntEnum):
+    AVERAGE = 0
+    ONE_EURO = 1
+    KALMAN = 2
+
+TemporalFilterTypeNames = ['@TemporalFilter.AVERAGE', '@TemporalFilter.ONE_EURO', '@TemporalFilter.KALMAN']
+
+def create_temporal_filter(filter_type : TemporalFilterType, temporal_smoothing : int) -> Union[lib_math.OneEuroFilter, lib_math.KalmanFilter, None]:
+    """
+    create temporal filter for uniform coordinates with strength of temporal_smoothing [1..10]
+
+    returns None for TemporalFilterType.AVERAGE
+    """
+    if filter_type == TemporalFilterType.ONE_EURO:
+        return lib_math.OneEuroFilter(min_cutoff=5.0 / temporal_smoothing, beta=10.0)
+    elif filter_type == TemporalFilterType.KALMAN:
+        return lib_math.KalmanFilter(process_noise=1.0, measurement_noise=(0.001*temporal_smoothing)**2)
+    return None
+
 class BackendConnectionData:
     """
     data class for BackendConnection
@@ -137,9 +159,21 @@ class BackendConnectionData:
 
 
 
+class BackendProduct(IntFlag):
+    """
+    Optional products of a backend,
+    computed only if demanded by the consumer side of its BackendConnection.
+    """
+    NONE = 0
+    FACE_ALIGN_LMRKS_MASK = 1 << 0
+    FACE_ALIGN_NORMALIZED = 1 << 1
+
+
 class BackendConnection:
     def __init__(self, multi_producer=False):
         self._rd = lib_mp.MPSPSCMRRingData(table_size=8192, heap_size_mb=8, multi_producer=multi_producer)
+        self._demands = lib_mp.MPAtomicInt32()
+        self._preferred_resolution = lib_mp.MPAtomicInt32()
 
     def write(self, bcd : BackendConnectionData):
         self._rd.write( pickle.dumps(bcd) )
@@ -171,6 +205,36 @@ class BackendConnection:
         """
         return self._rd.get_read_id() >= (self._rd.get_write_id() - buffer_size)
 
+    def get_demands(self) -> BackendProduct:
+        return BackendProduct(self._demands.get())
+
+    def set_demands(self, demands : BackendProduct):
+        """
+        declare from the receiver side the products it needs,
+        intermediate backends pass the demands of their receivers along with own ones
+        """
+        if self._demands.get() != demands:
+            self._demands.set(int(demands))
+
+    def is_demanded(self, product : BackendProduct) -> bool:
+        return (self._demands.get() & product) != 0
+
+    def set_preferred_resolution(self, resolution : int):
+        """
+        advertise from the receiver side the resolution of images it works with,
+        so the sender side can produce them directly without extra resize.
+
+            resolution  0 - no preference
+        """
+        if self._preferred_resolution.get() != resolution:
+            self._preferred_resolution.set(int(resolution))
+
+    def get_preferred_resolution(self) -> int:
+        """
+        returns preferred resolution of the receiver side or 0
+        """
+        return self._preferred_resolution.get()
+
 
 class BackendSignal:
     def __init__(self):
@@ -230,3 +294,10 @@ class BackendWorker(lib_csw.Worker):
     def stop_profile_timing(self):
         self.send_msg('_profile_timing', self._profile_timing_measurer.stop() )
 
+    def send_profile_timing(self, timing : float):
+        """
+        send timing measured by the worker itself,
+        for workers which process frames outside of on_tick
+        """
+        self.send_msg('_profile_timing', timing)
+
@@ -1,11 +1,11 @@
 import platform
 import time
-from datetime import datetime
 from enum import IntEnum
 from typing import List
 
 import cv2
 import numpy as np
+from xlib import cv as lib_cv
 from xlib import os as lib_os
 from xlib.image import ImageProcessor
 from xlib.mp import csw as lib_csw
@@ -46,8 +46,9 @@ class CameraSourceWorker(BackendWorker):
         self.weak_heap = weak_heap
         self.bc_out = bc_out
         self.bcd_uid = 0
-        self.pending_bcd = None
         self.vcap = None
+        # Grabs the frames of vcap in background
+        self.vcap_thread = None
         self.last_timestamp = 0
         lib_os.set_timer_resolution(4)
 
@@ -55,6 +56,7 @@ class CameraSourceWorker(BackendWorker):
 
         cs.resolution.call_on_selected(self.on_cs_resolution_selected)
         cs.fps.call_on_number(self.on_cs_fps)
+        cs.buffer_size.call_on_number(self.on_cs_buffer_size)
         cs.open_settings.call_on_signal(self.on_cs_open_settings)
         cs.load_settings.call_on_signal(self.on_cs_load_settings)
         cs.save_settings.call_on_signal(self.on_cs_save_settings)
@@ -65,17 +67,31 @@ class CameraSourceWorker(BackendWorker):
 
         vcap = cv2.VideoCapture(0)
         if vcap.isOpened():
-            self.vcap = vcap
             w, h = _ResolutionType_wh[state.resolution]
 
             vcap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
             vcap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
 
-        if vcap.isOpened():
+            # Must be set before the capture is started. Not every backend supports it, then it is ignored.
+            buffer_size = state.buffer_size if state.buffer_size is not None else 1
+            if buffer_size != 0:
+                vcap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+            self.set_vcap(vcap)
+
+        if self.vcap is not None:
             cs.fps.enable()
             cs.fps.set_config(lib_csw.Number.Config(min=0, max=240, step=1.0, decimals=2, zero_is_auto=True, allow_instant_update=False))
             cs.fps.set_number(state.fps if state.fps is not None else 0)
 
+            cs.buffer_size.enable()
+            cs.buffer_size.set_config(lib_csw.Number.Config(min=0, max=16, step=1, decimals=0, zero_is_auto=True, allow_instant_update=False))
+            cs.buffer_size.set_number(state.buffer_size if state.buffer_size is not None else 1)
+
+            cs.dropped_frames.enable()
+            cs.dropped_frames.set_config(lib_csw.Number.Config(min=0, max=999999, decimals=0, read_only=True))
+            cs.dropped_frames.set_number(0)
+
             cs.load_settings.enable()
             cs.save_settings.enable()
 
@@ -95,51 +111,66 @@ class CameraSourceWorker(BackendWorker):
         cs.fps.set_number(fps)
         self.save_state()
 
+    def on_cs_buffer_size(self, buffer_size):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.buffer_size.get_config()
+        buffer_size = int(np.clip(buffer_size, cfg.min, cfg.max))
+        cs.buffer_size.set_number(buffer_size)
+        if state.buffer_size != buffer_size:
+            state.buffer_size = buffer_size
+            self.save_state()
+            if self.is_started():
+                # Buffer size is applied to the new capture
+                self.restart()
+
 
     def on_cs_open_settings(self):
         cs, state = self.get_control_sheet(), self.get_state()
-        if self.vcap is not None and self.vcap.isOpened():
-            self.vcap.set(cv2.CAP_PROP_SETTINGS, 0)
+        if self.vcap_thread is not None and self.vcap_thread.is_opened():
+            self.vcap_thread.set(cv2.CAP_PROP_SETTINGS, 0)
 
     def on_cs_load_settings(self):
         cs, state = self.get_control_sheet(), self.get_state()
 
-        vcap = self.vcap
-        if vcap is not None:
+        vcap_thread = self.vcap_thread
+        if vcap_thread is not None:
             settings = state.settings_by_idx.get(state.device_idx, None)
             if settings is not None:
                 for setting_name, value in settings.items():
                     setting_id = getattr(cv2, setting_name, None)
                     if setting_id is not None:
-                        vcap.set(setting_id, value)
+                        vcap_thread.set(setting_id, value)
 
     def on_cs_save_settings(self):
         cs, state = self.get_control_sheet(), self.get_state()
 
-        vcap = self.vcap
-        if vcap is not None:
+        vcap_thread = self.vcap_thread
+        if vcap_thread is not None:
             settings = {}
             for setting_name in self._get_vcap_setting_name_list():
                 setting_id = getattr(cv2, setting_name, None)
                 if setting_id is not None:
-                    settings[setting_name] = vcap.get(setting_id)
+                    settings[setting_name] = vcap_thread.get(setting_id)
             state.settings_by_idx[state.device_idx] = settings
             self.save_state()
 
     def on_tick(self):
-        if self.vcap is not None and not self.vcap.isOpened():
+        if self.vcap_thread is not None and not self.vcap_thread.is_opened():
             self.set_vcap(None)
 
-        if self.vcap is not None:
+        if self.vcap is not None and self.bc_out.is_full_read(1):
+            # Downstream has capacity, take the newest frame.
+            # Older frames are replaced in the capture thread, so they never wait in a queue.
             state, cs = self.get_state(), self.get_control_sheet()
-            self.start_profile_timing()
 
-            ret, img = self.vcap.read()
-            if ret:
-                timestamp = datetime.now().timestamp()
+            frame = self.vcap_thread.get_frame(timeout=0.005)
+            cs.dropped_frames.set_number(self.vcap_thread.get_dropped_count())
+            if frame is not None:
+                img, timestamp = frame
                 fps = state.fps
                 if fps == 0 or ((timestamp - self.last_timestamp) > 1.0 / fps):
                     self.last_timestamp = timestamp
+                    self.start_profile_timing()
 
                     ip = ImageProcessor(img)
                     #if state.target_width != 0:
@@ -159,27 +190,24 @@ class CameraSourceWorker(BackendWorker):
                     bcd.set_frame_timestamp(timestamp)
                     bcd.set_image(frame_name, img)
                     self.stop_profile_timing()
-                    self.pending_bcd = bcd
-
-        if self.pending_bcd is not None:
-            if self.bc_out.is_full_read(1):
-                self.bc_out.write(self.pending_bcd)
-                self.pending_bcd = None
-
-        time.sleep(0.001)
+                    self.bc_out.write(bcd)
+        else:
+            time.sleep(0.001)
 
     def set_vcap(self, vcap):
+        if self.vcap_thread is not None:
+            self.vcap_thread.close()
+            self.vcap_thread = None
         if self.vcap is not None:
             if self.vcap.isOpened():
                 self.vcap.release()
             self.vcap = None
         self.vcap = vcap
+        if vcap is not None:
+            self.vcap_thread = lib_cv.VideoCaptureThread(vcap)
 
     def on_stop(self):
-        if self.vcap is not None:
-            if self.vcap.isOpened():
-                self.vcap.release()
-            self.vcap = None
+        self.set_vcap(None)
 
     def _get_vcap_setting_name_list(self) -> List[str]:
         return ['CAP_PROP_BRIGHTNESS',
@@ -202,6 +230,7 @@ class WorkerState(BackendWorkerState):
         self.device_idx : int = None
         self.resolution : _ResolutionType = None
         self.fps : float = None
+        self.buffer_size : int = None
         self.settings_by_idx = {}
 
 class Sheet:
@@ -210,6 +239,8 @@ class Sheet:
             super().__init__()
             self.resolution = lib_csw.DynamicSingleSwitch.Client()
             self.fps = lib_csw.Number.Client()
+            self.buffer_size = lib_csw.Number.Client()
+            self.dropped_frames = lib_csw.Number.Client()
             self.open_settings = lib_csw.Signal.Client()
             self.save_settings = lib_csw.Signal.Client()
             self.load_settings = lib_csw.Signal.Client()
@@ -219,6 +250,8 @@ class Sheet:
             super().__init__()
             self.resolution = lib_csw.DynamicSingleSwitch.Host()
             self.fps = lib_csw.Number.Host()
+            self.buffer_size = lib_csw.Number.Host()
+            self.dropped_frames = lib_csw.Number.Host()
             self.open_settings = lib_csw.Signal.Host()
             self.save_settings = lib_csw.Signal.Host()
             self.load_settings = lib_csw.Signal.Host()
@@ -1,13 +1,16 @@
 import time
 
 import numpy as np
+from xlib import cv as lib_cv
 from xlib import os as lib_os
+from xlib.face import ELandmarks2D, FLandmarks2D
+from xlib.math import Affine2DUniMat
 from xlib.mp import csw as lib_csw
 from xlib.python import all_is_not_None
 
 from .BackendBase import (BackendConnection, BackendDB, BackendHost,
-                          BackendSignal, BackendWeakHeap, BackendWorker,
-                          BackendWorkerState)
+                          BackendProduct, BackendSignal, BackendWeakHeap,
+                          BackendWorker, BackendWorkerState)
 
 
 class FaceAligner(BackendHost):
@@ -45,8 +48,8 @@ class FaceAlignerWorker(BackendWorker):
         cs.face_coverage.set_number(state.face_coverage if state.face_coverage is not None else 2.2)
 
         cs.resolution.enable()
-        cs.resolution.set_config(lib_csw.Number.Config(min=16, max=1024, step=16, decimals=0, allow_instant_update=True))
-        cs.resolution.set_number(state.resolution if state.resolution is not None else 224)
+        cs.resolution.set_config(lib_csw.Number.Config(min=0, max=1024, step=16, decimals=0, zero_is_auto=True, allow_instant_update=True))
+        cs.resolution.set_number(state.resolution if state.resolution is not None else 0)
 
         cs.exclude_moving_parts.enable()
         cs.exclude_moving_parts.set_flag(state.exclude_moving_parts if state.exclude_moving_parts is not None else True)
@@ -121,31 +124,74 @@ class FaceAlignerWorker(BackendWorker):
                 frame_image = bcd.get_image(frame_image_name)
 
                 if all_is_not_None(state.face_coverage, state.resolution, frame_image):
-                    for face_id, fsi in enumerate( bcd.get_face_swap_info_list() ):
-                        head_yaw = None
+                    fsi_list = bcd.get_face_swap_info_list()
+                    is_lmrks_mask_demanded = self.bc_out.is_demanded(BackendProduct.FACE_ALIGN_LMRKS_MASK)
+                    is_normalized_demanded = self.bc_out.is_demanded(BackendProduct.FACE_ALIGN_NORMALIZED)
+
+                    resolution = state.resolution
+                    if resolution == 0:
+                        # Auto: cut directly to the resolution of the receiver to avoid resampling twice
+                        resolution = self.bc_out.get_preferred_resolution()
+                        if resolution == 0:
+                            resolution = 224
+
+                    # Calc cut mats of all L468 faces of the frame in one batch
+                    batch_face_ids = [ face_id for face_id, fsi in enumerate(fsi_list)
+                                       if fsi.face_ulmrks is not None and fsi.face_ulmrks.get_type() == ELandmarks2D.L468 ]
+                    batch_cuts = {}
+                    if len(batch_face_ids) != 0:
+                        head_yaws = None
                         if state.head_mode:
-                            if fsi.face_pose is not None:
-                                head_yaw = fsi.face_pose.as_radians()[1]
-
+                            head_yaws = [ fsi_list[face_id].face_pose.as_radians()[1] if fsi_list[face_id].face_pose is not None else 0.0
+                                          for face_id in batch_face_ids ]
+
+                        mats, uni_mats = FLandmarks2D.calc_cut_batch( np.stack([ fsi_list[face_id].face_ulmrks.as_numpy() for face_id in batch_face_ids ]),
+                                                                      frame_image.shape[:2], state.face_coverage, resolution,
+                                                                      exclude_moving_parts=state.exclude_moving_parts,
+                                                                      head_yaw=head_yaws,
+                                                                      x_offset=state.x_offset,
+                                                                      y_offset=state.y_offset)
+                        batch_cuts = { face_id : (mat, uni_mat) for face_id, mat, uni_mat in zip(batch_face_ids, mats, uni_mats) }
+
+                    for face_id, fsi in enumerate(fsi_list):
                         face_ulmrks = fsi.face_ulmrks
                         if face_ulmrks is not None:
-                            fsi.face_resolution = state.resolution
-
-                            face_align_img, uni_mat = face_ulmrks.cut(frame_image, state.face_coverage, state.resolution,
-                                                                  exclude_moving_parts=state.exclude_moving_parts,
-                                                                  head_yaw=head_yaw,
-                                                                  x_offset=state.x_offset,
-                                                                  y_offset=state.y_offset)
+                            fsi.face_resolution = resolution
+
+                            if face_id in batch_cuts:
+                                mat, uni_mat = batch_cuts[face_id]
+                                face_align_img = lib_cv.warp_affine_roi(frame_image, mat, (resolution, resolution))
+                                uni_mat = Affine2DUniMat(uni_mat)
+                            else:
+                                head_yaw = None
+                                if state.head_mode:
+                                    if fsi.face_pose is not None:
+                                        head_yaw = fsi.face_pose.as_radians()[1]
+
+                                face_align_img, uni_mat = face_ulmrks.cut(frame_image, state.face_coverage, resolution,
+                                                                          exclude_moving_parts=state.exclude_moving_parts,
+                                                                          head_yaw=head_yaw,
+                                                                          x_offset=state.x_offset,
+                                                                          y_offset=state.y_offset)
 
                             fsi.face_align_image_name = f'{frame_image_name}_{face_id}_aligned'
                             fsi.image_to_align_uni_mat = uni_mat
                             fsi.face_align_ulmrks = face_ulmrks.transform(uni_mat)
                             bcd.set_image(fsi.face_align_image_name, face_align_img)
 
-                            # Due to FaceAligner is not well loaded, we can make lmrks mask here
-                            face_align_lmrks_mask_img = fsi.face_align_ulmrks.get_convexhull_mask( face_align_img.shape[:2], color=(255,), dtype=np.uint8)
-                            fsi.face_align_lmrks_mask_name = f'{frame_image_name}_{face_id}_aligned_lmrks_mask'
-                            bcd.set_image(fsi.face_align_lmrks_mask_name, face_align_lmrks_mask_img)
+                            if is_lmrks_mask_demanded:
+                                # Due to FaceAligner is not well loaded, we can make lmrks mask here
+                                face_align_lmrks_mask_img = fsi.face_align_ulmrks.get_convexhull_mask( face_align_img.shape[:2], color=(255,), dtype=np.uint8)
+                                fsi.face_align_lmrks_mask_name = f'{frame_image_name}_{face_id}_aligned_lmrks_mask'
+                                bcd.set_image(fsi.face_align_lmrks_mask_name, face_align_lmrks_mask_img)
+
+                            if is_normalized_demanded:
+                                # float32 CHW RGB [-1..1] model input, made here to offload the receiver
+                                face_align_normalized_img = face_align_img[...,::-1].transpose(2,0,1).astype(np.float32, order='C')
+                                face_align_normalized_img *= 2.0/255.0
+                                face_align_normalized_img -= 1.0
+                                fsi.face_align_normalized_name = f'{frame_image_name}_{face_id}_aligned_normalized'
+                                bcd.set_image(fsi.face_align_normalized_name, face_align_normalized_img)
 
 
                 self.stop_profile_timing()
@@ -11,7 +11,9 @@ from xlib.python import all_is_not_None
 
 from .BackendBase import (BackendConnection, BackendDB, BackendHost,
                           BackendSignal, BackendWeakHeap, BackendWorker,
-                          BackendWorkerState, BackendFaceSwapInfo)
+                          BackendWorkerState, BackendFaceSwapInfo,
+                          TemporalFilterType, TemporalFilterTypeNames,
+                          create_temporal_filter)
 
 
 class DetectorType(IntEnum):
@@ -66,6 +68,7 @@ class FaceDetectorWorker(BackendWorker):
         self.pending_bcd = None
 
         self.temporal_rects = []
+        self.temporal_filter = None
         self.S3FD = None
         self.YoloV5Face = None
 
@@ -78,6 +81,7 @@ class FaceDetectorWorker(BackendWorker):
         cs.threshold.call_on_number(self.on_cs_threshold)
         cs.max_faces.call_on_number(self.on_cs_max_faces)
         cs.sort_by.call_on_selected(self.on_cs_sort_by)
+        cs.temporal_filter.call_on_selected(self.on_cs_temporal_filter)
         cs.temporal_smoothing.call_on_number(self.on_cs_temporal_smoothing)
 
         cs.detector_type.enable()
@@ -131,6 +135,10 @@ class FaceDetectorWorker(BackendWorker):
                 cs.sort_by.set_choices(FaceSortBy, FaceSortByNames)
                 cs.sort_by.select(detector_state.sort_by if detector_state.sort_by is not None else FaceSortBy.LARGEST)
 
+                cs.temporal_filter.enable()
+                cs.temporal_filter.set_choices(TemporalFilterType, TemporalFilterTypeNames, none_choice_name=None)
+                cs.temporal_filter.select(detector_state.temporal_filter if detector_state.temporal_filter is not None else TemporalFilterType.AVERAGE)
+
                 cs.temporal_smoothing.enable()
                 cs.temporal_smoothing.set_config(lib_csw.Number.Config(min=1, max=10, step=1, allow_instant_update=True))
                 cs.temporal_smoothing.set_number(detector_state.temporal_smoothing if detector_state.temporal_smoothing is not None else 1)
@@ -179,12 +187,23 @@ class FaceDetectorWorker(BackendWorker):
         self.save_state()
         self.reemit_frame_signal.send()
 
+    def on_cs_temporal_filter(self, idx, temporal_filter):
+        state, cs = self.get_state(), self.get_control_sheet()
+        detector_state = state.get_detector_state()
+        detector_state.temporal_filter = temporal_filter
+        self.temporal_rects = []
+        self.temporal_filter = create_temporal_filter(temporal_filter, detector_state.temporal_smoothing or 1)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
     def on_cs_temporal_smoothing(self, temporal_smoothing):
         state, cs = self.get_state(), self.get_control_sheet()
         cfg = cs.temporal_smoothing.get_config()
-        temporal_smoothing = state.get_detector_state().temporal_smoothing = int(np.clip(temporal_smoothing, cfg.min, cfg.max))
+        detector_state = state.get_detector_state()
+        temporal_smoothing = detector_state.temporal_smoothing = int(np.clip(temporal_smoothing, cfg.min, cfg.max))
         if temporal_smoothing == 1:
             self.temporal_rects = []
+        self.temporal_filter = create_temporal_filter(detector_state.temporal_filter, temporal_smoothing)
         cs.temporal_smoothing.set_number(temporal_smoothing)
         self.save_state()
         self.reemit_frame_signal.send()
@@ -241,12 +260,21 @@ class FaceDetectorWorker(BackendWorker):
                             if max_faces != 0 and len(rects) > max_faces:
                                 rects = rects[:max_faces]
 
-                            if detector_state.temporal_smoothing != 1:
+                            temporal_filter = self.temporal_filter
+                            if temporal_filter is not None:
+                                pts = np.stack([ face_urect.as_4pts() for face_urect in rects ])
+                                if not is_frame_reemitted or temporal_filter.get_shape() != pts.shape:
+                                    pts = temporal_filter.step(pts, bcd.get_frame_timestamp())
+                                else:
+                                    pts = temporal_filter.get_output()
+                                rects = [ FRect.from_4pts(face_pts) for face_pts in pts ]
+
+                            elif detector_state.temporal_smoothing != 1:
                                 if len(self.temporal_rects) != len(rects):
                                     self.temporal_rects = [ [] for _ in range(len(rects)) ]
 
                             for face_id, face_urect in enumerate(rects):
-                                if detector_state.temporal_smoothing != 1:
+                                if temporal_filter is None and detector_state.temporal_smoothing != 1:
                                     if not is_frame_reemitted or len(self.temporal_rects[face_id]) == 0:
                                         self.temporal_rects[face_id].append( face_urect.as_4pts() )
 
@@ -282,6 +310,7 @@ class Sheet:
             self.fixed_window_size = lib_csw.Number.Client()
             self.threshold = lib_csw.Number.Client()
             self.max_faces = lib_csw.Number.Client()
+            self.temporal_filter = lib_csw.DynamicSingleSwitch.Client()
             self.temporal_smoothing = lib_csw.Number.Client()
 
     class Worker(lib_csw.Sheet.Worker):
@@ -293,6 +322,7 @@ class Sheet:
             self.fixed_window_size = lib_csw.Number.Host()
             self.threshold = lib_csw.Number.Host()
             self.max_faces = lib_csw.Number.Host()
+            self.temporal_filter = lib_csw.DynamicSingleSwitch.Host()
             self.temporal_smoothing = lib_csw.Number.Host()
 
 class DetectorState(BackendWorkerState):
@@ -300,6 +330,7 @@ class DetectorState(BackendWorkerState):
     threshold : float = None
     max_faces : int = None
     sort_by : FaceSortBy = None
+    temporal_filter : TemporalFilterType = None
     temporal_smoothing : int = None
 
 class S3FDState(BackendWorkerState):
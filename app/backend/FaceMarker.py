@@ -1,5 +1,7 @@
 import time
 from enum import IntEnum
+
+import cv2
 import numpy as np
 from modelhub import onnx as onnx_models
 from modelhub import cv as cv_models
@@ -11,7 +13,8 @@ from xlib.mp import csw as lib_csw
 
 from .BackendBase import (BackendConnection, BackendDB, BackendHost,
                           BackendSignal, BackendWeakHeap, BackendWorker,
-                          BackendWorkerState)
+                          BackendWorkerState, TemporalFilterType,
+                          TemporalFilterTypeNames, create_temporal_filter)
 
 class MarkerType(IntEnum):
     FAN2D = 0
@@ -47,6 +50,7 @@ class FaceMarkerWorker(BackendWorker):
         self.fan2d = None
         self.google_facemesh = None
         self.temporal_lmrks = []
+        self.temporal_filter = None
 
         lib_os.set_timer_resolution(1)
 
@@ -54,6 +58,7 @@ class FaceMarkerWorker(BackendWorker):
         cs.marker_type.call_on_selected(self.on_cs_marker_type)
         cs.device.call_on_selected(self.on_cs_devices)
         cs.marker_coverage.call_on_number(self.on_cs_marker_coverage)
+        cs.temporal_filter.call_on_selected(self.on_cs_temporal_filter)
         cs.temporal_smoothing.call_on_number(self.on_cs_temporal_smoothing)
 
         cs.marker_type.enable()
@@ -101,6 +106,10 @@ class FaceMarkerWorker(BackendWorker):
                     marker_coverage = 1.4
             cs.marker_coverage.set_number(marker_coverage)
 
+            cs.temporal_filter.enable()
+            cs.temporal_filter.set_choices(TemporalFilterType, TemporalFilterTypeNames, none_choice_name=None)
+            cs.temporal_filter.select(marker_state.temporal_filter if marker_state.temporal_filter is not None else TemporalFilterType.AVERAGE)
+
             cs.temporal_smoothing.enable()
             cs.temporal_smoothing.set_config(lib_csw.Number.Config(min=1, max=10, step=1, allow_instant_update=True))
             cs.temporal_smoothing.set_number(marker_state.temporal_smoothing if marker_state.temporal_smoothing is not None else 1)
@@ -123,12 +132,23 @@ class FaceMarkerWorker(BackendWorker):
         self.reemit_frame_signal.send()
 
 
+    def on_cs_temporal_filter(self, idx, temporal_filter):
+        state, cs = self.get_state(), self.get_control_sheet()
+        marker_state = state.get_marker_state()
+        marker_state.temporal_filter = temporal_filter
+        self.temporal_lmrks = []
+        self.temporal_filter = create_temporal_filter(temporal_filter, marker_state.temporal_smoothing or 1)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
     def on_cs_temporal_smoothing(self, temporal_smoothing):
         state, cs = self.get_state(), self.get_control_sheet()
         cfg = cs.temporal_smoothing.get_config()
-        temporal_smoothing = state.get_marker_state().temporal_smoothing = int(np.clip(temporal_smoothing,  cfg.min, cfg.max))
+        marker_state = state.get_marker_state()
+        temporal_smoothing = marker_state.temporal_smoothing = int(np.clip(temporal_smoothing,  cfg.min, cfg.max))
         if temporal_smoothing == 1:
             self.temporal_lmrks = []
+        self.temporal_filter = create_temporal_filter(marker_state.temporal_filter, temporal_smoothing)
         cs.temporal_smoothing.set_number(temporal_smoothing)
         self.save_state()
         self.reemit_frame_signal.send()
@@ -157,7 +177,10 @@ class FaceMarkerWorker(BackendWorker):
 
                     if frame_image is not None and is_marker_loaded:
                         fsi_list = bcd.get_face_swap_info_list()
-                        if marker_state.temporal_smoothing != 1 and \
+                        temporal_filter = self.temporal_filter
+                        is_temporal_average = temporal_filter is None and marker_state.temporal_smoothing != 1
+
+                        if is_temporal_average and \
                             len(self.temporal_lmrks) != len(fsi_list):
                             self.temporal_lmrks = [ [] for _ in range(len(fsi_list)) ]
 
@@ -165,14 +188,15 @@ class FaceMarkerWorker(BackendWorker):
                             if fsi.face_urect is not None:
                                 # Cut the face to feed to the face marker
                                 face_image, face_uni_mat = fsi.face_urect.cut(frame_image, marker_state.marker_coverage, 256 if is_fan2d else \
-                                                                                                                         192 if is_google_facemesh else 0 )
+                                                                                                                         192 if is_google_facemesh else 0,
+                                                                                                                         interpolation=cv2.INTER_LINEAR )
                                 _,H,W,_ = ImageProcessor(face_image).get_dims()
                                 if is_fan2d:
                                     lmrks = self.fan2d.extract(face_image)[0]
                                 elif is_google_facemesh:
                                     lmrks = self.google_facemesh.extract(face_image)[0]
 
-                                if marker_state.temporal_smoothing != 1:
+                                if is_temporal_average:
                                     if not is_frame_reemitted or len(self.temporal_lmrks[face_id]) == 0:
                                         self.temporal_lmrks[face_id].append(lmrks)
                                     self.temporal_lmrks[face_id] = self.temporal_lmrks[face_id][-marker_state.temporal_smoothing:]
@@ -192,6 +216,19 @@ class FaceMarkerWorker(BackendWorker):
                                 face_ulmrks = face_ulmrks.transform(face_uni_mat, invert=True)
                                 fsi.face_ulmrks = face_ulmrks
 
+                        if temporal_filter is not None:
+                            # Filter uniform landmarks of all faces at once
+                            lmrks_fsi_list = [ fsi for fsi in fsi_list if fsi.face_ulmrks is not None ]
+                            if len(lmrks_fsi_list) != 0:
+                                pts = np.stack([ fsi.face_ulmrks.as_numpy() for fsi in lmrks_fsi_list ])
+                                if not is_frame_reemitted or temporal_filter.get_shape() != pts.shape:
+                                    pts = temporal_filter.step(pts, bcd.get_frame_timestamp())
+                                else:
+                                    pts = temporal_filter.get_output()
+
+                                for fsi, face_pts in zip(lmrks_fsi_list, pts):
+                                    fsi.face_ulmrks = FLandmarks2D.create(fsi.face_ulmrks.get_type(), face_pts)
+
                     self.stop_profile_timing()
                 self.pending_bcd = bcd
 
@@ -204,6 +241,7 @@ class FaceMarkerWorker(BackendWorker):
 
 class MarkerState(BackendWorkerState):
     marker_coverage : float = None
+    temporal_filter : TemporalFilterType = None
     temporal_smoothing : int = None
 
 class Fan2dState(BackendWorkerState):
@@ -232,6 +270,7 @@ class Sheet:
             self.marker_type = lib_csw.DynamicSingleSwitch.Client()
             self.device = lib_csw.DynamicSingleSwitch.Client()
             self.marker_coverage = lib_csw.Number.Client()
+            self.temporal_filter = lib_csw.DynamicSingleSwitch.Client()
             self.temporal_smoothing = lib_csw.Number.Client()
 
     class Worker(lib_csw.Sheet.Worker):
@@ -240,4 +279,5 @@ class Sheet:
             self.marker_type = lib_csw.DynamicSingleSwitch.Host()
             self.device = lib_csw.DynamicSingleSwitch.Host()
             self.marker_coverage = lib_csw.Number.Host()
+            self.temporal_filter = lib_csw.DynamicSingleSwitch.Host()
             self.temporal_smoothing = lib_csw.Number.Host()
\ No newline at end of file
@@ -0,0 +1,300 @@
+import time
+from enum import IntEnum
+
+import cv2
+import numexpr as ne
+import numpy as np
+from xlib import os as lib_os
+from xlib.image import ImageProcessor
+from xlib.mp import csw as lib_csw
+from xlib.python import all_is_not_None
+
+from .BackendBase import (BackendConnection, BackendDB, BackendHost,
+                          BackendProduct, BackendSignal, BackendWeakHeap,
+                          BackendWorker, BackendWorkerState)
+
+
+class FaceMerger(BackendHost):
+    """
+    Pastes modified faces back into the frame.
+    """
+    def __init__(self, weak_heap :  BackendWeakHeap, reemit_frame_signal : BackendSignal, bc_in : BackendConnection, bc_out : BackendConnection, backend_db : BackendDB = None):
+        super().__init__(backend_db=backend_db,
+                         sheet_cls=Sheet,
+                         worker_cls=FaceMergerWorker,
+                         worker_state_cls=WorkerState,
+                         worker_start_args=[weak_heap, reemit_frame_signal, bc_in, bc_out])
+
+    def get_control_sheet(self) -> 'Sheet.Host': return super().get_control_sheet()
+
+class Interpolation(IntEnum):
+    BILINEAR = 0
+    BICUBIC = 1
+    LANCZOS4 = 2
+
+InterpolationNames = ['bilinear', 'bicubic', 'lanczos4']
+
+_cv_interpolation = { Interpolation.BILINEAR : cv2.INTER_LINEAR,
+                      Interpolation.BICUBIC  : cv2.INTER_CUBIC,
+                      Interpolation.LANCZOS4 : cv2.INTER_LANCZOS4 }
+
+class FaceMergerWorker(BackendWorker):
+    def get_state(self) -> 'WorkerState': return super().get_state()
+    def get_control_sheet(self) -> 'Sheet.Worker': return super().get_control_sheet()
+
+    def on_start(self, weak_heap : BackendWeakHeap, reemit_frame_signal : BackendSignal, bc_in : BackendConnection, bc_out : BackendConnection):
+        self.weak_heap = weak_heap
+        self.reemit_frame_signal = reemit_frame_signal
+        self.bc_in = bc_in
+        self.bc_out = bc_out
+        self.pending_bcd = None
+
+        lib_os.set_timer_resolution(1)
+
+        state, cs = self.get_state(), self.get_control_sheet()
+        cs.face_x_offset.call_on_number(self.on_cs_face_x_offset)
+        cs.face_y_offset.call_on_number(self.on_cs_face_y_offset)
+        cs.face_scale.call_on_number(self.on_cs_face_scale)
+        cs.face_mask_erode.call_on_number(self.on_cs_face_mask_erode)
+        cs.face_mask_blur.call_on_number(self.on_cs_face_mask_blur)
+        cs.interpolation.call_on_selected(self.on_cs_interpolation)
+        cs.face_opacity.call_on_number(self.on_cs_face_opacity)
+
+        cs.face_x_offset.enable()
+        cs.face_x_offset.set_config(lib_csw.Number.Config(min=-0.5, max=0.5, step=0.001, decimals=3, allow_instant_update=True))
+        cs.face_x_offset.set_number(state.face_x_offset if state.face_x_offset is not None else 0.0)
+
+        cs.face_y_offset.enable()
+        cs.face_y_offset.set_config(lib_csw.Number.Config(min=-0.5, max=0.5, step=0.001, decimals=3, allow_instant_update=True))
+        cs.face_y_offset.set_number(state.face_y_offset if state.face_y_offset is not None else 0.0)
+
+        cs.face_scale.enable()
+        cs.face_scale.set_config(lib_csw.Number.Config(min=0.5, max=1.5, step=0.01, decimals=2, allow_instant_update=True))
+        cs.face_scale.set_number(state.face_scale if state.face_scale is not None else 1.0)
+
+        cs.face_mask_erode.enable()
+        cs.face_mask_erode.set_config(lib_csw.Number.Config(min=-400, max=400, step=1, decimals=0, allow_instant_update=True))
+        cs.face_mask_erode.set_number(state.face_mask_erode if state.face_mask_erode is not None else 5.0)
+
+        cs.face_mask_blur.enable()
+        cs.face_mask_blur.set_config(lib_csw.Number.Config(min=0, max=400, step=1, decimals=0, allow_instant_update=True))
+        cs.face_mask_blur.set_number(state.face_mask_blur if state.face_mask_blur is not None else 25.0)
+
+        cs.interpolation.enable()
+        cs.interpolation.set_choices(Interpolation, InterpolationNames, none_choice_name=None)
+        cs.interpolation.select(state.interpolation if state.interpolation is not None else Interpolation.BILINEAR)
+
+        cs.face_opacity.enable()
+        cs.face_opacity.set_config(lib_csw.Number.Config(min=0.0, max=1.0, step=0.01, decimals=2, allow_instant_update=True))
+        cs.face_opacity.set_number(state.face_opacity if state.face_opacity is not None else 1.0)
+
+    def on_stop(self):
+        self.bc_in.set_demands(BackendProduct.NONE)
+
+    def on_cs_face_x_offset(self, face_x_offset):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.face_x_offset.get_config()
+        face_x_offset = state.face_x_offset = float(np.clip(face_x_offset, cfg.min, cfg.max))
+        cs.face_x_offset.set_number(face_x_offset)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def on_cs_face_y_offset(self, face_y_offset):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.face_y_offset.get_config()
+        face_y_offset = state.face_y_offset = float(np.clip(face_y_offset, cfg.min, cfg.max))
+        cs.face_y_offset.set_number(face_y_offset)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def on_cs_face_scale(self, face_scale):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.face_scale.get_config()
+        face_scale = state.face_scale = float(np.clip(face_scale, cfg.min, cfg.max))
+        cs.face_scale.set_number(face_scale)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def on_cs_face_mask_erode(self, face_mask_erode):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.face_mask_erode.get_config()
+        face_mask_erode = state.face_mask_erode = int(np.clip(face_mask_erode, cfg.min, cfg.max))
+        cs.face_mask_erode.set_number(face_mask_erode)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def on_cs_face_mask_blur(self, face_mask_blur):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.face_mask_blur.get_config()
+        face_mask_blur = state.face_mask_blur = int(np.clip(face_mask_blur, cfg.min, cfg.max))
+        cs.face_mask_blur.set_number(face_mask_blur)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def on_cs_interpolation(self, idx, interpolation):
+        state, cs = self.get_state(), self.get_control_sheet()
+        state.interpolation = interpolation
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def on_cs_face_opacity(self, face_opacity):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.face_opacity.get_config()
+        face_opacity = state.face_opacity = float(np.clip(face_opacity, cfg.min, cfg.max))
+        cs.face_opacity.set_number(face_opacity)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def merge_face(self, merged_frame, face_img, face_mask, face_to_frame_mat):
+        """
+        blend face_img into merged_frame in place,
+        touching only the bounding box of the warped non-zero part of the mask.
+
+            merged_frame    HWC uint8/float32
+
+            face_img        HWC of the same dtype
+
+            face_mask       HW uint8 [0..255] or float32 [0..1]
+
+            face_to_frame_mat   Affine2DMat
+        """
+        state = self.get_state()
+        H, W = merged_frame.shape[:2]
+        C = merged_frame.shape[2]
+
+        # Feathered mask is zero near the borders of the face, nothing to blend there
+        mx, my, mw, mh = cv2.boundingRect( face_mask if face_mask.dtype == np.uint8 else (face_mask > 0).astype(np.uint8) )
+        if mw == 0 or mh == 0:
+            return
+
+        # Bounding box of the masked part of the face in the frame
+        pts = cv2.transform( np.float32([[ [mx,my], [mx+mw,my], [mx+mw,my+mh], [mx,my+mh] ]]), face_to_frame_mat)[0]
+        l, t = np.floor(pts.min(0)).astype(np.int32)
+        r, b = np.ceil(pts.max(0)).astype(np.int32)
+        l, t, r, b = max(0, l), max(0, t), min(W, r), min(H, b)
+        if r <= l or b <= t:
+            return
+
+        roi_mat = np.array(face_to_frame_mat, np.float32)
+        roi_mat[:,2] -= (l, t)
+        roi_size = (r-l, b-t)
+        interpolation = _cv_interpolation.get(state.interpolation, cv2.INTER_LINEAR)
+        opacity = np.float32(state.face_opacity)
+        frame_roi = merged_frame[t:b,l:r]
+
+        if merged_frame.dtype == np.uint8 and face_mask.dtype == np.uint8 and C == 3:
+            # uint8 fast path: face and mask are warped together as one image,
+            # blending is done by saturated 8-bit arithmetic of cv2 without float intermediates
+            face_mask_roi = cv2.warpAffine(cv2.merge([face_img, face_mask]), roi_mat, roi_size, flags=interpolation, borderMode=cv2.BORDER_CONSTANT)
+            # Contiguous planes, cv2 arithmetic copies strided views internally
+            face_roi = cv2.cvtColor(face_mask_roi, cv2.COLOR_BGRA2BGR)
+            mask_roi = cv2.extractChannel(face_mask_roi, 3)
+            if opacity != 1.0:
+                mask_roi = cv2.convertScaleAbs(mask_roi, alpha=opacity)
+            mask_roi = cv2.cvtColor(mask_roi, cv2.COLOR_GRAY2BGR)
+            face_roi = cv2.multiply(face_roi, mask_roi, scale=1.0/255.0)
+            cv2.add(face_roi, cv2.multiply(frame_roi, cv2.bitwise_not(mask_roi), scale=1.0/255.0), dst=frame_roi)
+        else:
+            face_roi = cv2.warpAffine(face_img, roi_mat, roi_size, flags=interpolation, borderMode=cv2.BORDER_CONSTANT)
+            mask_roi = cv2.warpAffine(face_mask, roi_mat, roi_size, flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+
+            if mask_roi.dtype == np.uint8:
+                opacity /= np.float32(255.0)
+            # Single channel weights by numexpr, then cv2.blendLinear works natively with uint8 and float32
+            face_w = ne.evaluate('mask_roi*opacity').astype(np.float32, copy=False)
+            frame_w = ne.evaluate('1 - face_w')
+            frame_roi[...] = cv2.blendLinear(face_roi, frame_roi, face_w, frame_w)
+
+    def on_tick(self):
+        state, cs = self.get_state(), self.get_control_sheet()
+
+        if self.pending_bcd is None:
+            self.start_profile_timing()
+
+            # Forward demanded products of downstream backends to upstream along with own ones
+            self.bc_in.set_demands(self.bc_out.get_demands() | BackendProduct.FACE_ALIGN_LMRKS_MASK)
+
+            bcd = self.bc_in.read(timeout=0.005)
+            if bcd is not None:
+                bcd.assign_weak_heap(self.weak_heap)
+
+                frame_image_name = bcd.get_frame_image_name()
+                frame_image = bcd.get_image(frame_image_name)
+
+                if all_is_not_None(state.face_x_offset, state.face_y_offset, state.face_scale, state.face_opacity, frame_image):
+                    merged_frame = None
+                    H, W = frame_image.shape[:2]
+
+                    for fsi in bcd.get_face_swap_info_list():
+                        face_img = bcd.get_image(fsi.face_swap_image_name)
+                        if face_img is None or fsi.image_to_align_uni_mat is None:
+                            continue
+                        fh, fw = face_img.shape[:2]
+
+                        face_mask = bcd.get_image(fsi.face_align_lmrks_mask_name)
+                        if face_mask is None:
+                            face_mask = np.full( (fh,fw), 255, np.uint8)
+                        elif face_mask.shape[:2] != (fh, fw):
+                            face_mask = cv2.resize(face_mask, (fw, fh), interpolation=cv2.INTER_LINEAR)
+
+                        # Feather the mask in the face space, it is smaller than the face in the frame
+                        face_mask = ImageProcessor(face_mask).erode_blur(state.face_mask_erode, state.face_mask_blur, fade_to_border=True).get_image('HW')
+
+                        face_to_frame_mat = fsi.image_to_align_uni_mat.invert() \
+                                                                      .source_translated(-state.face_x_offset, -state.face_y_offset) \
+                                                                      .source_scaled_around_center(state.face_scale, state.face_scale) \
+                                                                      .to_exact_mat(fw, fh, W, H)
+
+                        if merged_frame is None:
+                            merged_frame = frame_image.copy()
+                        if face_img.dtype != merged_frame.dtype or face_img.shape[2] != merged_frame.shape[2]:
+                            face_img = ImageProcessor(face_img).ch(merged_frame.shape[2]).to_dtype(merged_frame.dtype).get_image('HWC')
+
+                        self.merge_face(merged_frame, face_img, face_mask, face_to_frame_mat)
+
+                    if merged_frame is not None:
+                        merged_image_name = f'{frame_image_name}_merged'
+                        bcd.set_merged_image_name(merged_image_name)
+                        bcd.set_image(merged_image_name, merged_frame)
+
+                self.stop_profile_timing()
+                self.pending_bcd = bcd
+
+        if self.pending_bcd is not None:
+            if self.bc_out.is_full_read(1):
+                self.bc_out.write(self.pending_bcd)
+                self.pending_bcd = None
+            else:
+                time.sleep(0.001)
+
+class Sheet:
+    class Host(lib_csw.Sheet.Host):
+        def __init__(self):
+            super().__init__()
+            self.face_x_offset = lib_csw.Number.Client()
+            self.face_y_offset = lib_csw.Number.Client()
+            self.face_scale = lib_csw.Number.Client()
+            self.face_mask_erode = lib_csw.Number.Client()
+            self.face_mask_blur = lib_csw.Number.Client()
+            self.interpolation = lib_csw.DynamicSingleSwitch.Client()
+            self.face_opacity = lib_csw.Number.Client()
+
+    class Worker(lib_csw.Sheet.Worker):
+        def __init__(self):
+            super().__init__()
+            self.face_x_offset = lib_csw.Number.Host()
+            self.face_y_offset = lib_csw.Number.Host()
+            self.face_scale = lib_csw.Number.Host()
+            self.face_mask_erode = lib_csw.Number.Host()
+            self.face_mask_blur = lib_csw.Number.Host()
+            self.interpolation = lib_csw.DynamicSingleSwitch.Host()
+            self.face_opacity = lib_csw.Number.Host()
+
+class WorkerState(BackendWorkerState):
+    face_x_offset : float = None
+    face_y_offset : float = None
+    face_scale : float = None
+    face_mask_erode : int = None
+    face_mask_blur : int = None
+    interpolation : Interpolation = None
+    face_opacity : float = None
@@ -1,15 +1,31 @@
+import hashlib
+import queue
+import threading
 import time
+from enum import IntEnum
+
 import cv2
-from modelhub.pytorch.psp import PspEditor
+import numexpr as ne
+import numpy as np
+import numpy.linalg as npla
+from modelhub import onnx as onnx_models
+from xlib.image import ImageProcessor
 from xlib import os as lib_os
+from xlib import time as lib_time
 from xlib.mp import csw as lib_csw
-from xlib.python import all_is_not_None
+from xlib.python import LRUCache, all_is_not_None
 
 
 from .BackendBase import (BackendConnection, BackendDB, BackendHost,
-                          BackendSignal, BackendWeakHeap, BackendWorker,
-                          BackendWorkerState)
+                          BackendProduct, BackendSignal, BackendWeakHeap,
+                          BackendWorker, BackendWorkerState)
+
+
+class ModelBackend(IntEnum):
+    TORCH = 0
+    ONNX = 1
 
+ModelBackendNames = ['PyTorch', 'ONNX']
 
 class FaceModifier(BackendHost):
     def __init__(self, weak_heap :  BackendWeakHeap, reemit_frame_signal : BackendSignal, bc_in : BackendConnection, bc_out : BackendConnection, backend_db : BackendDB = None):
@@ -30,29 +46,139 @@ class FaceModifierWorker(BackendWorker):
         self.reemit_frame_signal = reemit_frame_signal
         self.bc_in = bc_in
         self.bc_out = bc_out
-        self.pending_bcd = None
-        self.model = PspEditor()
+        self.model = None
+        # (face_id, hash of aligned face) -> latent
+        self.latent_cache = LRUCache(max_nbytes=64*1024*1024)
+        # face_id -> (thumbnail of aligned face, latent) of the last encoded face
+        self.last_latents = {}
+        # (hash of aligned face, edits, model version) -> output image
+        self.result_cache = LRUCache(max_nbytes=0)
+        self.result_cache_lock = threading.Lock()
+        self.result_cache_hits = 0
+        self.result_cache_misses = 0
+        self.last_result_cache_stats = (0, 0)
+        self.model_version = 0
+
+        # Ask FaceAligner to cut faces directly in model resolution and normalized form
+        self.bc_in.set_preferred_resolution(onnx_models.PspEditor.resolution)
+        self.own_demands = BackendProduct.FACE_ALIGN_NORMALIZED
+
+        # Frames go through pre-process (on_tick) -> model thread -> post-process thread,
+        # so the stages of consecutive frames overlap. Queues keep the order of frames.
+        self.model_queue = queue.Queue()
+        self.post_queue = queue.Queue()
+        self.frames_in_pipeline = 0
+        self.frames_in_pipeline_lock = threading.Lock()
+        self.model_timing_measurer = lib_time.AverageMeasurer(samples=120)
+        self.model_timing = None
+        self.pipeline_stop_ev = threading.Event()
+        self.pipeline_threads = [ threading.Thread(target=self.model_thread_proc, daemon=True),
+                                  threading.Thread(target=self.post_thread_proc, daemon=True) ]
+        for thread in self.pipeline_threads:
+            thread.start()
 
-        
         lib_os.set_timer_resolution(1)
 
         state, cs = self.get_state(), self.get_control_sheet()
 
+        cs.pipeline_depth.call_on_number(self.on_cs_pipeline_depth)
+        cs.model_backend.call_on_selected(self.on_cs_model_backend)
+        cs.precision.call_on_selected(self.on_cs_precision)
+        cs.channels_last.call_on_flag(self.on_cs_channels_last)
+        cs.device.call_on_selected(self.on_cs_device)
         cs.goatee.call_on_number(self.on_cs_beard)
-        cs.goatee.enable()
-        cs.goatee.set_config(lib_csw.Number.Config(min=-30, max=30, step=1, allow_instant_update=True))
-        cs.goatee.set_number(state.goatee if state.goatee is not None else 0)
-
         cs.smile.call_on_number(self.on_cs_smile)
-        cs.smile.enable()
-        cs.smile.set_config(lib_csw.Number.Config(min=-30, max=30, step=1, allow_instant_update=True))
-        cs.smile.set_number(state.smile if state.smile is not None else 0)
-
         cs.age.call_on_number(self.on_cs_age)
-        cs.age.enable()
-        cs.age.set_config(lib_csw.Number.Config(min=-5, max=5, step=0.2, allow_instant_update=True))
-        cs.age.set_number(state.age if state.age is not None else 0)
+        cs.latent_reuse_threshold.call_on_number(self.on_cs_latent_reuse_threshold)
+        cs.result_cache_size.call_on_number(self.on_cs_result_cache_size)
+        cs.reduced_resolution_face_size.call_on_number(self.on_cs_reduced_resolution_face_size)
+
+        cs.pipeline_depth.enable()
+        cs.pipeline_depth.set_config(lib_csw.Number.Config(min=1, max=4, step=1, decimals=0, allow_instant_update=True))
+        cs.pipeline_depth.set_number(state.pipeline_depth if state.pipeline_depth is not None else 2)
+
+        cs.model_backend.enable()
+        cs.model_backend.set_choices(ModelBackend, ModelBackendNames, none_choice_name=None)
+        cs.model_backend.select(state.model_backend if state.model_backend is not None else ModelBackend.TORCH)
+
+    def get_model_cls(self):
+        if self.get_state().model_backend == ModelBackend.ONNX:
+            return onnx_models.PspEditor
+        # Import torch only if it is used
+        from modelhub.pytorch.psp import PspEditor
+        return PspEditor
+
+    def on_cs_model_backend(self, idx, model_backend):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if state.model_backend == model_backend:
+            if model_backend == ModelBackend.TORCH:
+                from modelhub.pytorch.psp import PspPrecision, PspPrecisionNames
+                cs.precision.enable()
+                cs.precision.set_choices(PspPrecision, PspPrecisionNames, none_choice_name=None)
+                cs.precision.select(state.precision if state.precision is not None else PspPrecision.FP32)
+
+                cs.channels_last.enable()
+                cs.channels_last.set_flag(state.channels_last if state.channels_last is not None else False)
+
+            cs.device.enable()
+            cs.device.set_choices(self.get_model_cls().get_available_devices(), none_choice_name='@misc.menu_select')
+            cs.device.select(state.device)
+        else:
+            state.model_backend = model_backend
+            self.save_state()
+            self.restart()
+
+    def on_cs_device(self, idx, device):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if device is not None and state.device == device:
+            if state.model_backend == ModelBackend.TORCH:
+                from modelhub.pytorch.psp import PspPrecision
+                self.model = self.get_model_cls()(device, precision=state.precision if state.precision is not None else PspPrecision.FP32,
+                                                          channels_last=bool(state.channels_last))
+            else:
+                self.model = self.get_model_cls()(device)
+            self.model_version += 1
+
+            cs.goatee.enable()
+            cs.goatee.set_config(lib_csw.Number.Config(min=-30, max=30, step=1, allow_instant_update=True))
+            cs.goatee.set_number(state.goatee if state.goatee is not None else 0)
+
+            cs.smile.enable()
+            cs.smile.set_config(lib_csw.Number.Config(min=-30, max=30, step=1, allow_instant_update=True))
+            cs.smile.set_number(state.smile if state.smile is not None else 0)
 
+            cs.age.enable()
+            cs.age.set_config(lib_csw.Number.Config(min=-5, max=5, step=0.2, allow_instant_update=True))
+            cs.age.set_number(state.age if state.age is not None else 0)
+
+            cs.latent_reuse_threshold.enable()
+            cs.latent_reuse_threshold.set_config(lib_csw.Number.Config(min=0.0, max=10.0, step=0.1, decimals=1, allow_instant_update=True))
+            cs.latent_reuse_threshold.set_number(state.latent_reuse_threshold if state.latent_reuse_threshold is not None else 0.0)
+
+            if len(self.model.resolutions) > 1:
+                cs.reduced_resolution_face_size.enable()
+                cs.reduced_resolution_face_size.set_config(lib_csw.Number.Config(min=0, max=1024, step=8, decimals=0, allow_instant_update=True))
+                cs.reduced_resolution_face_size.set_number(state.reduced_resolution_face_size if state.reduced_resolution_face_size is not None else 128)
+
+            cs.result_cache_size.enable()
+            cs.result_cache_size.set_config(lib_csw.Number.Config(min=0, max=1024, step=16, decimals=0, allow_instant_update=True))
+            cs.result_cache_size.set_number(state.result_cache_size if state.result_cache_size is not None else 64)
+
+            cs.result_cache_hit_rate.enable()
+            cs.result_cache_hit_rate.set_config(lib_csw.Number.Config(min=0, max=100, decimals=1, read_only=True))
+            cs.result_cache_hit_rate.set_number(0)
+        else:
+            state.device = device
+            self.save_state()
+            self.restart()
+
+
+    def on_stop(self):
+        self.pipeline_stop_ev.set()
+        for thread in self.pipeline_threads:
+            thread.join()
+        self.bc_in.set_preferred_resolution(0)
+        self.bc_in.set_demands(BackendProduct.NONE)
 
     def on_cs_beard(self, val):
         state, cs = self.get_state(), self.get_control_sheet()
@@ -76,57 +202,299 @@ class FaceModifierWorker(BackendWorker):
         self.reemit_frame_signal.send()
 
 
-    def on_tick(self):
+    def on_cs_precision(self, idx, precision):
         state, cs = self.get_state(), self.get_control_sheet()
+        if state.precision != precision:
+            state.precision = precision
+            self.save_state()
+            if self.model is not None:
+                # Precision is set up once at model load
+                self.restart()
 
-        if self.pending_bcd is None:
-            self.start_profile_timing()
-
-            bcd = self.bc_in.read(timeout=0.005)
-            if bcd is not None:
-                bcd.assign_weak_heap(self.weak_heap)
-                for i, fsi in enumerate(bcd.get_face_swap_info_list()):
-                    view_image = bcd.get_image(fsi.face_align_image_name)
-                    
-                    if all_is_not_None(view_image):
-                        frame_image = cv2.resize(view_image, (256, 256))
-
-                        edits = {
-                            "goatee": state.goatee if state.goatee else 0,
-                            "smile": state.smile if state.smile else 0,
-                            "age": state.age if state.age else 0,
-                            }
-                        output = self.model.run(frame_image, edits)
-                        bcd.set_merged_image_name("modified_image")
-                        bcd.set_image("modified_image", output)
-
-
-                self.stop_profile_timing()
-                self.pending_bcd = bcd
-
-        if self.pending_bcd is not None:
-            if self.bc_out.is_full_read(1):
-                self.bc_out.write(self.pending_bcd)
-                self.pending_bcd = None
-            else:
+    def on_cs_channels_last(self, channels_last):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if state.channels_last != channels_last:
+            state.channels_last = channels_last
+            self.save_state()
+            if self.model is not None:
+                self.restart()
+
+    def on_cs_pipeline_depth(self, pipeline_depth):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.pipeline_depth.get_config()
+        pipeline_depth = state.pipeline_depth = int(np.clip(pipeline_depth, cfg.min, cfg.max))
+        cs.pipeline_depth.set_number(pipeline_depth)
+        self.save_state()
+
+    def on_cs_latent_reuse_threshold(self, latent_reuse_threshold):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.latent_reuse_threshold.get_config()
+        latent_reuse_threshold = state.latent_reuse_threshold = float(np.clip(latent_reuse_threshold, cfg.min, cfg.max))
+        cs.latent_reuse_threshold.set_number(latent_reuse_threshold)
+        self.last_latents = {}
+        with self.result_cache_lock:
+            # Cached outputs may be made from reused latents
+            self.result_cache.clear()
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def on_cs_result_cache_size(self, result_cache_size):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.result_cache_size.get_config()
+        result_cache_size = state.result_cache_size = int(np.clip(result_cache_size, cfg.min, cfg.max))
+        cs.result_cache_size.set_number(result_cache_size)
+        with self.result_cache_lock:
+            self.result_cache.set_max_nbytes(result_cache_size*1024*1024)
+        self.save_state()
+
+    def on_cs_reduced_resolution_face_size(self, reduced_resolution_face_size):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.reduced_resolution_face_size.get_config()
+        reduced_resolution_face_size = state.reduced_resolution_face_size = int(np.clip(reduced_resolution_face_size, cfg.min, cfg.max))
+        cs.reduced_resolution_face_size.set_number(reduced_resolution_face_size)
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def get_model_resolution(self, face_size):
+        """
+        returns the output resolution of the model for the face of face_size pixels in the frame
+        """
+        model = self.model
+        reduced_resolution_face_size = self.get_state().reduced_resolution_face_size
+        if reduced_resolution_face_size and face_size <= reduced_resolution_face_size:
+            # The lowest resolution which still covers the face
+            for resolution in sorted(model.resolutions):
+                if face_size <= resolution:
+                    return resolution
+        return model.resolution
+
+    def transfer_details(self, output, face_align_img):
+        """
+        upscales the output of the reduced resolution to the aligned face
+        and adds back the high-frequency details of the aligned face (Laplacian residual)
+        """
+        H, W = face_align_img.shape[:2]
+        h, w = output.shape[:2]
+        if face_align_img.dtype != np.uint8:
+            face_align_img = ImageProcessor(face_align_img).to_uint8().get_image('HWC')
+
+        # Details of the aligned face that do not fit in the resolution of the output
+        face_low = cv2.resize(cv2.resize(face_align_img, (w, h), interpolation=cv2.INTER_AREA), (W, H), interpolation=cv2.INTER_LINEAR)
+        output = cv2.resize(output, (W, H), interpolation=cv2.INTER_LINEAR)
+        return ne.evaluate('output + face_align_img - face_low').clip(0, 255).astype(np.uint8)
+
+    def get_latents(self, face_ids, digests, face_align_imgs, model_inputs):
+        """
+        returns latents of the faces from the cache,
+        missing ones are encoded in one batch
+        """
+        state = self.get_state()
+        latent_reuse_threshold = state.latent_reuse_threshold
+
+        latents = []
+        keys = []
+        thumbs = []
+        for face_id, digest, face_align_img in zip(face_ids, digests, face_align_imgs):
+            # Slider changes hit the exact key, so only the decoder is run
+            key = (face_id, digest)
+            latent = self.latent_cache.get(key)
+
+            thumb = None
+            if latent is None and latent_reuse_threshold:
+                # Near-identical consecutive faces reuse the latent of the previous one
+                thumb = cv2.resize(face_align_img, (32,32), interpolation=cv2.INTER_AREA).astype(np.float32)
+                last = self.last_latents.get(face_id, None)
+                if last is not None and last[0].shape == thumb.shape and \
+                   np.abs(thumb - last[0]).mean() <= latent_reuse_threshold:
+                    latent = last[1]
+                    self.put_latent(key, latent)
+
+            latents.append(latent)
+            keys.append(key)
+            thumbs.append(thumb)
+
+        missing = [ i for i, latent in enumerate(latents) if latent is None ]
+        if len(missing) != 0:
+            for i, latent in zip(missing, self.model.encode_batch([ model_inputs[i] for i in missing ])):
+                latents[i] = latent
+                self.put_latent(keys[i], latent)
+                if thumbs[i] is not None:
+                    self.last_latents[face_ids[i]] = (thumbs[i], latent)
+
+        return latents
+
+    def put_latent(self, key, latent):
+        nbytes = latent.nbytes if isinstance(latent, np.ndarray) else latent.element_size()*latent.nelement()
+        self.latent_cache.put(key, latent, nbytes)
+
+    def model_thread_proc(self):
+        while not self.pipeline_stop_ev.is_set():
+            try:
+                job = self.model_queue.get(timeout=0.005)
+            except queue.Empty:
+                continue
+            bcd, face_ids, fsis, face_align_imgs, model_inputs, model_resolutions, edits = job
+
+            outputs = []
+            if len(fsis) != 0:
+                self.model_timing_measurer.start()
+                digests = [ hashlib.blake2b(np.ascontiguousarray(face_align_img), digest_size=16).digest() for face_align_img in face_align_imgs ]
+
+                # Re-emitted frames with unchanged faces and edits are published from the cache
+                edits_key = tuple(sorted(edits.items()))
+                result_keys = [ (digest, edits_key, self.model_version, model_resolution) for digest, model_resolution in zip(digests, model_resolutions) ]
+                with self.result_cache_lock:
+                    outputs = [ self.result_cache.get(key) for key in result_keys ]
+                missing = [ i for i, output in enumerate(outputs) if output is None ]
+                self.result_cache_hits += len(outputs) - len(missing)
+                self.result_cache_misses += len(missing)
+
+                if len(missing) != 0:
+                    # All missing faces of the frame go through the model as one batch
+                    latents = self.get_latents([ face_ids[i] for i in missing ], [ digests[i] for i in missing ],
+                                               [ face_align_imgs[i] for i in missing ], [ model_inputs[i] for i in missing ])
+                    latents = dict(zip(missing, latents))
+                    for model_resolution in set(model_resolutions[i] for i in missing):
+                        group = [ i for i in missing if model_resolutions[i] == model_resolution ]
+                        group_outputs = self.model.decode_batch([ latents[i] for i in group ], edits, resolution=model_resolution)
+                        with self.result_cache_lock:
+                            for i, output in zip(group, group_outputs):
+                                outputs[i] = output
+                                self.result_cache.put(result_keys[i], output, output.nbytes)
+                    self.model_timing = self.model_timing_measurer.stop()
+
+            self.post_queue.put( (bcd, face_ids, fsis, face_align_imgs, outputs) )
+
+    def post_thread_proc(self):
+        while not self.pipeline_stop_ev.is_set():
+            try:
+                bcd, face_ids, fsis, face_align_imgs, outputs = self.post_queue.get(timeout=0.005)
+            except queue.Empty:
+                continue
+
+            for face_id, fsi, face_align_img, output in zip(face_ids, fsis, face_align_imgs, outputs):
+                if output.shape[0] < face_align_img.shape[0]:
+                    output = self.transfer_details(output, face_align_img)
+                fsi.face_swap_image_name = f'{bcd.get_frame_image_name()}_{face_id}_modified'
+                bcd.set_image(fsi.face_swap_image_name, output)
+
+            while not self.bc_out.is_full_read(1):
+                if self.pipeline_stop_ev.is_set():
+                    return
                 time.sleep(0.001)
+            self.bc_out.write(bcd)
+
+            with self.frames_in_pipeline_lock:
+                self.frames_in_pipeline -= 1
+
+    def on_tick(self):
+        state, cs = self.get_state(), self.get_control_sheet()
+
+        model_timing, self.model_timing = self.model_timing, None
+        if model_timing is not None:
+            self.send_profile_timing(model_timing)
+
+        result_cache_stats = (self.result_cache_hits, self.result_cache_misses)
+        if result_cache_stats != self.last_result_cache_stats and cs.result_cache_hit_rate.is_enabled():
+            self.last_result_cache_stats = result_cache_stats
+            hits, misses = result_cache_stats
+            if hits+misses != 0:
+                cs.result_cache_hit_rate.set_number(100*hits/(hits+misses))
+
+        # Forward demanded products of downstream backends to upstream along with own ones
+        self.bc_in.set_demands(self.bc_out.get_demands() | self.own_demands)
+
+        with self.frames_in_pipeline_lock:
+            is_pipeline_full = self.frames_in_pipeline >= (state.pipeline_depth or 1)
+        if is_pipeline_full:
+            time.sleep(0.001)
+            return
+
+        bcd = self.bc_in.read(timeout=0.005)
+        if bcd is not None:
+            bcd.assign_weak_heap(self.weak_heap)
+
+            face_ids, fsis, face_align_imgs, model_inputs, model_resolutions = [], [], [], [], []
+            model = self.model
+            if model is not None:
+                frame_shape, _ = bcd.get_image_shape_dtype(bcd.get_frame_image_name())
+
+                for face_id, fsi in enumerate(bcd.get_face_swap_info_list()):
+                    face_align_img = bcd.get_image(fsi.face_align_image_name)
+
+                    view_image = bcd.get_image(fsi.face_align_normalized_name)
+                    if view_image is None or view_image.shape[1:] != (model.resolution, model.resolution):
+                        view_image = face_align_img
+                        if view_image is not None and view_image.shape[:2] != (model.resolution, model.resolution):
+                            view_image = cv2.resize(view_image, (model.resolution, model.resolution))
+
+                    if all_is_not_None(face_align_img, view_image):
+                        face_ids.append(face_id)
+                        fsis.append(fsi)
+                        face_align_imgs.append(face_align_img)
+                        model_inputs.append(view_image)
+
+                        # Size of the aligned face in the frame pixels
+                        face_size = 0
+                        if frame_shape is not None and fsi.image_to_align_uni_mat is not None:
+                            H, W = frame_shape[:2]
+                            pts = fsi.image_to_align_uni_mat.invert().transform_points( [(0,0),(1,0)] ) * (W, H)
+                            face_size = npla.norm(pts[1]-pts[0])
+                        model_resolutions.append(self.get_model_resolution(face_size) if face_size != 0 else model.resolution)
+
+            # Edits are taken at pre-process time, so every frame is consistent with its own slider values
+            edits = {
+                "goatee": state.goatee if state.goatee else 0,
+                "smile": state.smile if state.smile else 0,
+                "age": state.age if state.age else 0,
+                }
+
+            with self.frames_in_pipeline_lock:
+                self.frames_in_pipeline += 1
+            self.model_queue.put( (bcd, face_ids, fsis, face_align_imgs, model_inputs, model_resolutions, edits) )
 
 class Sheet:
     class Host(lib_csw.Sheet.Host):
         def __init__(self):
             super().__init__()
+            self.pipeline_depth = lib_csw.Number.Client()
+            self.model_backend = lib_csw.DynamicSingleSwitch.Client()
+            self.precision = lib_csw.DynamicSingleSwitch.Client()
+            self.channels_last = lib_csw.Flag.Client()
+            self.device = lib_csw.DynamicSingleSwitch.Client()
             self.goatee = lib_csw.Number.Client()
             self.smile = lib_csw.Number.Client()
             self.age = lib_csw.Number.Client()
+            self.latent_reuse_threshold = lib_csw.Number.Client()
+            self.result_cache_size = lib_csw.Number.Client()
+            self.reduced_resolution_face_size = lib_csw.Number.Client()
+            self.result_cache_hit_rate = lib_csw.Number.Client()
 
     class Worker(lib_csw.Sheet.Worker):
         def __init__(self):
             super().__init__()
+            self.pipeline_depth = lib_csw.Number.Host()
+            self.model_backend = lib_csw.DynamicSingleSwitch.Host()
+            self.precision = lib_csw.DynamicSingleSwitch.Host()
+            self.channels_last = lib_csw.Flag.Host()
+            self.device = lib_csw.DynamicSingleSwitch.Host()
             self.goatee = lib_csw.Number.Host()
             self.smile = lib_csw.Number.Host()
             self.age = lib_csw.Number.Host()
+            self.latent_reuse_threshold = lib_csw.Number.Host()
+            self.result_cache_size = lib_csw.Number.Host()
+            self.reduced_resolution_face_size = lib_csw.Number.Host()
+            self.result_cache_hit_rate = lib_csw.Number.Host()
 
 class WorkerState(BackendWorkerState):
+    pipeline_depth : int = None
+    model_backend : ModelBackend = None
+    precision = None
+    channels_last : bool = None
+    device = None
     goatee : float = None
     smile : float = None
     age : float = None
+    latent_reuse_threshold : float = None
+    result_cache_size : int = None
+    reduced_resolution_face_size : int = None
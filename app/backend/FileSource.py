@@ -0,0 +1,316 @@
+import time
+from enum import IntEnum
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from xlib import os as lib_os
+from xlib import player as lib_player
+from xlib.image import ImageProcessor
+from xlib.mp import csw as lib_csw
+
+from .BackendBase import (BackendConnection, BackendConnectionData, BackendDB,
+                          BackendHost, BackendSignal, BackendWeakHeap,
+                          BackendWorker, BackendWorkerState)
+
+
+class FileSource(BackendHost):
+    """
+    Plays a video file or an image sequence into the pipeline.
+    """
+    def __init__(self, weak_heap : BackendWeakHeap,
+                       reemit_frame_signal : BackendSignal,
+                       bc_out : BackendConnection,
+                       backend_db : BackendDB = None):
+        super().__init__(backend_db=backend_db,
+                         sheet_cls=Sheet,
+                         worker_cls=FileSourceWorker,
+                         worker_state_cls=WorkerState,
+                         worker_start_args=[weak_heap, reemit_frame_signal, bc_out] )
+
+    def get_control_sheet(self) -> 'Sheet.Host': return super().get_control_sheet()
+
+class InputType(IntEnum):
+    VIDEO_FILE = 0
+    IMAGE_SEQUENCE = 1
+
+InputTypeNames = ['@FileSource.InputType.VIDEO_FILE',
+                  '@FileSource.InputType.IMAGE_SEQUENCE',
+                  ]
+
+class FileSourceWorker(BackendWorker):
+    def get_state(self) -> 'WorkerState': return super().get_state()
+    def get_control_sheet(self) -> 'Sheet.Worker': return super().get_control_sheet()
+
+    def on_start(self, weak_heap : BackendWeakHeap, reemit_frame_signal : BackendSignal, bc_out : BackendConnection):
+        self.weak_heap = weak_heap
+        self.reemit_frame_signal = reemit_frame_signal
+        self.bc_out = bc_out
+        self.bcd_uid = 0
+        self.pending_bcd = None
+        # Last written frame, re-emitted on request while paused
+        self.last_frame = None
+        self.fp : lib_player.FramePlayer = None
+        lib_os.set_timer_resolution(1)
+
+        state, cs = self.get_state(), self.get_control_sheet()
+
+        cs.input_type.call_on_selected(self.on_cs_input_type)
+        cs.input_paths.call_on_paths(self.on_cs_input_paths)
+        cs.target_width.call_on_number(self.on_cs_target_width)
+        cs.fps.call_on_number(self.on_cs_fps)
+        cs.is_realtime.call_on_flag(self.on_cs_is_realtime)
+        cs.is_autorewind.call_on_flag(self.on_cs_is_autorewind)
+        cs.frame_index.call_on_number(self.on_cs_frame_index)
+        cs.play.call_on_signal(self.on_cs_play)
+        cs.pause.call_on_signal(self.on_cs_pause)
+        cs.seek_backward.call_on_signal(self.on_cs_seek_backward)
+        cs.seek_forward.call_on_signal(self.on_cs_seek_forward)
+        cs.seek_begin.call_on_signal(self.on_cs_seek_begin)
+        cs.seek_end.call_on_signal(self.on_cs_seek_end)
+
+        cs.input_type.enable()
+        cs.input_type.set_choices(InputType, InputTypeNames, none_choice_name=None)
+        cs.input_type.select(state.input_type if state.input_type is not None else InputType.VIDEO_FILE)
+
+    def on_stop(self):
+        self.set_player(None)
+
+    def set_player(self, fp : lib_player.FramePlayer):
+        if self.fp is not None:
+            self.fp.dispose()
+        self.fp = fp
+        self.pending_bcd = None
+        self.last_frame = None
+
+    def on_cs_input_type(self, idx, input_type):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if state.input_type != input_type:
+            state.input_type = input_type
+            self.save_state()
+
+        cs.input_paths.enable()
+        if input_type == InputType.VIDEO_FILE:
+            cs.input_paths.set_config( lib_csw.Paths.Config.ExistingFile(caption='Video file', suffixes=lib_player.VideoFilePlayer.SUPPORTED_VIDEO_FILE_SUFFIXES) )
+        else:
+            cs.input_paths.set_config( lib_csw.Paths.Config.Directory('Choose image sequence directory') )
+        cs.input_paths.set_paths(state.input_path_by_type.get(input_type, None))
+
+    def on_cs_input_paths(self, paths : List[Path], prev_paths):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cs.error.set_error(None)
+        input_path = paths[0] if len(paths) != 0 else None
+
+        fp = None
+        if input_path is not None:
+            try:
+                if state.input_type == InputType.VIDEO_FILE:
+                    fp = lib_player.VideoFilePlayer(input_path)
+                else:
+                    fp = lib_player.ImageSequencePlayer(input_path)
+            except Exception as e:
+                cs.error.set_error(str(e))
+                input_path = None
+
+        state.input_path_by_type[state.input_type] = input_path
+        cs.input_paths.set_paths(input_path, block_event=True)
+        self.save_state()
+
+        self.set_player(fp)
+        if fp is not None:
+            self.set_player_controls()
+        else:
+            for control in [cs.target_width, cs.fps, cs.is_realtime, cs.is_autorewind,
+                            cs.frame_index, cs.frame_count,
+                            cs.play, cs.pause, cs.seek_backward, cs.seek_forward, cs.seek_begin, cs.seek_end]:
+                control.disable()
+
+    def set_player_controls(self):
+        state, cs = self.get_state(), self.get_control_sheet()
+        fp = self.fp
+
+        cs.target_width.enable()
+        cs.target_width.set_config(lib_csw.Number.Config(min=0, max=4096, step=4, decimals=0, zero_is_auto=True, allow_instant_update=False))
+        cs.target_width.set_number(fp.set_target_width(state.target_width if state.target_width is not None else 0))
+
+        cs.fps.enable()
+        cs.fps.set_config(lib_csw.Number.Config(min=0, max=240, step=1.0, decimals=2, zero_is_auto=True, allow_instant_update=False))
+        cs.fps.set_number(fp.set_fps(state.fps if state.fps is not None else 0))
+
+        cs.is_realtime.enable()
+        cs.is_realtime.set_flag(fp.set_is_realtime(state.is_realtime if state.is_realtime is not None else True))
+
+        cs.is_autorewind.enable()
+        cs.is_autorewind.set_flag(fp.set_is_autorewind(state.is_autorewind if state.is_autorewind is not None else True))
+
+        frame_count = fp.get_frame_count()
+        cs.frame_count.enable()
+        cs.frame_count.set_config(lib_csw.Number.Config(min=0, max=frame_count, decimals=0, read_only=True))
+        cs.frame_count.set_number(frame_count)
+
+        cs.frame_index.enable()
+        cs.frame_index.set_config(lib_csw.Number.Config(min=0, max=frame_count-1, step=1, decimals=0, allow_instant_update=False))
+        cs.frame_index.set_number(0, block_event=True)
+
+        for control in [cs.play, cs.pause, cs.seek_backward, cs.seek_forward, cs.seek_begin, cs.seek_end]:
+            control.enable()
+
+        # Show the first frame
+        fp.req_frame_seek(0, 0)
+
+    def on_cs_target_width(self, target_width):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if self.fp is not None:
+            target_width = state.target_width = self.fp.set_target_width(target_width)
+            cs.target_width.set_number(target_width)
+            self.save_state()
+            # Update the current frame
+            self.fp.req_frame_seek(0, 1)
+
+    def on_cs_fps(self, fps):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if self.fp is not None:
+            fps = state.fps = self.fp.set_fps(fps)
+            cs.fps.set_number(fps)
+            self.save_state()
+
+    def on_cs_is_realtime(self, is_realtime):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if self.fp is not None:
+            state.is_realtime = self.fp.set_is_realtime(is_realtime)
+            self.save_state()
+
+    def on_cs_is_autorewind(self, is_autorewind):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if self.fp is not None:
+            state.is_autorewind = self.fp.set_is_autorewind(is_autorewind)
+            self.save_state()
+
+    def on_cs_frame_index(self, frame_index):
+        if self.fp is not None:
+            self.fp.req_frame_seek(int(frame_index), 0)
+
+    def on_cs_play(self):
+        if self.fp is not None:
+            self.fp.req_play_start()
+
+    def on_cs_pause(self):
+        if self.fp is not None:
+            self.fp.req_play_stop()
+
+    def on_cs_seek_backward(self):
+        if self.fp is not None:
+            self.fp.req_frame_seek(-1, 1)
+
+    def on_cs_seek_forward(self):
+        if self.fp is not None:
+            self.fp.req_frame_seek(1, 1)
+
+    def on_cs_seek_begin(self):
+        if self.fp is not None:
+            self.fp.req_frame_seek(0, 0)
+
+    def on_cs_seek_end(self):
+        if self.fp is not None:
+            self.fp.req_frame_seek(0, 2)
+
+    def write_frame_bcd(self, image : np.ndarray, name : str, frame_num : int, frame_count : int, fps : float, timestamp : float, is_frame_reemitted : bool = False):
+        bcd_uid = self.bcd_uid = self.bcd_uid + 1
+        bcd = BackendConnectionData(uid=bcd_uid)
+        bcd.assign_weak_heap(self.weak_heap)
+        bcd.set_is_frame_reemitted(is_frame_reemitted)
+
+        frame_name = f'{name}_{bcd_uid:06}'
+        bcd.set_frame_image_name(frame_name)
+        bcd.set_frame_num(frame_num)
+        bcd.set_frame_count(frame_count)
+        bcd.set_frame_fps(fps)
+        bcd.set_frame_timestamp(timestamp)
+        bcd.set_image(frame_name, image)
+        self.pending_bcd = bcd
+
+    def on_tick(self):
+        fp = self.fp
+        if fp is not None:
+            state, cs = self.get_state(), self.get_control_sheet()
+
+            # In as fast as possible mode the next frame is produced only when downstream has read the previous one,
+            # thus every frame of the file is processed
+            if fp.get_is_realtime() or self.pending_bcd is None:
+                self.start_profile_timing()
+                pr = fp.process()
+
+                if pr.new_error is not None:
+                    cs.error.set_error(pr.new_error)
+
+                if pr.new_frame_idx is not None:
+                    cs.frame_index.set_number(pr.new_frame_idx, block_event=True)
+
+                frame = pr.new_frame
+                if frame is not None:
+                    cs.error.set_error(None)
+                    image = ImageProcessor(frame.image).ch(3).to_uint8().get_image('HWC')
+                    self.last_frame = (image, frame)
+                    # In realtime mode the frame replaces the pending one which is not read yet
+                    self.write_frame_bcd(image, frame.name, frame.frame_num, frame.frame_count, frame.fps, frame.timestamp)
+                    self.stop_profile_timing()
+
+                elif not fp.is_playing() and self.reemit_frame_signal.recv() and self.last_frame is not None:
+                    # Settings of the pipeline are changed while paused, emit the same frame again
+                    image, frame = self.last_frame
+                    self.write_frame_bcd(image, frame.name, frame.frame_num, frame.frame_count, frame.fps, time.time(), is_frame_reemitted=True)
+
+        if self.pending_bcd is not None:
+            if self.bc_out.is_full_read(1):
+                self.bc_out.write(self.pending_bcd)
+                self.pending_bcd = None
+
+        time.sleep(0.001)
+
+class WorkerState(BackendWorkerState):
+    def __init__(self):
+        self.input_type : InputType = None
+        self.input_path_by_type = {}
+        self.target_width : int = None
+        self.fps : float = None
+        self.is_realtime : bool = None
+        self.is_autorewind : bool = None
+
+class Sheet:
+    class Host(lib_csw.Sheet.Host):
+        def __init__(self):
+            super().__init__()
+            self.input_type = lib_csw.DynamicSingleSwitch.Client()
+            self.input_paths = lib_csw.Paths.Client()
+            self.error = lib_csw.Error.Client()
+            self.target_width = lib_csw.Number.Client()
+            self.fps = lib_csw.Number.Client()
+            self.is_realtime = lib_csw.Flag.Client()
+            self.is_autorewind = lib_csw.Flag.Client()
+            self.frame_index = lib_csw.Number.Client()
+            self.frame_count = lib_csw.Number.Client()
+            self.play = lib_csw.Signal.Client()
+            self.pause = lib_csw.Signal.Client()
+            self.seek_backward = lib_csw.Signal.Client()
+            self.seek_forward = lib_csw.Signal.Client()
+            self.seek_begin = lib_csw.Signal.Client()
+            self.seek_end = lib_csw.Signal.Client()
+
+    class Worker(lib_csw.Sheet.Worker):
+        def __init__(self):
+            super().__init__()
+            self.input_type = lib_csw.DynamicSingleSwitch.Host()
+            self.input_paths = lib_csw.Paths.Host()
+            self.error = lib_csw.Error.Host()
+            self.target_width = lib_csw.Number.Host()
+            self.fps = lib_csw.Number.Host()
+            self.is_realtime = lib_csw.Flag.Host()
+            self.is_autorewind = lib_csw.Flag.Host()
+            self.frame_index = lib_csw.Number.Host()
+            self.frame_count = lib_csw.Number.Host()
+            self.play = lib_csw.Signal.Host()
+            self.pause = lib_csw.Signal.Host()
+            self.seek_backward = lib_csw.Signal.Host()
+            self.seek_forward = lib_csw.Signal.Host()
+            self.seek_begin = lib_csw.Signal.Host()
+            self.seek_end = lib_csw.Signal.Host()
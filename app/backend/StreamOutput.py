@@ -1,28 +1,36 @@
+from datetime import datetime
 from enum import IntEnum
 from pathlib import Path
 from typing import List
 
 import cv2
 import numpy as np
-from xlib import cv as lib_cv
+from xlib import ffmpeg as lib_ffmpeg
 from xlib import logic as lib_logic
 from xlib import os as lib_os
 from xlib import time as lib_time
 from xlib.image import ImageProcessor
+from xlib.io import ImageSequenceWriter
+from xlib.mp import MPFrameRing
 from xlib.mp import csw as lib_csw
+from xlib.net import FrameStreamServer
 
-from .BackendBase import (BackendConnection, BackendDB, BackendHost,
-                          BackendSignal, BackendWeakHeap, BackendWorker,
-                          BackendWorkerState)
+from .BackendBase import (BackendConnection, BackendConnectionData,
+                          BackendDB, BackendHost, BackendSignal,
+                          BackendWeakHeap, BackendWorker, BackendWorkerState)
 
 
 class StreamOutput(BackendHost):
     """
-    Bufferizes and shows the stream in separated window.
+    Bufferizes the stream and outputs it.
+
+     bc_out     frames to show in the output window of the host process,
+                written only while the window is showing
     """
     def __init__(self, weak_heap : BackendWeakHeap,
                        reemit_frame_signal : BackendSignal,
                        bc_in : BackendConnection,
+                       bc_out : BackendConnection,
                        save_default_path : Path = None,
                        backend_db : BackendDB = None):
 
@@ -30,7 +38,7 @@ class StreamOutput(BackendHost):
                          sheet_cls=Sheet,
                          worker_cls=StreamOutputWorker,
                          worker_state_cls=WorkerState,
-                         worker_start_args=[weak_heap, reemit_frame_signal, bc_in, save_default_path] )
+                         worker_start_args=[weak_heap, reemit_frame_signal, bc_in, bc_out, save_default_path] )
 
     def get_control_sheet(self) -> 'Sheet.Host': return super().get_control_sheet()
 
@@ -50,6 +58,18 @@ ViewModeNames = ['@StreamOutput.SourceType.SOURCE_FRAME',
                  '@StreamOutput.SourceType.SOURCE_N_MERGED_FRAME_OR_SOURCE_FRAME',
                  ]
 
+class SaveMode(IntEnum):
+    IMAGE_SEQUENCE = 0
+    VIDEO_FILE = 1
+
+SaveModeNames = ['@StreamOutput.SaveMode.IMAGE_SEQUENCE',
+                 '@StreamOutput.SaveMode.VIDEO_FILE',
+                 ]
+
+VideoCodecs = ['libx264', 'libx265']
+
+# Name of shared memory frame ring, read it with xlib.mp.MPFrameRing.open()
+SHM_OUTPUT_NAME = 'DeepFaceLive_output'
 
 class StreamOutputWorker(BackendWorker):
     def get_state(self) -> 'WorkerState': return super().get_state()
@@ -57,20 +77,29 @@ class StreamOutputWorker(BackendWorker):
 
     def on_start(self, weak_heap : BackendWeakHeap, reemit_frame_signal : BackendSignal,
                        bc_in : BackendConnection,
+                       bc_out : BackendConnection,
                        save_default_path : Path):
         self.weak_heap = weak_heap
         self.reemit_frame_signal = reemit_frame_signal
         self.bc_in = bc_in
+        self.bc_out = bc_out
+        self.bcd_out_uid = 0
 
         self.fps_counter = lib_time.FPSCounter()
 
-        self.buffered_frames = lib_logic.DelayedBuffers()
-        self.is_show_window = False
+        # Long target delay at high fps keeps hundreds of full frames, limit them by memory
+        self.buffered_frames = lib_logic.DelayedBuffers(max_nbytes=2*1024**3)
 
         self.prev_frame_num = -1
-
-        self._wnd_name = 'DeepFaceLive output'
-        self._wnd_showing = False
+        # Created on the first saved frame
+        self.sequence_writer = None
+        self.sequence_writer_queue_size = 16
+        # Created on the first saved frame, recreated if the size of frame is changed
+        self.video_writer = None
+        # Created on the first published frame, recreated if the frame does not fit
+        self.shm_frame_ring = None
+        # Created when network output is enabled
+        self.net_server = None
 
         lib_os.set_timer_resolution(1)
 
@@ -82,6 +111,14 @@ class StreamOutputWorker(BackendWorker):
         cs.target_delay.call_on_number(self.on_cs_target_delay)
         cs.save_sequence_path.call_on_paths(self.on_cs_save_sequence_path)
         cs.save_fill_frame_gap.call_on_flag(self.on_cs_save_fill_frame_gap)
+        cs.save_mode.call_on_selected(self.on_cs_save_mode)
+        cs.save_video_codec.call_on_selected(self.on_cs_save_video_codec)
+        cs.save_video_crf.call_on_number(self.on_cs_save_video_crf)
+        cs.save_video_fps.call_on_number(self.on_cs_save_video_fps)
+        cs.shm_output.call_on_flag(self.on_cs_shm_output)
+        cs.net_output.call_on_flag(self.on_cs_net_output)
+        cs.net_http_port.call_on_number(self.on_cs_net_http_port)
+        cs.net_tcp_port.call_on_number(self.on_cs_net_tcp_port)
 
         cs.source_type.enable()
         cs.source_type.set_choices(SourceType, ViewModeNames, none_choice_name='@misc.menu_select')
@@ -96,15 +133,8 @@ class StreamOutputWorker(BackendWorker):
         cs.avg_fps.set_number(0)
 
         cs.show_hide_window.enable()
-        self.hide_window()
-
-        if state.is_showing_window is None:
-            state.is_showing_window = False
-
-        if state.is_showing_window:
-            state.is_showing_window = not state.is_showing_window
-            cs.show_hide_window.signal()
-
+        cs.is_showing_window.enable()
+        cs.is_showing_window.set_flag(state.is_showing_window if state.is_showing_window is not None else False)
 
         cs.save_sequence_path.enable()
         cs.save_sequence_path.set_config( lib_csw.Paths.Config.Directory('Choose output sequence directory', directory_path=save_default_path) )
@@ -113,6 +143,161 @@ class StreamOutputWorker(BackendWorker):
         cs.save_fill_frame_gap.enable()
         cs.save_fill_frame_gap.set_flag(state.save_fill_frame_gap if state.save_fill_frame_gap is not None else True )
 
+        cs.save_queue_size.enable()
+        cs.save_queue_size.set_config(lib_csw.Number.Config(min=0, max=self.sequence_writer_queue_size, decimals=0, read_only=True))
+        cs.save_queue_size.set_number(0)
+
+        cs.save_mode.enable()
+        cs.save_mode.set_choices(SaveMode, SaveModeNames, none_choice_name=None)
+        cs.save_mode.select(state.save_mode if state.save_mode is not None else SaveMode.IMAGE_SEQUENCE)
+
+        cs.shm_output.enable()
+        cs.shm_output.set_flag(state.shm_output if state.shm_output is not None else False)
+
+        cs.net_http_port.enable()
+        cs.net_http_port.set_config(lib_csw.Number.Config(min=0, max=65535, step=1, decimals=0, allow_instant_update=False))
+        cs.net_http_port.set_number(state.net_http_port if state.net_http_port is not None else 8080)
+
+        cs.net_tcp_port.enable()
+        cs.net_tcp_port.set_config(lib_csw.Number.Config(min=0, max=65535, step=1, decimals=0, allow_instant_update=False))
+        cs.net_tcp_port.set_number(state.net_tcp_port if state.net_tcp_port is not None else 0)
+
+        cs.net_output.enable()
+        cs.net_output.set_flag(state.net_output if state.net_output is not None else False)
+
+    def on_stop(self):
+        self.close_writers()
+        self.close_shm_frame_ring()
+        self.close_net_server()
+
+    def close_net_server(self):
+        if self.net_server is not None:
+            self.net_server.close()
+            self.net_server = None
+
+    def restart_net_server(self):
+        state, cs = self.get_state(), self.get_control_sheet()
+        self.close_net_server()
+        cs.net_output_error.set_error(None)
+        if state.net_output:
+            try:
+                self.net_server = FrameStreamServer(http_port=state.net_http_port or None,
+                                                    tcp_port=state.net_tcp_port or None)
+            except Exception as e:
+                cs.net_output_error.set_error(str(e))
+
+    def on_cs_net_output(self, net_output):
+        state, cs = self.get_state(), self.get_control_sheet()
+        state.net_output = net_output
+        self.restart_net_server()
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def on_cs_net_http_port(self, net_http_port):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.net_http_port.get_config()
+        net_http_port = int(np.clip(net_http_port, cfg.min, cfg.max))
+        cs.net_http_port.set_number(net_http_port)
+        if state.net_http_port != net_http_port:
+            state.net_http_port = net_http_port
+            if state.net_output:
+                # Also retries if the previous port could not be bound
+                self.restart_net_server()
+            self.save_state()
+
+    def on_cs_net_tcp_port(self, net_tcp_port):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.net_tcp_port.get_config()
+        net_tcp_port = int(np.clip(net_tcp_port, cfg.min, cfg.max))
+        cs.net_tcp_port.set_number(net_tcp_port)
+        if state.net_tcp_port != net_tcp_port:
+            state.net_tcp_port = net_tcp_port
+            if state.net_output:
+                # Also retries if the previous port could not be bound
+                self.restart_net_server()
+            self.save_state()
+
+    def close_shm_frame_ring(self):
+        if self.shm_frame_ring is not None:
+            self.shm_frame_ring.close()
+            self.shm_frame_ring = None
+
+    def blit(self, canvas, img):
+        """
+        copy img of any dtype/size/channels into uint8 canvas region, resizing as needed
+        """
+        H, W, C = canvas.shape
+        img = ImageProcessor(img).ch(C).get_image('HWC')
+
+        if img.dtype != np.uint8:
+            # float images are in range [0..1]
+            img = np.clip(img*255.0, 0, 255)
+            if img.shape[:2] != (H, W):
+                img = cv2.resize(img, (W, H), interpolation=cv2.INTER_LINEAR)
+            canvas[...] = img
+        elif img.shape[:2] != (H, W):
+            if C == 1:
+                cv2.resize(img, (W, H), dst=canvas[...,0], interpolation=cv2.INTER_LINEAR)
+            else:
+                cv2.resize(img, (W, H), dst=canvas, interpolation=cv2.INTER_LINEAR)
+        else:
+            canvas[...] = img
+
+    def compose_side_by_side(self, source_frame, merged_frame) -> np.ndarray:
+        """
+        returns uint8 canvas with source frame on the left and merged frame resized to source frame on the right
+        """
+        H, W = source_frame.shape[:2]
+        C = max(source_frame.shape[2] if source_frame.ndim == 3 else 1,
+                merged_frame.shape[2] if merged_frame.ndim == 3 else 1)
+
+        # Composed frame stays referenced by the delay buffer and the sinks, so it is never reused
+        canvas = np.empty( (H, W*2, C), np.uint8)
+        self.blit(canvas[:, :W], source_frame)
+        self.blit(canvas[:, W:], merged_frame)
+        return canvas
+
+    def on_cs_shm_output(self, shm_output):
+        state, cs = self.get_state(), self.get_control_sheet()
+        state.shm_output = shm_output
+        if not shm_output:
+            self.close_shm_frame_ring()
+        self.save_state()
+        self.reemit_frame_signal.send()
+
+    def publish_shm_frame(self, img, frame_num, timestamp):
+        """
+        publish uint8 frame to the shared memory ring
+        """
+        if img.ndim == 3 and img.shape[2] not in [1,3,4]:
+            img = ImageProcessor(img).ch(3).get_image('HWC')
+
+        shm_frame_ring = self.shm_frame_ring
+        if shm_frame_ring is not None and img.nbytes > shm_frame_ring.get_slot_size():
+            self.close_shm_frame_ring()
+            shm_frame_ring = None
+
+        if shm_frame_ring is None:
+            shm_frame_ring = self.shm_frame_ring = MPFrameRing.create(SHM_OUTPUT_NAME, slot_size=img.nbytes)
+
+        shm_frame_ring.write(img, frame_num, timestamp if timestamp is not None else 0.0)
+
+    def close_writers(self):
+        """
+        write all queued frames and close the writers
+        """
+        if self.sequence_writer is not None:
+            self.sequence_writer.close()
+            self.sequence_writer = None
+        if self.video_writer is not None:
+            self.video_writer.close()
+            self.video_writer = None
+
+    def get_sequence_writer(self) -> ImageSequenceWriter:
+        if self.sequence_writer is None:
+            self.sequence_writer = ImageSequenceWriter(max_queue_size=self.sequence_writer_queue_size,
+                                                       file_ext='.jpg', encode_args=[int(cv2.IMWRITE_JPEG_QUALITY), 100])
+        return self.sequence_writer
 
 
     def on_cs_source_type(self, idx, source_type):
@@ -128,28 +313,31 @@ class StreamOutputWorker(BackendWorker):
         self.save_state()
         self.reemit_frame_signal.send()
         
-    def show_window(self):
-        state, cs = self.get_state(), self.get_control_sheet()
-        cv2.namedWindow(self._wnd_name)
-        self._wnd_showing = True
-
-    def hide_window(self):
-        state, cs = self.get_state(), self.get_control_sheet()
-        if self._wnd_showing:
-            cv2.destroyAllWindows()
-            self._wnd_showing = False
-
     def on_cs_show_hide_window_signal(self,):
         state, cs = self.get_state(), self.get_control_sheet()
 
+        # The window lives in the host process and follows the flag
         state.is_showing_window = not state.is_showing_window
-        if state.is_showing_window:
-            cv2.namedWindow(self._wnd_name)
-        else:
-            cv2.destroyAllWindows()
+        cs.is_showing_window.set_flag(state.is_showing_window)
         self.save_state()
         self.reemit_frame_signal.send()
 
+    def publish_window_frame(self, img : np.ndarray):
+        """
+        writes the frame to bc_out for the output window of the host process
+        """
+        img = ImageProcessor(img).to_uint8().ch(3).get_image('HWC')
+
+        bcd_uid = self.bcd_out_uid = self.bcd_out_uid + 1
+        bcd = BackendConnectionData(uid=bcd_uid)
+        bcd.assign_weak_heap(self.weak_heap)
+        bcd.set_frame_num(bcd_uid)
+
+        frame_image_name = f'StreamOutput_{bcd_uid:06}'
+        bcd.set_frame_image_name(frame_image_name)
+        bcd.set_image(frame_image_name, np.ascontiguousarray(img))
+        self.bc_out.write(bcd)
+
 
     def on_cs_aligned_face_id(self, aligned_face_id):
         state, cs = self.get_state(), self.get_control_sheet()
@@ -174,6 +362,8 @@ class StreamOutputWorker(BackendWorker):
         sequence_path = paths[0] if len(paths) != 0 else None
 
         if sequence_path is None or sequence_path.exists():
+            if state.sequence_path != sequence_path:
+                self.close_writers()
             state.sequence_path = sequence_path
             cs.save_sequence_path.set_paths(sequence_path, block_event=True)
         else:
@@ -182,6 +372,98 @@ class StreamOutputWorker(BackendWorker):
         self.save_state()
         self.reemit_frame_signal.send()
 
+    def on_cs_save_mode(self, idx, save_mode):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if save_mode == SaveMode.VIDEO_FILE:
+            cs.save_video_codec.enable()
+            cs.save_video_codec.set_choices(VideoCodecs, none_choice_name=None)
+            cs.save_video_codec.select(state.save_video_codec if state.save_video_codec is not None else VideoCodecs[0])
+
+            cs.save_video_crf.enable()
+            cs.save_video_crf.set_config(lib_csw.Number.Config(min=0, max=51, step=1, decimals=0, allow_instant_update=True))
+            cs.save_video_crf.set_number(state.save_video_crf if state.save_video_crf is not None else 18)
+
+            cs.save_video_fps.enable()
+            cs.save_video_fps.set_config(lib_csw.Number.Config(min=1, max=240, step=1, decimals=0, allow_instant_update=True))
+            cs.save_video_fps.set_number(state.save_video_fps if state.save_video_fps is not None else 30)
+        else:
+            cs.save_video_codec.disable()
+            cs.save_video_crf.disable()
+            cs.save_video_fps.disable()
+
+        state.save_mode = save_mode
+        self.close_writers()
+        self.save_state()
+
+    def on_cs_save_video_codec(self, idx, save_video_codec):
+        state, cs = self.get_state(), self.get_control_sheet()
+        if state.save_video_codec != save_video_codec:
+            state.save_video_codec = save_video_codec
+            # Next frame starts a new file with new settings
+            self.close_writers()
+            self.save_state()
+
+    def on_cs_save_video_crf(self, save_video_crf):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.save_video_crf.get_config()
+        save_video_crf = int(np.clip(save_video_crf, cfg.min, cfg.max))
+        cs.save_video_crf.set_number(save_video_crf)
+        if state.save_video_crf != save_video_crf:
+            state.save_video_crf = save_video_crf
+            self.close_writers()
+            self.save_state()
+
+    def on_cs_save_video_fps(self, save_video_fps):
+        state, cs = self.get_state(), self.get_control_sheet()
+        cfg = cs.save_video_fps.get_config()
+        save_video_fps = int(np.clip(save_video_fps, cfg.min, cfg.max))
+        cs.save_video_fps.set_number(save_video_fps)
+        if state.save_video_fps != save_video_fps:
+            state.save_video_fps = save_video_fps
+            self.close_writers()
+            self.save_state()
+
+    def write_video_frame(self, img, count):
+        """
+        write uint8 frame count times to the video file in sequence_path directory
+        """
+        state, cs = self.get_state(), self.get_control_sheet()
+        img = ImageProcessor(img).ch(3).get_image('HWC')
+        H, W = img.shape[:2]
+
+        video_writer = self.video_writer
+        if video_writer is not None and video_writer.get_size() != (W, H):
+            video_writer.close()
+            video_writer = self.video_writer = None
+
+        if video_writer is None:
+            filepath = state.sequence_path / f'{datetime.now():%Y%m%d_%H%M%S}.mp4'
+            i = 1
+            while filepath.exists():
+                filepath = state.sequence_path / f'{datetime.now():%Y%m%d_%H%M%S}_{i}.mp4'
+                i += 1
+            try:
+                video_writer = self.video_writer = lib_ffmpeg.VideoWriter(filepath, W, H, fps=state.save_video_fps or 30,
+                                                                          codec=state.save_video_codec or VideoCodecs[0],
+                                                                          crf=state.save_video_crf if state.save_video_crf is not None else 18,
+                                                                          max_queue_size=self.sequence_writer_queue_size)
+            except Exception as e:
+                video_writer = None
+                error = str(e)
+        else:
+            error = video_writer.get_error()
+
+        if video_writer is not None and error is None:
+            video_writer.write(img, count)
+            cs.save_queue_size.set_number(video_writer.get_pending_count())
+        else:
+            # Stop saving
+            self.close_writers()
+            state.sequence_path = None
+            cs.save_sequence_path.set_paths(None, block_event=True)
+            cs.save_sequence_path_error.set_error(error)
+            self.save_state()
+
     def on_cs_save_fill_frame_gap(self, save_fill_frame_gap):
         state, cs = self.get_state(), self.get_control_sheet()
         state.save_fill_frame_gap = save_fill_frame_gap
@@ -202,7 +484,7 @@ class StreamOutputWorker(BackendWorker):
 
             source_type = state.source_type
             if source_type is not None and \
-                (state.is_showing_window or state.sequence_path is not None):
+                (state.is_showing_window or state.sequence_path is not None or state.shm_output or self.net_server is not None):
                 buffered_frames = self.buffered_frames
 
                 view_image = None
@@ -224,39 +506,49 @@ class StreamOutputWorker(BackendWorker):
                     
                 elif source_type in [SourceType.SOURCE_N_MERGED_FRAME, SourceType.SOURCE_N_MERGED_FRAME_OR_SOURCE_FRAME]:
                     source_frame = bcd.get_image(bcd.get_frame_image_name())
-                    if source_frame is not None:
-                        source_frame = ImageProcessor(source_frame).to_ufloat32().get_image('HWC')
-                    
                     merged_frame = bcd.get_image(bcd.get_merged_image_name())
-                    
+
                     if merged_frame is None and source_type == SourceType.SOURCE_N_MERGED_FRAME_OR_SOURCE_FRAME:                       
                         merged_frame = source_frame
                     
                     if source_frame is not None and merged_frame is not None:
-                        view_image = np.concatenate( (source_frame, merged_frame), 1 )
+                        view_image = self.compose_side_by_side(source_frame, merged_frame)
 
                 if view_image is not None:
                     buffered_frames.add_buffer( bcd.get_frame_timestamp(), view_image )
 
+                    if state.shm_output:
+                        self.publish_shm_frame(ImageProcessor(view_image).to_uint8().get_image('HWC'), frame_num, bcd.get_frame_timestamp())
+
+                    if self.net_server is not None:
+                        # Encoded in the thread of the server only if somebody is connected
+                        self.net_server.publish(ImageProcessor(view_image).to_uint8().ch(3).get_image('HWC'), frame_num, bcd.get_frame_timestamp())
+
                     if state.sequence_path is not None:
                         img = ImageProcessor(view_image, copy=True).to_uint8().get_image('HWC')
 
-                        file_ext, cv_args = '.jpg', [int(cv2.IMWRITE_JPEG_QUALITY), 100]
-
                         frame_diff = abs(frame_num - prev_frame_num) if state.save_fill_frame_gap else 1
-                        for i in range(frame_diff):
-                            n = frame_num - i
-                            filename = f'{n:06}'
-                            lib_cv.imwrite(state.sequence_path / (filename+file_ext), img, cv_args)
+                        if state.save_mode == SaveMode.VIDEO_FILE:
+                            if prev_frame_num == -1:
+                                # First frame after a reset or a seek back, the gap is unknown
+                                frame_diff = 1
+                            else:
+                                # Jump of frame num by a seek is not a gap, fill at most 1 second of the video
+                                frame_diff = min(frame_diff, state.save_video_fps or 30)
+                            if frame_diff != 0:
+                                self.write_video_frame(img, frame_diff)
+                        else:
+                            # Encoded once, gap frames are linked to the same file
+                            sequence_writer = self.get_sequence_writer()
+                            sequence_writer.write(state.sequence_path, [ frame_num - i for i in range(frame_diff) ], img)
+                            cs.save_queue_size.set_number(sequence_writer.get_pending_count())
+                            cs.save_sequence_path_error.set_error(sequence_writer.get_error())
 
                 pr = buffered_frames.process()
 
                 img = pr.new_data
                 if state.is_showing_window and img is not None:
-                    cv2.imshow(self._wnd_name, img)
-
-        if state.is_showing_window:
-            cv2.waitKey(1)
+                    self.publish_window_frame(img)
 
 class Sheet:
     class Host(lib_csw.Sheet.Host):
@@ -267,9 +559,20 @@ class Sheet:
             self.target_delay = lib_csw.Number.Client()
             self.avg_fps = lib_csw.Number.Client()
             self.show_hide_window = lib_csw.Signal.Client()
+            self.is_showing_window = lib_csw.Flag.Client()
             self.save_sequence_path = lib_csw.Paths.Client()
             self.save_sequence_path_error = lib_csw.Error.Client()
             self.save_fill_frame_gap = lib_csw.Flag.Client()
+            self.save_queue_size = lib_csw.Number.Client()
+            self.save_mode = lib_csw.DynamicSingleSwitch.Client()
+            self.save_video_codec = lib_csw.DynamicSingleSwitch.Client()
+            self.save_video_crf = lib_csw.Number.Client()
+            self.save_video_fps = lib_csw.Number.Client()
+            self.shm_output = lib_csw.Flag.Client()
+            self.net_output = lib_csw.Flag.Client()
+            self.net_http_port = lib_csw.Number.Client()
+            self.net_tcp_port = lib_csw.Number.Client()
+            self.net_output_error = lib_csw.Error.Client()
 
     class Worker(lib_csw.Sheet.Worker):
         def __init__(self):
@@ -279,9 +582,20 @@ class Sheet:
             self.target_delay = lib_csw.Number.Host()
             self.avg_fps = lib_csw.Number.Host()
             self.show_hide_window = lib_csw.Signal.Host()
+            self.is_showing_window = lib_csw.Flag.Host()
             self.save_sequence_path = lib_csw.Paths.Host()
             self.save_sequence_path_error = lib_csw.Error.Host()
             self.save_fill_frame_gap = lib_csw.Flag.Host()
+            self.save_queue_size = lib_csw.Number.Host()
+            self.save_mode = lib_csw.DynamicSingleSwitch.Host()
+            self.save_video_codec = lib_csw.DynamicSingleSwitch.Host()
+            self.save_video_crf = lib_csw.Number.Host()
+            self.save_video_fps = lib_csw.Number.Host()
+            self.shm_output = lib_csw.Flag.Host()
+            self.net_output = lib_csw.Flag.Host()
+            self.net_http_port = lib_csw.Number.Host()
+            self.net_tcp_port = lib_csw.Number.Host()
+            self.net_output_error = lib_csw.Error.Host()
 
 class WorkerState(BackendWorkerState):
     source_type : SourceType = None
@@ -290,3 +604,11 @@ class WorkerState(BackendWorkerState):
     target_delay : int = None
     sequence_path : Path = None
     save_fill_frame_gap : bool = None
+    save_mode : SaveMode = None
+    save_video_codec : str = None
+    save_video_crf : int = None
+    save_video_fps : int = None
+    shm_output : bool = None
+    net_output : bool = None
+    net_http_port : int = None
+    net_tcp_port : int = None
@@ -1,8 +1,11 @@
 from .BackendBase import (BackendConnection, BackendConnectionData, BackendDB,
-                          BackendSignal, BackendWeakHeap, BackendHost, BackendWorker)
+                          BackendProduct, BackendSignal, BackendWeakHeap,
+                          BackendHost, BackendWorker)
 from .CameraSource import CameraSource
 from .FaceAligner import FaceAligner
 from .FaceDetector import FaceDetector
 from .FaceMarker import FaceMarker
+from .FaceMerger import FaceMerger
 from .StreamOutput import StreamOutput
-from .FaceModifier import FaceModifier
\ No newline at end of file
+from .FaceModifier import FaceModifier
+from .FileSource import FileSource
\ No newline at end of file
@@ -6,6 +6,7 @@ from .widgets.QBackendPanel import QBackendPanel
 from .widgets.QCheckBoxCSWFlag import QCheckBoxCSWFlag
 from .widgets.QComboBoxCSWDynamicSingleSwitch import \
     QComboBoxCSWDynamicSingleSwitch
+from .widgets.QLabelCSWNumber import QLabelCSWNumber
 from .widgets.QLabelPopupInfo import QLabelPopupInfo
 from .widgets.QSpinBoxCSWNumber import QSpinBoxCSWNumber
 from .widgets.QXPushButtonCSWSignal import QXPushButtonCSWSignal
@@ -21,6 +22,12 @@ class QCameraSource(QBackendPanel):
         q_fps_label       = QLabelPopupInfo(label=L('@QCameraSource.fps'), popup_info_text=L('@QCameraSource.help.fps') )
         q_fps             = QSpinBoxCSWNumber(cs.fps, reflect_state_widgets=[q_fps_label])
 
+        q_buffer_size_label = QLabelPopupInfo(label=L('@QCameraSource.buffer_size'), popup_info_text=L('@QCameraSource.help.buffer_size') )
+        q_buffer_size       = QSpinBoxCSWNumber(cs.buffer_size, reflect_state_widgets=[q_buffer_size_label])
+
+        q_dropped_frames_label = QLabelPopupInfo(label=L('@QCameraSource.dropped_frames'), popup_info_text=L('@QCameraSource.help.dropped_frames') )
+        q_dropped_frames       = QLabelCSWNumber(cs.dropped_frames, reflect_state_widgets=[q_dropped_frames_label])
+
 
         q_camera_settings_group_label = QLabelPopupInfo(label=L('@QCameraSource.camera_settings') )
 
@@ -41,6 +48,12 @@ class QCameraSource(QBackendPanel):
         grid_l.addWidget(q_fps_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
         grid_l.addWidget(q_fps, row, 1, alignment=qtx.AlignLeft )
         row += 1
+        grid_l.addWidget(q_buffer_size_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_buffer_size, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_dropped_frames_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_dropped_frames, row, 1, alignment=qtx.AlignLeft )
+        row += 1
 
         super().__init__(backend, L('@QCameraSource.module_title'),
                          layout=qtx.QXVBoxLayout([grid_l], spacing=5),
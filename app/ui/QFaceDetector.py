@@ -46,6 +46,9 @@ class QFaceDetector(QBackendPanel):
         q_sort_by_label    = QLabelPopupInfo(label=L('@QFaceDetector.sort_by'), popup_info_text=L('@QFaceDetector.help.sort_by') )
         q_sort_by            = QComboBoxCSWDynamicSingleSwitch(cs.sort_by, reflect_state_widgets=[q_sort_by_label])
 
+        q_temporal_filter_label = QLabelPopupInfo(label=L('@QFaceDetector.temporal_filter'), popup_info_text=L('@QFaceDetector.help.temporal_filter') )
+        q_temporal_filter       = QComboBoxCSWDynamicSingleSwitch(cs.temporal_filter, reflect_state_widgets=[q_temporal_filter_label])
+
         q_temporal_smoothing_label = QLabelPopupInfo(label=L('@QFaceDetector.temporal_smoothing'), popup_info_text=L('@QFaceDetector.help.temporal_smoothing') )
         q_temporal_smoothing = QSpinBoxCSWNumber(cs.temporal_smoothing, reflect_state_widgets=[q_temporal_smoothing_label])
 
@@ -66,6 +69,9 @@ class QFaceDetector(QBackendPanel):
         grid_l.addLayout( qtx.QXHBoxLayout([q_max_faces_label, 5, q_max_faces]), row, 0, 1, 2, alignment=qtx.AlignRight | qtx.AlignVCenter)
         grid_l.addLayout( qtx.QXHBoxLayout([q_sort_by_label, 5,q_sort_by]), row, 2, 1,2, alignment=qtx.AlignLeft | qtx.AlignVCenter)
         row += 1
+        grid_l.addWidget(q_temporal_filter_label, row, 0, 1, 2, alignment=qtx.AlignRight | qtx.AlignVCenter)
+        grid_l.addWidget(q_temporal_filter, row, 2, 1, 2, alignment=qtx.AlignLeft)
+        row += 1
         grid_l.addLayout( qtx.QXHBoxLayout([q_temporal_smoothing_label, 5, q_temporal_smoothing]), row, 0, 1, 4, alignment=qtx.AlignCenter)
         row += 1
         grid_l.addWidget(q_detected_faces, row, 0, 1, 4)
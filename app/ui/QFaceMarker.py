@@ -21,6 +21,9 @@ class QFaceMarker(QBackendPanel):
         q_marker_coverage_label = QLabelPopupInfo(label=L('@QFaceMarker.marker_coverage'), popup_info_text=L('@QFaceMarker.help.marker_coverage') )
         q_marker_coverage       = QSpinBoxCSWNumber(cs.marker_coverage, reflect_state_widgets=[q_marker_coverage_label])
 
+        q_temporal_filter_label = QLabelPopupInfo(label=L('@QFaceMarker.temporal_filter'), popup_info_text=L('@QFaceMarker.help.temporal_filter') )
+        q_temporal_filter       = QComboBoxCSWDynamicSingleSwitch(cs.temporal_filter, reflect_state_widgets=[q_temporal_filter_label])
+
         q_temporal_smoothing_label = QLabelPopupInfo(label=L('@QFaceMarker.temporal_smoothing'), popup_info_text=L('@QFaceMarker.help.temporal_smoothing') )
         q_temporal_smoothing = QSpinBoxCSWNumber(cs.temporal_smoothing, reflect_state_widgets=[q_temporal_smoothing_label])
 
@@ -38,6 +41,9 @@ class QFaceMarker(QBackendPanel):
         sub_grid_l.addWidget(q_marker_coverage_label, sub_row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter  )
         sub_grid_l.addWidget(q_marker_coverage, sub_row, 1, 1, 1, alignment=qtx.AlignLeft )
         sub_row += 1
+        sub_grid_l.addWidget(q_temporal_filter_label, sub_row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        sub_grid_l.addWidget(q_temporal_filter, sub_row, 1, 1, 1, alignment=qtx.AlignLeft )
+        sub_row += 1
         sub_grid_l.addWidget(q_temporal_smoothing_label, sub_row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter  )
         sub_grid_l.addWidget(q_temporal_smoothing, sub_row, 1, 1, 1, alignment=qtx.AlignLeft )
         sub_row += 1
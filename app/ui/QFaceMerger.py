@@ -0,0 +1,59 @@
+from localization import L
+from xlib import qt as qtx
+
+from ..backend import FaceMerger
+from .widgets.QBackendPanel import QBackendPanel
+from .widgets.QComboBoxCSWDynamicSingleSwitch import \
+    QComboBoxCSWDynamicSingleSwitch
+from .widgets.QLabelPopupInfo import QLabelPopupInfo
+from .widgets.QSpinBoxCSWNumber import QSpinBoxCSWNumber
+
+
+class QFaceMerger(QBackendPanel):
+    def __init__(self, backend : FaceMerger):
+        cs = backend.get_control_sheet()
+
+        q_face_x_offset_label = QLabelPopupInfo(label=L('@QFaceMerger.face_x_offset'))
+        q_face_x_offset       = QSpinBoxCSWNumber(cs.face_x_offset, reflect_state_widgets=[q_face_x_offset_label])
+
+        q_face_y_offset_label = QLabelPopupInfo(label=L('@QFaceMerger.face_y_offset'))
+        q_face_y_offset       = QSpinBoxCSWNumber(cs.face_y_offset, reflect_state_widgets=[q_face_y_offset_label])
+
+        q_face_scale_label = QLabelPopupInfo(label=L('@QFaceMerger.face_scale'))
+        q_face_scale       = QSpinBoxCSWNumber(cs.face_scale, reflect_state_widgets=[q_face_scale_label])
+
+        q_face_mask_erode_label = QLabelPopupInfo(label=L('@QFaceMerger.face_mask_erode'))
+        q_face_mask_erode       = QSpinBoxCSWNumber(cs.face_mask_erode, reflect_state_widgets=[q_face_mask_erode_label])
+
+        q_face_mask_blur_label = QLabelPopupInfo(label=L('@QFaceMerger.face_mask_blur'))
+        q_face_mask_blur       = QSpinBoxCSWNumber(cs.face_mask_blur, reflect_state_widgets=[q_face_mask_blur_label])
+
+        q_interpolation_label = QLabelPopupInfo(label=L('@QFaceMerger.interpolation'))
+        q_interpolation       = QComboBoxCSWDynamicSingleSwitch(cs.interpolation, reflect_state_widgets=[q_interpolation_label])
+
+        q_face_opacity_label = QLabelPopupInfo(label=L('@QFaceMerger.face_opacity'))
+        q_face_opacity       = QSpinBoxCSWNumber(cs.face_opacity, reflect_state_widgets=[q_face_opacity_label])
+
+        grid_l = qtx.QXGridLayout(spacing=5)
+        row = 0
+        grid_l.addLayout( qtx.QXVBoxLayout([q_face_x_offset_label, q_face_y_offset_label]), row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addLayout( qtx.QXHBoxLayout([q_face_x_offset, q_face_y_offset]), row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_face_scale_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_face_scale, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_face_mask_erode_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_face_mask_erode, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_face_mask_blur_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_face_mask_blur, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_interpolation_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_interpolation, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_face_opacity_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_face_opacity, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+
+        super().__init__(backend, L('@QFaceMerger.module_title'),
+                         layout=qtx.QXVBoxLayout([grid_l]))
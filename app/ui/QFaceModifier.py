@@ -3,14 +3,31 @@ from xlib import qt as qtx
 
 from ..backend import FaceModifier
 from .widgets.QBackendPanel import QBackendPanel
+from .widgets.QCheckBoxCSWFlag import QCheckBoxCSWFlag
+from .widgets.QComboBoxCSWDynamicSingleSwitch import \
+    QComboBoxCSWDynamicSingleSwitch
+from .widgets.QLabelCSWNumber import QLabelCSWNumber
 from .widgets.QLabelPopupInfo import QLabelPopupInfo
 from .widgets.QSliderCSWNumber import QSliderCSWNumber
+from .widgets.QSpinBoxCSWNumber import QSpinBoxCSWNumber
 
 
 class QFaceModifier(QBackendPanel):
     def __init__(self, backend : FaceModifier):
         cs = backend.get_control_sheet()
 
+        q_model_backend_label = QLabelPopupInfo(label=L('@QFaceModifier.model_backend'), popup_info_text=L('@QFaceModifier.help.model_backend') )
+        q_model_backend = QComboBoxCSWDynamicSingleSwitch(cs.model_backend, reflect_state_widgets=[q_model_backend_label])
+
+        q_precision_label = QLabelPopupInfo(label=L('@QFaceModifier.precision'), popup_info_text=L('@QFaceModifier.help.precision') )
+        q_precision = QComboBoxCSWDynamicSingleSwitch(cs.precision, reflect_state_widgets=[q_precision_label])
+
+        q_channels_last_label = QLabelPopupInfo(label=L('@QFaceModifier.channels_last'), popup_info_text=L('@QFaceModifier.help.channels_last') )
+        q_channels_last = QCheckBoxCSWFlag(cs.channels_last, reflect_state_widgets=[q_channels_last_label])
+
+        q_device_label = QLabelPopupInfo(label=L('@QFaceModifier.device'), popup_info_text=L('@QFaceModifier.help.device') )
+        q_device = QComboBoxCSWDynamicSingleSwitch(cs.device, reflect_state_widgets=[q_device_label])
+
         q_beard_label = QLabelPopupInfo(label="beard", popup_info_text="")
         q_beard = QSliderCSWNumber(cs.goatee, reflect_state_widgets=[q_beard_label])
 
@@ -20,8 +37,35 @@ class QFaceModifier(QBackendPanel):
         q_age_label = QLabelPopupInfo(label="age", popup_info_text="")
         q_age = QSliderCSWNumber(cs.age, reflect_state_widgets=[q_age_label])
 
+        q_latent_reuse_threshold_label = QLabelPopupInfo(label=L('@QFaceModifier.latent_reuse_threshold'), popup_info_text=L('@QFaceModifier.help.latent_reuse_threshold') )
+        q_latent_reuse_threshold = QSpinBoxCSWNumber(cs.latent_reuse_threshold, reflect_state_widgets=[q_latent_reuse_threshold_label])
+
+        q_reduced_resolution_face_size_label = QLabelPopupInfo(label=L('@QFaceModifier.reduced_resolution_face_size'), popup_info_text=L('@QFaceModifier.help.reduced_resolution_face_size') )
+        q_reduced_resolution_face_size = QSpinBoxCSWNumber(cs.reduced_resolution_face_size, reflect_state_widgets=[q_reduced_resolution_face_size_label])
+
+        q_result_cache_size_label = QLabelPopupInfo(label=L('@QFaceModifier.result_cache_size'), popup_info_text=L('@QFaceModifier.help.result_cache_size') )
+        q_result_cache_size = QSpinBoxCSWNumber(cs.result_cache_size, reflect_state_widgets=[q_result_cache_size_label])
+
+        q_result_cache_hit_rate_label = QLabelPopupInfo(label=L('@QFaceModifier.result_cache_hit_rate'))
+        q_result_cache_hit_rate = QLabelCSWNumber(cs.result_cache_hit_rate, reflect_state_widgets=[q_result_cache_hit_rate_label])
+
+        q_pipeline_depth_label = QLabelPopupInfo(label=L('@QFaceModifier.pipeline_depth'), popup_info_text=L('@QFaceModifier.help.pipeline_depth') )
+        q_pipeline_depth = QSpinBoxCSWNumber(cs.pipeline_depth, reflect_state_widgets=[q_pipeline_depth_label])
+
         grid_l = qtx.QXGridLayout(spacing=5)
         row = 0
+        grid_l.addWidget(q_model_backend_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_model_backend, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_precision_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_precision, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_channels_last_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_channels_last, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_device_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_device, row, 1, alignment=qtx.AlignLeft )
+        row += 1
         grid_l.addWidget(q_beard_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
         grid_l.addWidget(q_beard, row, 1, alignment=qtx.AlignLeft )
         row += 1
@@ -30,6 +74,21 @@ class QFaceModifier(QBackendPanel):
         row +=1 
         grid_l.addWidget(q_age_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
         grid_l.addWidget(q_age, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_latent_reuse_threshold_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_latent_reuse_threshold, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_reduced_resolution_face_size_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_reduced_resolution_face_size, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_result_cache_size_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_result_cache_size, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_result_cache_hit_rate_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_result_cache_hit_rate, row, 1, alignment=qtx.AlignLeft )
+        row += 1
+        grid_l.addWidget(q_pipeline_depth_label, row, 0, alignment=qtx.AlignRight | qtx.AlignVCenter  )
+        grid_l.addWidget(q_pipeline_depth, row, 1, alignment=qtx.AlignLeft )
 
         super().__init__(backend, "modifier",
                          layout=qtx.QXVBoxLayout([grid_l]))
@@ -1,8 +1,10 @@
 from localization import L
+from PyQt6.QtCore import Qt
 from xlib import qt as qtx
 
-from ..backend import StreamOutput
+from ..backend import BackendConnection, BackendWeakHeap, StreamOutput
 from .widgets.QBackendPanel import QBackendPanel
+from .widgets.QBCFrameGLViewer import QBCFrameGLViewer
 from .widgets.QCheckBoxCSWFlag import QCheckBoxCSWFlag
 from .widgets.QComboBoxCSWDynamicSingleSwitch import \
     QComboBoxCSWDynamicSingleSwitch
@@ -15,8 +17,20 @@ from .widgets.QXPushButtonCSWSignal import QXPushButtonCSWSignal
 
 
 class QStreamOutput(QBackendPanel):
-    def __init__(self, backend : StreamOutput):
-        cs = backend.get_control_sheet()
+    def __init__(self, backend : StreamOutput,
+                       backed_weak_heap : BackendWeakHeap,
+                       bc : BackendConnection):
+        cs = self._cs = backend.get_control_sheet()
+
+        # Output window is shown in this process, frames are read from bc
+        self._q_window_viewer = QBCFrameGLViewer(backed_weak_heap, bc)
+        q_window = self._q_window = qtx.QXWindow(layout=qtx.QXVBoxLayout([self._q_window_viewer]))
+        q_window.setWindowTitle(L('@QStreamOutput.window_title'))
+        q_window.resize(640, 480)
+        # Top-level window of the output must not keep the app running after the main window is closed
+        q_window.setAttribute(Qt.WidgetAttribute.WA_QuitOnClose, False)
+        q_window.call_on_closeEvent(self._on_window_close)
+        cs.is_showing_window.call_on_flag(self._on_cs_is_showing_window)
 
         q_average_fps_label = QLabelPopupInfo(label=L('@QStreamOutput.avg_fps'), popup_info_text=L('@QStreamOutput.help.avg_fps'))
         q_average_fps       = QLabelCSWNumber(cs.avg_fps, reflect_state_widgets=[q_average_fps_label])
@@ -39,6 +53,35 @@ class QStreamOutput(QBackendPanel):
         q_save_fill_frame_gap_label = QLabelPopupInfo(label=L('@QStreamOutput.save_fill_frame_gap'), popup_info_text=L('@QStreamOutput.help.save_fill_frame_gap'))
         q_save_fill_frame_gap       = QCheckBoxCSWFlag(cs.save_fill_frame_gap, reflect_state_widgets=[q_save_fill_frame_gap_label])
 
+        q_save_queue_size_label = QLabelPopupInfo(label=L('@QStreamOutput.save_queue_size'), popup_info_text=L('@QStreamOutput.help.save_queue_size'))
+        q_save_queue_size       = QLabelCSWNumber(cs.save_queue_size, reflect_state_widgets=[q_save_queue_size_label])
+
+        q_save_mode_label = QLabelPopupInfo(label=L('@QStreamOutput.save_mode'), popup_info_text=L('@QStreamOutput.help.save_mode'))
+        q_save_mode       = QComboBoxCSWDynamicSingleSwitch(cs.save_mode, reflect_state_widgets=[q_save_mode_label])
+
+        q_save_video_codec_label = QLabelPopupInfo(label=L('@QStreamOutput.save_video_codec'))
+        q_save_video_codec       = QComboBoxCSWDynamicSingleSwitch(cs.save_video_codec, reflect_state_widgets=[q_save_video_codec_label])
+
+        q_save_video_crf_label = QLabelPopupInfo(label=L('@QStreamOutput.save_video_crf'), popup_info_text=L('@QStreamOutput.help.save_video_crf'))
+        q_save_video_crf       = QSpinBoxCSWNumber(cs.save_video_crf, reflect_state_widgets=[q_save_video_crf_label])
+
+        q_save_video_fps_label = QLabelPopupInfo(label=L('@QStreamOutput.save_video_fps'))
+        q_save_video_fps       = QSpinBoxCSWNumber(cs.save_video_fps, reflect_state_widgets=[q_save_video_fps_label])
+
+        q_shm_output_label = QLabelPopupInfo(label=L('@QStreamOutput.shm_output'), popup_info_text=L('@QStreamOutput.help.shm_output'))
+        q_shm_output       = QCheckBoxCSWFlag(cs.shm_output, reflect_state_widgets=[q_shm_output_label])
+
+        q_net_output_label = QLabelPopupInfo(label=L('@QStreamOutput.net_output'), popup_info_text=L('@QStreamOutput.help.net_output'))
+        q_net_output       = QCheckBoxCSWFlag(cs.net_output, reflect_state_widgets=[q_net_output_label])
+
+        q_net_http_port_label = QLabelPopupInfo(label=L('@QStreamOutput.net_http_port'), popup_info_text=L('@QStreamOutput.help.net_http_port'))
+        q_net_http_port       = QSpinBoxCSWNumber(cs.net_http_port, reflect_state_widgets=[q_net_http_port_label])
+
+        q_net_tcp_port_label = QLabelPopupInfo(label=L('@QStreamOutput.net_tcp_port'), popup_info_text=L('@QStreamOutput.help.net_tcp_port'))
+        q_net_tcp_port       = QSpinBoxCSWNumber(cs.net_tcp_port, reflect_state_widgets=[q_net_tcp_port_label])
+
+        q_net_output_error = QErrorCSWError(cs.net_output_error)
+
         grid_l = qtx.QXGridLayout(spacing=5)
         row = 0
         grid_l.addWidget(q_average_fps_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
@@ -55,15 +98,60 @@ class QStreamOutput(QBackendPanel):
         grid_l.addWidget(q_target_delay_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
         grid_l.addWidget(q_target_delay, row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
         row += 1
+        grid_l.addLayout( qtx.QXHBoxLayout([q_shm_output, 4, q_shm_output_label]), row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
+        grid_l.addLayout( qtx.QXHBoxLayout([q_net_output, 4, q_net_output_label]), row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
+        grid_l.addWidget(q_net_http_port_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
+        grid_l.addWidget(q_net_http_port, row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
+        grid_l.addWidget(q_net_tcp_port_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
+        grid_l.addWidget(q_net_tcp_port, row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
+        grid_l.addWidget(q_net_output_error, row, 0, 1, 3)
+        row += 1
 
+        grid_l.addWidget(q_save_mode_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
+        grid_l.addWidget(q_save_mode, row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
         grid_l.addWidget(q_save_sequence_path_label, row, 0,  1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
         grid_l.addWidget(q_save_sequence_path, row, 1,  1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
         row += 1
         grid_l.addLayout( qtx.QXHBoxLayout([q_save_fill_frame_gap, 4, q_save_fill_frame_gap_label]), row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
         row += 1
+        grid_l.addWidget(q_save_video_codec_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
+        grid_l.addWidget(q_save_video_codec, row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
+        grid_l.addWidget(q_save_video_crf_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
+        grid_l.addWidget(q_save_video_crf, row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
+        grid_l.addWidget(q_save_video_fps_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
+        grid_l.addWidget(q_save_video_fps, row, 1, 1, 2, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
+        grid_l.addWidget(q_save_queue_size_label, row, 0, 1, 1, alignment=qtx.AlignRight | qtx.AlignVCenter )
+        grid_l.addWidget(q_save_queue_size, row, 1, 1, 1, alignment=qtx.AlignLeft | qtx.AlignVCenter )
+        row += 1
 
         grid_l.addWidget(q_save_sequence_path_error, row, 0, 1, 3)
         row += 1
 
         super().__init__(backend, L('@QStreamOutput.module_title'),
                          layout=grid_l)
+
+    def finalize(self):
+        """close the output window, it has no parent widget to be deleted with"""
+        self._q_window.hide()
+        self._q_window_viewer.clear()
+        self._q_window.deleteLater()
+
+    def _on_cs_is_showing_window(self, is_showing_window):
+        if is_showing_window:
+            self._q_window.show()
+        else:
+            self._q_window.hide()
+            self._q_window_viewer.clear()
+
+    def _on_window_close(self):
+        # Closed by user, let the backend stop to output the frames
+        if self._cs.is_showing_window.get_flag():
+            self._cs.show_hide_window.signal()
@@ -0,0 +1,153 @@
+from PyQt6.QtCore import *
+from PyQt6.QtGui import *
+from PyQt6.QtOpenGL import *
+from xlib import qt as qtx
+
+from ... import backend
+
+_GL_COLOR_BUFFER_BIT = 0x00004000
+_GL_TRIANGLE_STRIP = 0x0005
+
+_vertex_shader = """
+attribute vec2 pos;
+uniform vec2 scale;
+varying vec2 tex_coord;
+void main()
+{
+    tex_coord = vec2(pos.x*0.5+0.5, 0.5-pos.y*0.5);
+    gl_Position = vec4(pos*scale, 0.0, 1.0);
+}
+"""
+
+_fragment_shader = """
+uniform sampler2D tex;
+varying vec2 tex_coord;
+void main()
+{
+    gl_FragColor = texture2D(tex, tex_coord);
+}
+"""
+
+class QBCFrameGLViewer(qtx.QXOpenGLWidget):
+    """
+    Shows the frame image of the last BackendConnectionData of bc
+    as OpenGL texture, keeping the aspect ratio.
+
+    The image is uploaded directly from the buffer read from the weak heap,
+    drawing is synchronized with vsync by the swap interval of the surface.
+    """
+    def __init__(self,  backed_weak_heap : backend.BackendWeakHeap,
+                        bc : backend.BackendConnection):
+        super().__init__(size_policy=('expanding', 'expanding'))
+        self._backed_weak_heap = backed_weak_heap
+        self._bc = bc
+        self._bcd_id = None
+        self._drawn_bcd_id = None
+
+        self._gl = None
+        self._program = None
+        self._texture = None
+        self._texture_size = None
+
+        self._transfer_options = QOpenGLPixelTransferOptions()
+        # Rows of BGR images are not 4-bytes aligned
+        self._transfer_options.setAlignment(1)
+
+        self._timer = qtx.QXTimer(interval=5, timeout=self._on_timer_5ms, start=True)
+
+    def get_image_size(self):
+        """returns (width, height) of the last shown image or None"""
+        return self._texture_size
+
+    def clear(self):
+        self._bcd_id = self._drawn_bcd_id = None
+        self.makeCurrent()
+        self._destroy_texture()
+        self.doneCurrent()
+        self.update()
+
+    def _on_timer_5ms(self):
+        if not self.isVisible():
+            return
+        bcd_id = self._bc.get_write_id()
+        if self._bcd_id != bcd_id:
+            # Has new bcd version, it will be read in paintGL,
+            # multiple updates are merged into one repaint per vsync
+            self._bcd_id = bcd_id
+            self.update()
+
+    def _destroy_texture(self):
+        if self._texture is not None:
+            self._texture.destroy()
+            self._texture = None
+            self._texture_size = None
+
+    def _upload_image(self, image):
+        H, W = image.shape[:2]
+        if self._texture_size != (W, H):
+            self._destroy_texture()
+            texture = self._texture = QOpenGLTexture(QOpenGLTexture.Target.Target2D)
+            texture.setFormat(QOpenGLTexture.TextureFormat.RGB8_UNorm)
+            texture.setSize(W, H)
+            texture.setMinMagFilters(QOpenGLTexture.Filter.Linear, QOpenGLTexture.Filter.Linear)
+            texture.setWrapMode(QOpenGLTexture.WrapMode.ClampToEdge)
+            texture.allocateStorage(QOpenGLTexture.PixelFormat.BGR, QOpenGLTexture.PixelType.UInt8)
+            self._texture_size = (W, H)
+
+        self._texture.setData(QOpenGLTexture.PixelFormat.BGR, QOpenGLTexture.PixelType.UInt8, image, self._transfer_options)
+
+    def _fetch_image(self):
+        bcd_id = self._bcd_id
+        if bcd_id is None or self._drawn_bcd_id == bcd_id:
+            return
+        self._drawn_bcd_id = bcd_id
+
+        bcd = self._bc.get_by_id(bcd_id)
+        if bcd is not None:
+            bcd.assign_weak_heap(self._backed_weak_heap)
+            image = bcd.get_image(bcd.get_frame_image_name())
+            if image is not None and image.ndim == 3 and image.shape[2] == 3:
+                self._upload_image(image)
+
+    def initializeGL(self):
+        profile = QOpenGLVersionProfile()
+        profile.setVersion(2, 0)
+        self._gl = QOpenGLVersionFunctionsFactory.get(profile, self.context())
+
+        program = self._program = QOpenGLShaderProgram(self)
+        program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Vertex, _vertex_shader)
+        program.addShaderFromSourceCode(QOpenGLShader.ShaderTypeBit.Fragment, _fragment_shader)
+        program.bindAttributeLocation('pos', 0)
+        program.link()
+
+        self.context().aboutToBeDestroyed.connect(self._destroy_texture)
+
+    def paintGL(self):
+        gl = self._gl
+        gl.glClearColor(0.0, 0.0, 0.0, 1.0)
+        gl.glClear(_GL_COLOR_BUFFER_BIT)
+
+        self._fetch_image()
+        if self._texture is None:
+            return
+
+        # Fit the image to the widget keeping aspect ratio
+        W, H = self._texture_size
+        ratio = self.devicePixelRatioF()
+        vw, vh = self.width()*ratio, self.height()*ratio
+        s = min(vw / W, vh / H)
+        scale = QVector2D( W*s / vw, H*s / vh )
+
+        program = self._program
+        program.bind()
+        program.setUniformValue('scale', scale)
+        program.setUniformValue('tex', 0)
+        program.enableAttributeArray(0)
+        program.setAttributeArray(0, [QVector2D(-1,-1), QVector2D(1,-1), QVector2D(-1,1), QVector2D(1,1)])
+
+        self._texture.bind(0)
+        gl.glDrawArrays(_GL_TRIANGLE_STRIP, 0, 4)
+        self._texture.release(0)
+
+        program.disableAttributeArray(0)
+        program.release()
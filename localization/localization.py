@@ -152,6 +152,11 @@ class Localization:
                 'ru-RU' : 'Авто перемотка',
                 'zh-CN' : '循环播放'},
 
+    'QFileSource.input_type':{
+                'en-US' : 'Input type',
+                'ru-RU' : 'Тип входа',
+                'zh-CN' : '输入类型'},
+
     'QCameraSource.module_title':{
                 'en-US' : 'Camera source',
                 'ru-RU' : 'Источник камеры',
@@ -192,6 +197,26 @@ class Localization:
                 'ru-RU' : 'Выходное кадр/сек устройства камеры.',
                 'zh-CN' : '相机输出帧率'},
 
+    'QCameraSource.buffer_size':{
+                'en-US' : 'Buffer size',
+                'ru-RU' : 'Размер буфера',
+                'zh-CN' : '缓冲区大小'},
+
+    'QCameraSource.help.buffer_size':{
+                'en-US' : 'Number of frames buffered by the camera driver.\n1 gives the lowest latency. Not supported by every driver.',
+                'ru-RU' : 'Количество кадров в буфере драйвера камеры.\n1 даёт наименьшую задержку. Поддерживается не всеми драйверами.',
+                'zh-CN' : '相机驱动缓冲的帧数。\n1的延迟最低。并非所有驱动都支持。'},
+
+    'QCameraSource.dropped_frames':{
+                'en-US' : 'Dropped frames',
+                'ru-RU' : 'Пропущено кадров',
+                'zh-CN' : '丢弃帧数'},
+
+    'QCameraSource.help.dropped_frames':{
+                'en-US' : 'Number of captured frames replaced by newer ones, because the pipeline was busy.',
+                'ru-RU' : 'Количество захваченных кадров, заменённых более новыми, потому что конвейер был занят.',
+                'zh-CN' : '因处理管线繁忙而被更新帧替换的已捕获帧数。'},
+
     'QCameraSource.rotation':{
                 'en-US' : 'Rotation',
                 'ru-RU' : 'Поворот',
@@ -287,6 +312,16 @@ class Localization:
                 'ru-RU' : 'Сортировать лица по выбранному методу. Например, для "СПРАВА НАЛЕВО" лица с идентификатором 0 будет находиться в самой правой части экрана.',
                 'zh-CN' : '人脸排序方法 例如，对于 "从右到左"，Face ID 0将在屏幕的最右边'},
 
+    'QFaceDetector.temporal_filter':{
+                'en-US' : 'Temporal filter',
+                'ru-RU' : 'Фильтр по времени',
+                'zh-CN' : '时间滤波器'},
+
+    'QFaceDetector.help.temporal_filter':{
+                'en-US' : 'Filter of temporal smoothing.\nAverage: mean of last N frames, adds lag.\nOne Euro: adapts to the speed of the face, low jitter when still and low lag when moving.\nKalman: constant velocity prediction.\nTemporal smoothing sets the strength.',
+                'ru-RU' : 'Фильтр сглаживания по времени.\nСреднее: среднее последних N кадров, добавляет задержку.\nOne Euro: адаптируется к скорости лица, мало дрожания в покое и малая задержка в движении.\nKalman: предсказание с постоянной скоростью.\nСглаживание по времени задаёт силу.',
+                'zh-CN' : '时间平滑滤波器。\n平均：最近N帧的平均值，会增加延迟。\nOne Euro：根据人脸速度自适应，静止时抖动小，移动时延迟低。\nKalman：恒速预测。\n时间平滑值设置强度。'},
+
     'QFaceDetector.temporal_smoothing':{
                 'en-US' : 'Temporal smoothing',
                 'ru-RU' : 'Сглаживание по времени',
@@ -323,9 +358,9 @@ class Localization:
                 'zh-CN' : '分辨率'},
 
     'QFaceAligner.help.resolution':{
-                'en-US' : 'Resolution of aligned face.\nShould match model resolution.',
-                'ru-RU' : 'Разрешение выровненного лица. Должно совпадать с разрешением модели.',
-                'zh-CN' : '校正后的人脸分辨率。\n需要匹配模型分辨率'},
+                'en-US' : 'Resolution of aligned face.\nShould match model resolution.\nAuto: resolution required by the next backend.',
+                'ru-RU' : 'Разрешение выровненного лица. Должно совпадать с разрешением модели.\nАвто: разрешение, требуемое следующим бэкендом.',
+                'zh-CN' : '校正后的人脸分辨率。\n需要匹配模型分辨率\n自动：使用下一个后端所需的分辨率'},
 
     'QFaceAligner.exclude_moving_parts':{
                 'en-US' : 'Exclude moving parts',
@@ -392,6 +427,16 @@ class Localization:
                 'ru-RU' : 'Размер прямоугольника детектированного лица при поступлении в маркер лица.\nЗеленые лицевые точки должны точно соответстовать лицу.\nСмотрите на окно "Выровненное лицо" и настройте по своему усмотрению.',
                 'zh-CN' : '控制检测到的人脸矩形框大小，以输入人脸特征点识别器。\n绿色面部点必须与面部完全匹配\n查看 "对齐的面 "窗口，并按你的意愿进行调整。'},
 
+    'QFaceMarker.temporal_filter':{
+                'en-US' : 'Temporal filter',
+                'ru-RU' : 'Фильтр по времени',
+                'zh-CN' : '时间滤波器'},
+
+    'QFaceMarker.help.temporal_filter':{
+                'en-US' : 'Filter of temporal smoothing.\nAverage: mean of last N frames, adds lag.\nOne Euro: adapts to the speed of the face, low jitter when still and low lag when moving.\nKalman: constant velocity prediction.\nTemporal smoothing sets the strength.',
+                'ru-RU' : 'Фильтр сглаживания по времени.\nСреднее: среднее последних N кадров, добавляет задержку.\nOne Euro: адаптируется к скорости лица, мало дрожания в покое и малая задержка в движении.\nKalman: предсказание с постоянной скоростью.\nСглаживание по времени задаёт силу.',
+                'zh-CN' : '时间平滑滤波器。\n平均：最近N帧的平均值，会增加延迟。\nOne Euro：根据人脸速度自适应，静止时抖动小，移动时延迟低。\nKalman：恒速预测。\n时间平滑值设置强度。'},
+
     'QFaceMarker.temporal_smoothing':{
                 'en-US' : 'Temporal smoothing',
                 'ru-RU' : 'Сглаживание по времени',
@@ -402,6 +447,91 @@ class Localization:
                 'ru-RU' : 'Стабилизирует лицевые точки усреднением по кадрам.\nХорошо для использования в статичных сценах или с вебкамерой.',
                 'zh-CN' : '通过对取多帧平均来稳定面部特征点。\n适用于静态场景或网络直播。'},
 
+    'QFaceModifier.model_backend':{
+                'en-US' : 'Backend',
+                'ru-RU' : 'Бэкенд',
+                'zh-CN' : '后端'},
+
+    'QFaceModifier.help.model_backend':{
+                'en-US' : 'Runtime of the face editing model.\nONNX requires the model exported with "main.py export PspEditor".',
+                'ru-RU' : 'Среда выполнения модели редактирования лица.\nONNX требует модель, экспортированную командой "main.py export PspEditor".',
+                'zh-CN' : '人脸编辑模型的运行时。\nONNX需要使用"main.py export PspEditor"导出的模型。'},
+
+    'QFaceModifier.precision':{
+                'en-US' : 'Precision',
+                'ru-RU' : 'Точность',
+                'zh-CN' : '精度'},
+
+    'QFaceModifier.help.precision':{
+                'en-US' : 'Numeric precision of PyTorch model.\nbf16 autocast and dynamic int8 are faster on modern CPUs, but slightly change the result.\nDynamic int8 works only on CPU.',
+                'ru-RU' : 'Числовая точность модели PyTorch.\nbf16 autocast и dynamic int8 быстрее на современных процессорах, но немного меняют результат.\nDynamic int8 работает только на ЦП.',
+                'zh-CN' : 'PyTorch模型的数值精度。\nbf16 autocast和dynamic int8在现代CPU上更快，但会略微改变结果。\nDynamic int8仅适用于CPU。'},
+
+    'QFaceModifier.channels_last':{
+                'en-US' : 'Channels last',
+                'ru-RU' : 'Каналы последними',
+                'zh-CN' : '通道在后'},
+
+    'QFaceModifier.help.channels_last':{
+                'en-US' : 'Use channels last memory format of PyTorch model. Faster convolutions on some CPUs.',
+                'ru-RU' : 'Использовать формат памяти channels last в модели PyTorch. Ускоряет свёртки на некоторых процессорах.',
+                'zh-CN' : '使用PyTorch模型的channels last内存格式。在部分CPU上卷积更快。'},
+
+    'QFaceModifier.device':{
+                'en-US' : 'Device',
+                'ru-RU' : 'Устройство',
+                'zh-CN' : '设备'},
+
+    'QFaceModifier.help.device':{
+                'en-US' : 'Device to run the face editing model.\nCPU is much slower, but works without GPU.',
+                'ru-RU' : 'Устройство для запуска модели редактирования лица.\nЦП намного медленнее, но работает без видеокарты.',
+                'zh-CN' : '运行人脸编辑模型的设备。\nCPU要慢得多，但无需GPU即可工作。'},
+
+    'QFaceModifier.reduced_resolution_face_size':{
+                'en-US' : 'Reduced resolution face size',
+                'ru-RU' : 'Размер лица для пониж. разрешения',
+                'zh-CN' : '降低分辨率的人脸尺寸'},
+
+    'QFaceModifier.help.reduced_resolution_face_size':{
+                'en-US' : 'Faces not larger than this size in pixels of the frame are modified at reduced resolution of the model.\nHigh-frequency details are transferred from the aligned face.\n0 - disabled.',
+                'ru-RU' : 'Лица не больше этого размера в пикселях кадра изменяются моделью в пониженном разрешении.\nМелкие детали переносятся из выровненного лица.\n0 - отключено.',
+                'zh-CN' : '在帧中不大于此像素尺寸的人脸以降低的模型分辨率进行修改。\n高频细节从对齐的人脸中转移。\n0 - 禁用。'},
+
+    'QFaceModifier.result_cache_size':{
+                'en-US' : 'Result cache (MB)',
+                'ru-RU' : 'Кэш результатов (МБ)',
+                'zh-CN' : '结果缓存 (MB)'},
+
+    'QFaceModifier.help.result_cache_size':{
+                'en-US' : 'Memory budget for modified faces.\nA re-emitted frame with the same face and edits is published from the cache without running the model.\n0 - disabled.',
+                'ru-RU' : 'Лимит памяти для изменённых лиц.\nПовторно отправленный кадр с тем же лицом и правками публикуется из кэша без запуска модели.\n0 - отключено.',
+                'zh-CN' : '修改后人脸的内存预算。\n人脸和编辑未改变的重发帧直接从缓存发布，不运行模型。\n0 - 禁用。'},
+
+    'QFaceModifier.result_cache_hit_rate':{
+                'en-US' : 'Cache hit rate %',
+                'ru-RU' : 'Попадания в кэш %',
+                'zh-CN' : '缓存命中率 %'},
+
+    'QFaceModifier.pipeline_depth':{
+                'en-US' : 'Pipeline depth',
+                'ru-RU' : 'Глубина конвейера',
+                'zh-CN' : '流水线深度'},
+
+    'QFaceModifier.help.pipeline_depth':{
+                'en-US' : 'Number of frames processed at the same time.\nPreparing, model and publishing of consecutive frames overlap.\nHigher value gives more fps, but adds latency.',
+                'ru-RU' : 'Количество кадров, обрабатываемых одновременно.\nПодготовка, модель и публикация соседних кадров выполняются параллельно.\nБольшее значение даёт больше кадр/сек, но добавляет задержку.',
+                'zh-CN' : '同时处理的帧数。\n相邻帧的预处理、模型和发布阶段相互重叠。\n数值越高fps越高，但会增加延迟。'},
+
+    'QFaceModifier.latent_reuse_threshold':{
+                'en-US' : 'Latent reuse threshold',
+                'ru-RU' : 'Порог повтора латента',
+                'zh-CN' : '潜码复用阈值'},
+
+    'QFaceModifier.help.latent_reuse_threshold':{
+                'en-US' : 'Reuse the encoded face of the previous frame if the mean difference of the faces is below this value.\nSaves the encoder pass on a still face. 0 - disabled.',
+                'ru-RU' : 'Повторно использовать закодированное лицо предыдущего кадра, если средняя разница лиц ниже этого значения.\nЭкономит проход энкодера на неподвижном лице. 0 - отключено.',
+                'zh-CN' : '如果人脸的平均差异低于此值，则复用上一帧编码后的人脸。\n静止人脸可省去编码器计算。0 - 禁用。'},
+
     'QFaceSwapper.module_title':{
                 'en-US' : 'Face swapper',
                 'ru-RU' : 'Замена лица',
@@ -602,6 +732,11 @@ class Localization:
                 'ru-RU' : 'окно',
                 'zh-CN' : '窗口显示'},
 
+    'QStreamOutput.window_title':{
+                'en-US' : 'DeepFaceLive output',
+                'ru-RU' : 'Вывод DeepFaceLive',
+                'zh-CN' : 'DeepFaceLive输出'},
+
     'QStreamOutput.aligned_face_id':{
                 'en-US' : 'Face ID',
                 'ru-RU' : 'Номер лица',
@@ -642,6 +777,86 @@ class Localization:
                 'ru-RU' : 'Заполнить кадровые пустоты дубликатами последнего кадра.',
                 'zh-CN' : '用最后帧来填充帧间隙'},
 
+    'QStreamOutput.shm_output':{
+                'en-US' : 'Publish to shared memory',
+                'ru-RU' : 'Публиковать в общую память',
+                'zh-CN' : '发布到共享内存'},
+
+    'QStreamOutput.help.shm_output':{
+                'en-US' : 'Publish output frames to the shared memory ring "DeepFaceLive_output" for other local processes.\nRead it with xlib.mp.MPFrameRing.open().',
+                'ru-RU' : 'Публиковать выходные кадры в кольцо общей памяти "DeepFaceLive_output" для других локальных процессов.\nЧтение через xlib.mp.MPFrameRing.open().',
+                'zh-CN' : '将输出帧发布到共享内存环"DeepFaceLive_output"，供其他本地进程使用。\n使用xlib.mp.MPFrameRing.open()读取。'},
+
+    'QStreamOutput.net_output':{
+                'en-US' : 'Network output',
+                'ru-RU' : 'Вывод в сеть',
+                'zh-CN' : '网络输出'},
+
+    'QStreamOutput.help.net_output':{
+                'en-US' : 'Serve the output to other machines of the local network.\nFrames are encoded once for all clients, slow clients skip frames.',
+                'ru-RU' : 'Раздавать вывод другим машинам локальной сети.\nКадры кодируются один раз для всех клиентов, медленные клиенты пропускают кадры.',
+                'zh-CN' : '向局域网中的其他机器提供输出。\n所有客户端共享一次编码，慢速客户端会跳帧。'},
+
+    'QStreamOutput.net_http_port':{
+                'en-US' : 'HTTP MJPEG port',
+                'ru-RU' : 'Порт HTTP MJPEG',
+                'zh-CN' : 'HTTP MJPEG端口'},
+
+    'QStreamOutput.help.net_http_port':{
+                'en-US' : 'Port of MJPEG stream, open http://<address>:<port>/ in a browser or a player.\n0 - disabled.',
+                'ru-RU' : 'Порт MJPEG потока, откройте http://<адрес>:<порт>/ в браузере или плеере.\n0 - отключено.',
+                'zh-CN' : 'MJPEG流的端口，在浏览器或播放器中打开http://<地址>:<端口>/。\n0 - 禁用。'},
+
+    'QStreamOutput.net_tcp_port':{
+                'en-US' : 'TCP port',
+                'ru-RU' : 'Порт TCP',
+                'zh-CN' : 'TCP端口'},
+
+    'QStreamOutput.help.net_tcp_port':{
+                'en-US' : 'Port of length-prefixed JPEG frames, read them with xlib.net.FrameStreamServer.recv_frame().\n0 - disabled.',
+                'ru-RU' : 'Порт JPEG кадров с префиксом длины, читайте их через xlib.net.FrameStreamServer.recv_frame().\n0 - отключено.',
+                'zh-CN' : '带长度前缀的JPEG帧端口，使用xlib.net.FrameStreamServer.recv_frame()读取。\n0 - 禁用。'},
+
+    'QStreamOutput.save_mode':{
+                'en-US' : 'Save mode',
+                'ru-RU' : 'Режим записи',
+                'zh-CN' : '保存模式'},
+
+    'QStreamOutput.help.save_mode':{
+                'en-US' : 'Image sequence: numbered jpg files in the directory.\nVideo file: mp4 file in the directory encoded by ffmpeg. ffmpeg must be installed.',
+                'ru-RU' : 'Последовательность изображений: пронумерованные jpg файлы в папке.\nВидео файл: mp4 файл в папке, кодируется ffmpeg. ffmpeg должен быть установлен.',
+                'zh-CN' : '图像序列：目录中编号的jpg文件。\n视频文件：由ffmpeg编码的目录中的mp4文件。必须安装ffmpeg。'},
+
+    'QStreamOutput.save_video_codec':{
+                'en-US' : 'Video codec',
+                'ru-RU' : 'Видео кодек',
+                'zh-CN' : '视频编码器'},
+
+    'QStreamOutput.save_video_crf':{
+                'en-US' : 'CRF',
+                'ru-RU' : 'CRF',
+                'zh-CN' : 'CRF'},
+
+    'QStreamOutput.help.save_video_crf':{
+                'en-US' : 'Constant rate factor of the codec. Lower value - higher quality and bigger file.',
+                'ru-RU' : 'Коэффициент постоянного качества кодека. Меньше значение - выше качество и больше файл.',
+                'zh-CN' : '编码器的恒定速率因子。值越低，质量越高，文件越大。'},
+
+    'QStreamOutput.save_video_fps':{
+                'en-US' : 'Video FPS',
+                'ru-RU' : 'Кадр/сек видео',
+                'zh-CN' : '视频帧率'},
+
+    'QStreamOutput.save_queue_size':{
+                'en-US' : 'Save queue',
+                'ru-RU' : 'Очередь записи',
+                'zh-CN' : '保存队列'},
+
+    'QStreamOutput.help.save_queue_size':{
+                'en-US' : 'Number of frames waiting to be written to disk.\nIf the queue is full, the output waits for the disk.',
+                'ru-RU' : 'Количество кадров, ожидающих записи на диск.\nЕсли очередь заполнена, вывод ждёт диск.',
+                'zh-CN' : '等待写入磁盘的帧数。\n队列满时，输出将等待磁盘。'},
+
     'QBCFrameViewer.title':{
                 'en-US' : 'Source frame',
                 'ru-RU' : 'Исходный кадр',
@@ -722,6 +937,41 @@ class Localization:
                 'ru-RU' : 'Загрузка модели...',
                 'zh-CN' : '下载模型中...'},
 
+    'TemporalFilter.AVERAGE':{
+                'en-US' : 'Average',
+                'ru-RU' : 'Среднее',
+                'zh-CN' : '平均'},
+
+    'TemporalFilter.ONE_EURO':{
+                'en-US' : 'One Euro',
+                'ru-RU' : 'One Euro',
+                'zh-CN' : 'One Euro'},
+
+    'TemporalFilter.KALMAN':{
+                'en-US' : 'Kalman',
+                'ru-RU' : 'Калман',
+                'zh-CN' : '卡尔曼'},
+
+    'StreamOutput.SaveMode.IMAGE_SEQUENCE':{
+                'en-US' : 'Image sequence',
+                'ru-RU' : 'Последовательность изображений',
+                'zh-CN' : '图像序列'},
+
+    'StreamOutput.SaveMode.VIDEO_FILE':{
+                'en-US' : 'Video file',
+                'ru-RU' : 'Видео файл',
+                'zh-CN' : '视频文件'},
+
+    'FileSource.InputType.VIDEO_FILE':{
+                'en-US' : 'Video file',
+                'ru-RU' : 'Видео файл',
+                'zh-CN' : '视频文件'},
+
+    'FileSource.InputType.IMAGE_SEQUENCE':{
+                'en-US' : 'Image sequence',
+                'ru-RU' : 'Секвенция изображений',
+                'zh-CN' : '图像序列'},
+
     'StreamOutput.SourceType.SOURCE_FRAME':{
                 'en-US' : 'Source frame',
                 'ru-RU' : 'Исходный кадр',
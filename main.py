@@ -14,6 +14,10 @@ def main():
     run_subparsers = run_parser.add_subparsers()
 
     def run_FaceFilterLive(args):
+        if args.import_profile:
+            import_profile('app.FaceFilterLiveApp', top=args.import_profile_top)
+            return
+
         userdata_path = Path(args.userdata_dir)
         lib_appargs.set_arg_bool('NO_CUDA', args.no_cuda)
 
@@ -24,8 +28,213 @@ def main():
     p = run_subparsers.add_parser('FaceFilterLive')
     p.add_argument('--userdata-dir', default=None, action=fixPathAction, help="Workspace directory.")
     p.add_argument('--no-cuda', action="store_true", default=False, help="Disable CUDA.")
+    p.add_argument('--import-profile', action="store_true", default=False, help="Report import time per module of the host process and exit.")
+    p.add_argument('--import-profile-top', type=int, default=30, help="Number of the slowest modules to report.")
     p.set_defaults(func=run_FaceFilterLive)
 
+    bench_parser = subparsers.add_parser( "bench", help="Run benchmarks.")
+    bench_subparsers = bench_parser.add_subparsers()
+
+    def bench_PspEditor(args):
+        import time
+        import numpy as np
+        from xlib.onnxruntime import get_cpu_device_info
+
+        t = time.perf_counter()
+        if args.backend == 'onnx':
+            from modelhub.onnx import PspEditor
+            editor = PspEditor(get_cpu_device_info())
+        else:
+            from modelhub.pytorch.psp import PspEditor
+            editor = PspEditor(get_cpu_device_info(), num_threads=args.num_threads)
+        startup_time = time.perf_counter()-t
+
+        img = np.random.randint(0, 256, (PspEditor.resolution, PspEditor.resolution, 3), dtype=np.uint8)
+        edits = {'goatee' : 10, 'smile' : 10, 'age' : 1.0}
+
+        faces = [img]*args.faces
+
+        editor.run_batch(faces, edits) # warmup
+        timings = []
+        for _ in range(args.iterations):
+            t = time.perf_counter()
+            editor.run_batch(faces, edits)
+            timings.append(time.perf_counter()-t)
+        timings = np.array(timings)*1000
+        print(f'PspEditor.run_batch CPU [{args.backend}] {args.faces} face(s): mean {timings.mean():.1f}ms, median {np.median(timings):.1f}ms, min {timings.min():.1f}ms, max {timings.max():.1f}ms')
+        print(f'Startup (import + load): {startup_time:.2f}s')
+        try:
+            import resource
+            print(f'Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}Mb')
+        except ImportError:
+            pass
+
+    p = bench_subparsers.add_parser('PspEditor', help="Benchmark PspEditor.run on CPU.")
+    p.add_argument('--backend', choices=['torch', 'onnx'], default='torch', help="Model runtime.")
+    p.add_argument('--iterations', type=int, default=20, help="Number of timed runs.")
+    p.add_argument('--faces', type=int, default=1, help="Number of faces in a batch.")
+    p.add_argument('--num-threads', type=int, default=None, help="Number of CPU threads of torch backend.")
+    p.set_defaults(func=bench_PspEditor)
+
+    def bench_PspEditorModes(args):
+        import time
+        import cv2
+        import numpy as np
+        from modelhub.pytorch.psp import PspEditor, PspPrecision
+        from xlib.onnxruntime import get_cpu_device_info
+
+        if args.image is not None:
+            img = cv2.resize(cv2.imread(args.image), (PspEditor.resolution, PspEditor.resolution))
+        else:
+            img = np.random.randint(0, 256, (PspEditor.resolution, PspEditor.resolution, 3), dtype=np.uint8)
+        edits = {'goatee' : 10, 'smile' : 10, 'age' : 1.0}
+
+        ref_output = None
+        for precision in PspPrecision:
+            for channels_last in [False, True]:
+                editor = PspEditor(get_cpu_device_info(), num_threads=args.num_threads, precision=precision, channels_last=channels_last)
+                output = editor.run(img, edits) # warmup
+                timings = []
+                for _ in range(args.iterations):
+                    t = time.perf_counter()
+                    editor.run(img, edits)
+                    timings.append(time.perf_counter()-t)
+                timings = np.array(timings)*1000
+
+                if ref_output is None:
+                    ref_output = output
+                diff = np.abs(output.astype(np.float32) - ref_output.astype(np.float32))
+                mse = np.square(diff).mean()
+                psnr = 10*np.log10(255.0**2 / mse) if mse != 0 else float('inf')
+                quantized = f', {editor.get_quantized_count()} int8 linear layers' if precision == PspPrecision.DYNAMIC_INT8 else ''
+                print(f'{precision.name:>13} channels_last={channels_last!s:<5}: median {np.median(timings):.1f}ms, vs fp32: MAE {diff.mean():.2f}, PSNR {psnr:.1f}dB{quantized}')
+
+    p = bench_subparsers.add_parser('PspEditorModes', help="Benchmark precision and memory format modes of PspEditor on CPU against fp32.")
+    p.add_argument('--image', default=None, help="Face image, random noise if not specified.")
+    p.add_argument('--iterations', type=int, default=10, help="Number of timed runs per mode.")
+    p.add_argument('--num-threads', type=int, default=None, help="Number of CPU threads.")
+    p.set_defaults(func=bench_PspEditorModes)
+
+    def bench_WarpAffineRoi(args):
+        import time
+        import cv2
+        import numpy as np
+        from xlib import cv as lib_cv
+
+        cv2.setNumThreads(args.num_threads)
+
+        def measure(func):
+            func() # warmup
+            timings = []
+            for _ in range(args.iterations):
+                t = time.perf_counter()
+                func()
+                timings.append(time.perf_counter()-t)
+            return np.median(timings)*1000
+
+        size = args.output_size
+        for H, W in [ (720,1280), (1080,1920), (2160,3840) ]:
+            img = np.random.randint(0, 256, (H, W, 3), dtype=np.uint8)
+            # Rotated and scaled face crop in the middle of the frame
+            s, a = H*0.4 / size, np.pi/12
+            mat = np.float32([ [ np.cos(a)/s, np.sin(a)/s, 0], [ -np.sin(a)/s, np.cos(a)/s, 0] ])
+            mat[:,2] = (size/2, size/2) - mat[:,:2] @ (W/2, H/2)
+
+            for name, interpolation in [ ('nearest', cv2.INTER_NEAREST), ('linear', cv2.INTER_LINEAR), ('cubic', cv2.INTER_CUBIC) ]:
+                full_img = cv2.warpAffine(img, mat, (size, size), flags=interpolation)
+                roi_img = lib_cv.warp_affine_roi(img, mat, (size, size), interpolation=interpolation)
+                diff = np.abs(full_img.astype(np.int32) - roi_img.astype(np.int32))
+
+                full_time = measure(lambda: cv2.warpAffine(img, mat, (size, size), flags=interpolation))
+                roi_time = measure(lambda: lib_cv.warp_affine_roi(img, mat, (size, size), interpolation=interpolation))
+                print(f'{H:>4}p {name:>7}: warpAffine {full_time:.3f}ms, warp_affine_roi {roi_time:.3f}ms, max diff {diff.max()}, diff pixels {np.count_nonzero(diff.max(-1))}')
+
+    p = bench_subparsers.add_parser('WarpAffineRoi', help="Benchmark lib_cv.warp_affine_roi against full frame cv2.warpAffine of a face crop.")
+    p.add_argument('--output-size', type=int, default=256, help="Size of the face crop.")
+    p.add_argument('--iterations', type=int, default=200, help="Number of timed runs per mode.")
+    p.add_argument('--num-threads', type=int, default=1, help="Number of cv2 threads.")
+    p.set_defaults(func=bench_WarpAffineRoi)
+
+    def bench_TemporalFilters(args):
+        import numpy as np
+        from app.backend.BackendBase import (TemporalFilterType,
+                                             create_temporal_filter)
+
+        # Fixed landmark trace of a head in uniform coordinates at 30 fps:
+        # still, fast turn, still, slow drift, still.
+        fps = 30
+        rnd = np.random.RandomState(0)
+        base_pts = rnd.uniform(0.4, 0.6, (1, 68, 2)).astype(np.float32)
+
+        still_1, turn, still_2, drift, still_3 = fps*2, fps//3, fps*2, fps*3, fps*2
+        offsets = np.concatenate([ np.zeros(still_1),
+                                   np.linspace(0, 0.1, turn, endpoint=False),
+                                   np.full(still_2, 0.1),
+                                   0.1 - 0.05*(1-np.cos(np.linspace(0, np.pi, drift, endpoint=False))),
+                                   np.zeros(still_3) ]).astype(np.float32)
+        truth = base_pts[None,...] + offsets[:,None,None,None]
+        noisy = truth + rnd.normal(0, args.noise, truth.shape).astype(np.float32)
+        timestamps = np.arange(len(offsets)) / fps
+
+        moving_mask = offsets != np.concatenate([offsets[:1], offsets[:-1]])
+        # Head is still for at least a second, the filters have settled
+        settled_mask = np.zeros_like(moving_mask)
+        settled_mask[fps:still_1] = settled_mask[still_1+turn+fps:still_1+turn+still_2] = settled_mask[-still_3+fps:] = True
+        turn_end = still_1+turn
+
+        # Pixels of 1080p frame
+        px = 1080
+
+        print(f'Trace: {len(offsets)} frames at {fps} fps, 68 points, noise {args.noise*px:.1f}px at 1080p')
+        print(f'{"filter":>9} {"smooth":>6}  {"jitter":>8} {"motion rmse":>11} {"turn lag":>9}')
+        for temporal_smoothing in args.smoothing:
+            for filter_type in TemporalFilterType:
+                temporal_filter = create_temporal_filter(filter_type, temporal_smoothing)
+                history = []
+                outputs = []
+                for pts, timestamp in zip(noisy, timestamps):
+                    if temporal_filter is not None:
+                        outputs.append(temporal_filter.step(pts, timestamp))
+                    else:
+                        # Box average of the last temporal_smoothing samples
+                        history = (history + [pts])[-temporal_smoothing:]
+                        outputs.append(np.mean(history, 0))
+                outputs = np.float32(outputs)
+
+                # Jitter: RMS frame-to-frame movement of the output while the head is still
+                steps = np.linalg.norm(outputs[1:]-outputs[:-1], axis=-1).mean(axis=(1,2))
+                jitter = np.sqrt(np.square(steps[settled_mask[1:]]).mean())
+
+                # Error to the true trace while the head moves
+                errors = np.linalg.norm(outputs-truth, axis=-1).mean(axis=(1,2))
+                motion_rmse = np.sqrt(np.square(errors[moving_mask]).mean())
+
+                # Lag: frames after the end of the fast turn until the output is within twice the noise level
+                settled = np.nonzero(errors[turn_end:] < 2*args.noise)[0]
+                turn_lag = f'{settled[0]}' if len(settled) != 0 else 'n/a'
+
+                print(f'{filter_type.name:>9} {temporal_smoothing:>6}  {jitter*px:6.2f}px {motion_rmse*px:9.2f}px {turn_lag:>9}')
+
+    p = bench_subparsers.add_parser('TemporalFilters', help="Measure lag versus jitter of temporal filters of face rects and landmarks on a fixed trace.")
+    p.add_argument('--noise', type=float, default=0.002, help="Std of the landmark noise in uniform coordinates.")
+    p.add_argument('--smoothing', type=int, nargs='+', default=[1, 3, 5, 10], help="Values of temporal smoothing.")
+    p.set_defaults(func=bench_TemporalFilters)
+
+    export_parser = subparsers.add_parser( "export", help="Export models.")
+    export_subparsers = export_parser.add_subparsers()
+
+    def export_PspEditor(args):
+        from modelhub import onnx as onnx_models
+        from modelhub.pytorch.psp import PspEditor
+        from xlib.onnxruntime import get_cpu_device_info
+
+        print('Exporting PspEditor to ONNX.')
+        PspEditor(get_cpu_device_info()).export_onnx(onnx_models.PspEditor.get_encoder_path(),
+                                                     onnx_models.PspEditor.get_decoder_path())
+
+    p = export_subparsers.add_parser('PspEditor', help="Export pSp encoder and decoder to ONNX for FaceModifier.")
+    p.set_defaults(func=export_PspEditor)
+
     def bad_args(arguments):
         parser.print_help()
         exit(0)
@@ -34,6 +243,37 @@ def main():
     args = parser.parse_args()
     args.func(args)
 
+def import_profile(module_name, top=30, target_time=1.0):
+    """
+    imports the module in a fresh interpreter with -X importtime
+    and prints the slowest modules by cumulative import time
+    """
+    import subprocess
+    import sys
+
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+                          cwd=Path(__file__).parent, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    # Lines are 'import time: self [us] | cumulative | imported package'
+    records = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2]
+        records.append( (cumulative_us, self_us, name.strip(), (len(name) - len(name.lstrip())) // 2 ) )
+
+    if proc.returncode != 0:
+        print(proc.stderr.splitlines()[-1] if len(proc.stderr) != 0 else f'import {module_name} failed.')
+
+    total_time = sum(cumulative_us for cumulative_us, _, _, level in records if level == 0) / 1e6
+    print(f'{"cumulative":>12} {"self":>10}  module')
+    for cumulative_us, self_us, name, level in sorted(records, reverse=True)[:top]:
+        print(f'{cumulative_us/1000:10.1f}ms {self_us/1000:8.1f}ms  {name}')
+    print(f'Total import time of {module_name}: {total_time:.2f}s (target {target_time:.2f}s)')
+
 class fixPathAction(argparse.Action):
     def __call__(self, parser, namespace, values, option_string=None):
         setattr(namespace, self.dest, os.path.abspath(os.path.expanduser(values)))
@@ -0,0 +1,109 @@
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from xlib.onnxruntime import (InferenceSession_with_device, ORTDeviceInfo,
+                              get_available_devices_info)
+
+
+class PspEditor:
+    """
+    pSp encoder + StyleGAN decoder face editor, exported to ONNX
+    with modelhub.pytorch.psp.PspEditor.export_onnx()
+
+    Edit channels and age scale are inputs of the decoder graph,
+    so changing of edits does not require re-export.
+
+    arguments
+
+     device_info    ORTDeviceInfo
+
+        use PspEditor.get_available_devices()
+        to determine a list of avaliable devices accepted by model
+
+    raises
+     Exception
+    """
+    # resolution of input and output images
+    resolution = 256
+    # supported resolutions of output images
+    resolutions = [256]
+
+    @staticmethod
+    def get_available_devices() -> List[ORTDeviceInfo]:
+        return get_available_devices_info()
+
+    @staticmethod
+    def get_encoder_path() -> Path: return Path(__file__).parent / 'PspEditor_encoder.onnx'
+    @staticmethod
+    def get_decoder_path() -> Path: return Path(__file__).parent / 'PspEditor_decoder.onnx'
+
+    def __init__(self, device_info : ORTDeviceInfo):
+        if device_info not in PspEditor.get_available_devices():
+            raise Exception(f'device_info {device_info} is not in available devices for PspEditor')
+
+        encoder_path = PspEditor.get_encoder_path()
+        decoder_path = PspEditor.get_decoder_path()
+        for path in [encoder_path, decoder_path]:
+            if not path.exists():
+                raise FileNotFoundError(f'{path} not found')
+
+        self._enc_sess = InferenceSession_with_device(str(encoder_path), device_info)
+        self._dec_sess = dec_sess = InferenceSession_with_device(str(decoder_path), device_info)
+
+        # names of edits in order of edit_scales input
+        self._edit_names = dec_sess.get_modelmeta().custom_metadata_map['edit_names'].split(',')
+        self._edit_scales = np.zeros( (len(self._edit_names),), np.float32)
+
+    def encode_batch(self, inps) -> List[np.ndarray]:
+        """
+        run the encoder for all inputs as one batch
+
+            inps    list of uint8 HWC BGR images
+                    or already normalized float32 CHW RGB images in range [-1..1]
+
+        returns list of latent codes of the faces
+        """
+        inp = np.stack([ 2*inp[...,::-1].astype(np.float32).transpose(2,0,1)/255 - 1 if inp.dtype == np.uint8 else inp
+                         for inp in inps ]).astype(np.float32, copy=False)
+        latents = self._enc_sess.run(None, {'image': inp})[0]
+        return [ latents[i:i+1] for i in range(latents.shape[0]) ]
+
+    def decode_batch(self, latents : List[np.ndarray], edits, resolution : int = None) -> List[np.ndarray]:
+        """
+        run the decoder with edits for all latents as one batch
+
+            latents     list of latent codes from .encode_batch()
+
+            edits       dict of edit name -> scale, same for all faces
+
+            resolution(None)    one of PspEditor.resolutions, None - PspEditor.resolution
+
+        returns list of uint8 HWC BGR images
+        """
+        if resolution is not None and resolution not in PspEditor.resolutions:
+            raise ValueError(f'resolution {resolution} is not in {PspEditor.resolutions}')
+
+        edit_scales = self._edit_scales
+        for i, name in enumerate(self._edit_names):
+            edit_scales[i] = edits.get(name, 0)
+        age_scale = np.array([edits.get("age", 0)], np.float32)
+
+        output = self._dec_sess.run(None, {'latent': np.concatenate(latents), 'edit_scales': edit_scales, 'age_scale': age_scale})[0]
+        output = ( (np.clip(output, -1, 1) + 1) * 127.5 ).transpose(0,2,3,1)[...,::-1]
+        return list(output.astype(np.uint8, order='C'))
+
+    def run_batch(self, faces, edits) -> List[np.ndarray]:
+        """
+            faces   list of uint8 HWC BGR images
+                    or already normalized float32 CHW RGB images in range [-1..1]
+
+            edits   dict of edit name -> scale, same for all faces
+
+        returns list of uint8 HWC BGR images
+        """
+        return self.decode_batch(self.encode_batch(faces), edits)
+
+    def encode(self, inp) -> np.ndarray: return self.encode_batch([inp])[0]
+    def decode(self, latent : np.ndarray, edits) -> np.ndarray: return self.decode_batch([latent], edits)[0]
+    def run(self, inp, edits) -> np.ndarray: return self.run_batch([inp], edits)[0]
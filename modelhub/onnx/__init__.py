@@ -1,4 +1,5 @@
 from .FaceMesh.FaceMesh import FaceMesh
 from .Fan2d.Fan2d import Fan2d
+from .PspEditor.PspEditor import PspEditor
 from .S3FD.S3FD import S3FD
 from .YoloV5Face.YoloV5Face import YoloV5Face
\ No newline at end of file
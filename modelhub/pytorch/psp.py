@@ -1,34 +1,170 @@
+import contextlib
+import multiprocessing
+import sys
+from enum import IntEnum
 from pathlib import Path
-import torch
+from typing import List
+
 import numpy as np
-import sys
+import torch
+from xlib.onnxruntime import ORTDeviceInfo, get_available_devices_info
+
 sys.path.append("psp")
 import editor
 
 
+class PspPrecision(IntEnum):
+    FP32 = 0
+    BF16_AUTOCAST = 1
+    DYNAMIC_INT8 = 2
+
+PspPrecisionNames = ['fp32', 'bf16 autocast', 'dynamic int8']
+
 class PspEditor():
-    def __init__(self) -> None:
+    """
+    pSp encoder + StyleGAN decoder face editor.
+
+    arguments
+
+     device_info    ORTDeviceInfo
+
+        use PspEditor.get_available_devices()
+        to determine a list of avaliable devices accepted by model
+
+     num_threads(None)  number of intra-op threads on CPU device,
+                        None - number of logical cores
+
+     precision(FP32)    PspPrecision
+                        BF16_AUTOCAST   run under bfloat16 autocast
+                        DYNAMIC_INT8    int8 dynamic quantization of linear layers, CPU only
+
+     channels_last(False)   use channels_last memory format for convolutions
+
+    raises
+     Exception
+    """
+    # resolution of input and output images
+    resolution = 256
+    # supported resolutions of output images
+    resolutions = [128, 256]
+
+    @staticmethod
+    def get_available_devices() -> List[ORTDeviceInfo]:
+        """
+        CPU and CUDA devices which are visible to both onnxruntime and torch
+        """
+        cuda_count = torch.cuda.device_count() if torch.cuda.is_available() else 0
+        return [ device for device in get_available_devices_info()
+                 if device.is_cpu() or (device.get_execution_provider() == 'CUDAExecutionProvider' and device.get_index() < cuda_count) ]
+
+    def __init__(self, device_info : ORTDeviceInfo, num_threads : int = None,
+                       precision : PspPrecision = PspPrecision.FP32, channels_last : bool = False) -> None:
         super().__init__()
+        if device_info not in PspEditor.get_available_devices():
+            raise Exception(f'device_info {device_info} is not in available devices for PspEditor')
+
+        if device_info.is_cpu():
+            self._device = torch.device('cpu')
+            torch.set_num_threads(num_threads if num_threads is not None else multiprocessing.cpu_count())
+            try:
+                # the whole graph is a single sequential chain, inter-op parallelism gives nothing
+                torch.set_interop_threads(1)
+            except RuntimeError:
+                # can be set only once per process, before any parallel work
+                pass
+        else:
+            self._device = torch.device('cuda', device_info.get_index())
+            torch.cuda.set_device(self._device)
+            if precision == PspPrecision.DYNAMIC_INT8:
+                raise Exception('DYNAMIC_INT8 precision is supported only on CPU device.')
+        self._precision = precision
+        self._quantized_count = 0
+        self._memory_format = torch.channels_last if channels_last else torch.contiguous_format
+
         checkpoint_path = Path(__file__).parent / "psp_ffhq_encode.pt"
         encoder, decoder, latent_avg = editor.load_model(checkpoint_path)
+        encoder = encoder.to(self._device, memory_format=self._memory_format).eval()
+        decoder = decoder.to(self._device, memory_format=self._memory_format).eval()
+        latent_avg = latent_avg.to(self._device)
+
+        if precision == PspPrecision.DYNAMIC_INT8:
+            # Before manipulate_model, because quantization replaces the modules.
+            # Linear layers of pSp and StyleGAN2 are EqualLinear which calls F.linear,
+            # quantize_dynamic replaces only nn.Linear, so they are converted first.
+            encoder, decoder = [ torch.quantization.quantize_dynamic(_convert_equal_linear(model), {torch.nn.Linear}, dtype=torch.qint8)
+                                 for model in [encoder, decoder] ]
+            quantized_count = self._quantized_count = sum( isinstance(module, torch.nn.quantized.dynamic.Linear)
+                                   for model in [encoder, decoder] for module in model.modules() )
+            if quantized_count == 0:
+                raise Exception('DYNAMIC_INT8 precision: no linear layers are quantized.')
 
         manipulator = editor.manipulate_model(decoder)
         manipulator.edits = {editor.idx_dict[v[0]]: {v[1]: 0} for k, v in editor.edits.items()}
 
+        # Constant edit tensors live on the device, moved once
         age_path = Path(__file__).parent / "age.pt"
-        self.age_edit = torch.load(age_path)
-        
+        self.age_edit = torch.load(age_path, map_location=self._device)
+
         self.model = {
             "encoder": encoder,
             "decoder": decoder,
             "latent_avg": latent_avg,
             "manipulator": manipulator,
         }
+        self._face_pool = torch.nn.AdaptiveAvgPool2d((PspEditor.resolution, PspEditor.resolution))
+
+    def get_device(self) -> torch.device:
+        return self._device
+
+    def get_precision(self) -> PspPrecision:
+        return self._precision
+
+    def get_quantized_count(self) -> int:
+        """returns number of linear layers quantized to int8 in DYNAMIC_INT8 precision"""
+        return self._quantized_count
+
+    def _autocast(self):
+        if self._precision == PspPrecision.BF16_AUTOCAST:
+            return torch.autocast(device_type=self._device.type, dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
+    def encode_batch(self, inps) -> List[torch.Tensor]:
+        """
+        run the encoder for all inputs as one batch
+
+            inps    list of uint8 HWC BGR images
+                    or already normalized float32 CHW RGB images in range [-1..1]
+
+        returns list of latent codes of the faces on the device
+        """
+        inp = np.stack([ _to_model_input(inp) for inp in inps ])
+
+        with torch.inference_mode(), self._autocast():
+            inp = torch.from_numpy(inp).to(self._device).contiguous(memory_format=self._memory_format)
+            latents = self.model["encoder"](inp).float() + self.model["latent_avg"]
+        return list(latents.split(1))
+
+    def decode_batch(self, latents : List[torch.Tensor], edits, resolution : int = None) -> List[np.ndarray]:
+        """
+        run the decoder with edits for all latents as one batch
+
+            latents     list of latent codes from .encode_batch()
+
+            edits       dict of edit name -> scale, same for all faces
 
-    def run(self, inp, edits):
+            resolution(None)    one of PspEditor.resolutions, None - PspEditor.resolution
+                                Lower resolution skips the finest layers of the decoder,
+                                the output lacks high-frequency details.
+
+        returns list of uint8 HWC BGR images
+        """
+        if resolution is None:
+            resolution = PspEditor.resolution
+        if resolution not in PspEditor.resolutions:
+            raise ValueError(f'resolution {resolution} is not in {PspEditor.resolutions}')
 
         # age is a different type of edit to the others
-        age_scale = edits.pop("age")
+        age_scale = edits.get("age", 0)
 
         manipulator = self.model["manipulator"]
         for k, v in editor.edits.items():
@@ -36,16 +172,157 @@ class PspEditor():
             conv_name = editor.idx_dict[layer_index]
             manipulator.edits[conv_name][channel_index] = edits.get(k, 0)*sense
 
+        with torch.inference_mode(), self._autocast():
+            latent = torch.cat(latents)
+            latent = latent + age_scale*self.age_edit
+            if resolution == PspEditor.resolution:
+                output, _ = self.model["decoder"]([latent], input_is_latent=True, randomize_noise=False)
+                output = self._face_pool(output.float())
+            else:
+                output = _synthesize(self.model["decoder"], latent, resolution).float()
+            output = ( (output.clamp(-1, 1) + 1) * 127.5 ).permute(0,2,3,1).cpu().numpy()
+        output = output[...,::-1].astype(np.uint8, order='C')
+        return list(output)
+
+    def run_batch(self, faces, edits) -> List[np.ndarray]:
+        """
+            faces   list of uint8 HWC BGR images
+                    or already normalized float32 CHW RGB images in range [-1..1]
+
+            edits   dict of edit name -> scale, same for all faces
+
+        returns list of uint8 HWC BGR images
+        """
+        return self.decode_batch(self.encode_batch(faces), edits)
+
+    def encode(self, inp) -> torch.Tensor: return self.encode_batch([inp])[0]
+    def decode(self, latent : torch.Tensor, edits) -> np.ndarray: return self.decode_batch([latent], edits)[0]
+    def run(self, inp, edits) -> np.ndarray: return self.run_batch([inp], edits)[0]
+
+    def export_onnx(self, encoder_path, decoder_path, opset_version=13):
+        """
+        export the encoder and the manipulated decoder to ONNX
+        for modelhub.onnx.PspEditor
+
+        Edit scales and age scale become inputs of the decoder graph,
+        names of edits are stored in 'edit_names' metadata of the decoder.
+        """
+        import onnx
+
+        res = PspEditor.resolution
+        edit_names = list(editor.edits.keys())
+
+        encoder = _PspEncoder(self.model["encoder"], self.model["latent_avg"])
+        decoder = _PspDecoderWithEdits(self.model["decoder"], self.model["manipulator"], self.age_edit, self._face_pool)
+
+        with torch.no_grad():
+            image = torch.zeros( (1,3,res,res), device=self._device)
+            torch.onnx.export(encoder, (image,), str(encoder_path),
+                              input_names=['image'], output_names=['latent'], opset_version=opset_version,
+                              dynamic_axes={'image' : {0 : 'N'}, 'latent' : {0 : 'N'}})
+
+            latent = encoder(image)
+            edit_scales = torch.zeros( (len(edit_names),), device=self._device)
+            age_scale = torch.zeros( (1,), device=self._device)
+            torch.onnx.export(decoder, (latent, edit_scales, age_scale), str(decoder_path),
+                              input_names=['latent', 'edit_scales', 'age_scale'], output_names=['image'], opset_version=opset_version,
+                              dynamic_axes={'latent' : {0 : 'N'}, 'image' : {0 : 'N'}})
+
+        model = onnx.load(str(decoder_path))
+        meta = model.metadata_props.add()
+        meta.key, meta.value = 'edit_names', ','.join(edit_names)
+        onnx.save(model, str(decoder_path))
+
+
+def _to_model_input(inp : np.ndarray) -> np.ndarray:
+    """
+    uint8 HWC BGR image -> float32 CHW RGB [-1..1], float32 input is passed as is
+    """
+    if inp.dtype == np.uint8:
         inp = 2*inp[...,::-1].astype(np.float32).transpose(2,0,1)/255 - 1
-        inp = torch.tensor(inp.copy())
-        output = editor.run(
-            self.model["encoder"],
-            self.model["decoder"],
-            self.model["latent_avg"],
-            inp,
-            edit=age_scale*self.age_edit.to("cuda"),
-            output_pil=False,
-            input_is_pil=False,
-            )
-        output = np.ascontiguousarray(output[...,::-1]).astype(np.uint8)
-        return output
\ No newline at end of file
+    return inp
+
+class _FusedLeakyReLU(torch.nn.Module):
+    """
+    activation of EqualLinear(activation='fused_lrelu') with the bias already added by nn.Linear
+    """
+    def __init__(self, negative_slope=0.2, scale=2**0.5):
+        super().__init__()
+        self.negative_slope = negative_slope
+        self.scale = scale
+
+    def forward(self, x):
+        return torch.nn.functional.leaky_relu(x, self.negative_slope) * self.scale
+
+def _convert_equal_linear(model : torch.nn.Module) -> torch.nn.Module:
+    """
+    replaces EqualLinear modules of the model in place with nn.Linear
+    with the equalized learning rate scale folded into weight and bias,
+    so they can be processed by torch.quantization
+
+    returns the model
+    """
+    for name, child in model.named_children():
+        if type(child).__name__ == 'EqualLinear':
+            out_dim, in_dim = child.weight.shape
+            linear = torch.nn.Linear(in_dim, out_dim, bias=child.bias is not None).to(child.weight.device)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight * child.scale)
+                if child.bias is not None:
+                    linear.bias.copy_(child.bias * child.lr_mul)
+
+            if child.activation:
+                linear = torch.nn.Sequential(linear, _FusedLeakyReLU())
+            setattr(model, name, linear.eval())
+        else:
+            _convert_equal_linear(child)
+    return model
+
+def _synthesize(decoder, latent : torch.Tensor, resolution : int) -> torch.Tensor:
+    """
+    runs the StyleGAN2 generator with W+ latent and constant noise
+    up to the skip output of the given resolution.
+
+    Same as decoder([latent], input_is_latent=True, randomize_noise=False),
+    but the layers above the resolution are not computed.
+    """
+    noise = [ getattr(decoder.noises, f'noise_{i}') for i in range(decoder.num_layers) ]
+
+    out = decoder.input(latent)
+    out = decoder.conv1(out, latent[:, 0], noise=noise[0])
+    skip = decoder.to_rgb1(out, latent[:, 1])
+
+    i = 1
+    for conv1, conv2, noise1, noise2, to_rgb in zip(decoder.convs[::2], decoder.convs[1::2], noise[1::2], noise[2::2], decoder.to_rgbs):
+        if skip.shape[-1] >= resolution:
+            break
+        out = conv1(out, latent[:, i], noise=noise1)
+        out = conv2(out, latent[:, i + 1], noise=noise2)
+        skip = to_rgb(out, latent[:, i + 2], skip)
+        i += 2
+    return skip
+
+class _PspEncoder(torch.nn.Module):
+    def __init__(self, encoder, latent_avg):
+        super().__init__()
+        self.encoder = encoder
+        self.register_buffer('latent_avg', latent_avg)
+
+    def forward(self, image):
+        return self.encoder(image) + self.latent_avg
+
+class _PspDecoderWithEdits(torch.nn.Module):
+    def __init__(self, decoder, manipulator, age_edit, face_pool):
+        super().__init__()
+        self.decoder = decoder
+        self.manipulator = manipulator
+        self.face_pool = face_pool
+        self.register_buffer('age_edit', age_edit)
+
+    def forward(self, latent, edit_scales, age_scale):
+        # Edits are traced as tensors from the inputs instead of constants
+        for i, (layer_index, channel_index, sense) in enumerate(editor.edits.values()):
+            self.manipulator.edits[editor.idx_dict[layer_index]][channel_index] = edit_scales[i]*sense
+
+        output, _ = self.decoder([latent + age_scale*self.age_edit], input_is_latent=True, randomize_noise=False)
+        return self.face_pool(output)
@@ -0,0 +1,80 @@
+import http.client
+import socket
+import time
+
+import cv2
+import numpy as np
+from xlib.net import FrameStreamServer
+
+
+def _wait_clients(server, count, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while server.get_clients_count() != count:
+        assert time.perf_counter() < deadline, 'clients are not connected'
+        time.sleep(0.01)
+
+def _recv_http_jpeg(response):
+    """returns the first JPEG part of MJPEG multipart stream"""
+    assert response.readline().strip() == b'--frame'
+    content_length = None
+    while True:
+        line = response.readline().strip()
+        if len(line) == 0:
+            break
+        name, value = line.split(b':', 1)
+        if name.lower() == b'content-length':
+            content_length = int(value)
+    assert content_length is not None
+    return response.read(content_length)
+
+def test_tcp_and_http_clients():
+    server = FrameStreamServer(host='127.0.0.1', http_port=0, tcp_port=0)
+    try:
+        (_, http_port), (_, tcp_port) = server.get_server_addresses()
+
+        tcp_sock = socket.create_connection(('127.0.0.1', tcp_port), timeout=5.0)
+        http_conn = http.client.HTTPConnection('127.0.0.1', http_port, timeout=5.0)
+        http_conn.request('GET', '/')
+        http_response = http_conn.getresponse()
+        assert http_response.status == 200
+        assert http_response.getheader('Content-Type').startswith('multipart/x-mixed-replace')
+
+        _wait_clients(server, 2)
+
+        img = np.zeros( (48,64,3), np.uint8)
+        img[:, :32] = (255, 0, 0)
+        img[:, 32:] = (0, 0, 255)
+        server.publish(img, frame_num=7, timestamp=123.5)
+
+        result = FrameStreamServer.recv_frame(tcp_sock)
+        assert result is not None
+        tcp_img, frame_num, timestamp = result
+        assert frame_num == 7 and timestamp == 123.5
+        assert tcp_img.shape == img.shape
+        assert np.abs(tcp_img.astype(np.int32) - img).mean() < 4
+
+        http_img = cv2.imdecode(np.frombuffer(_recv_http_jpeg(http_response), np.uint8), cv2.IMREAD_COLOR)
+        assert http_img.shape == img.shape
+        assert np.abs(http_img.astype(np.int32) - img).mean() < 4
+
+        tcp_sock.close()
+        http_conn.close()
+    finally:
+        server.close()
+
+def test_tcp_raw_client():
+    server = FrameStreamServer(host='127.0.0.1', tcp_port=0, tcp_raw=True)
+    try:
+        (_, tcp_port), = server.get_server_addresses()
+        tcp_sock = socket.create_connection(('127.0.0.1', tcp_port), timeout=5.0)
+        _wait_clients(server, 1)
+
+        img = np.random.RandomState(0).randint(0, 256, (48,64,3), dtype=np.uint8)
+        server.publish(img, frame_num=1)
+
+        tcp_img, frame_num, _ = FrameStreamServer.recv_frame(tcp_sock)
+        assert frame_num == 1
+        assert np.array_equal(tcp_img, img)
+        tcp_sock.close()
+    finally:
+        server.close()
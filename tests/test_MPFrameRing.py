@@ -0,0 +1,110 @@
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import numpy as np
+from xlib.mp import MPFrameRing
+
+_repo_path = Path(__file__).parent.parent
+
+_reader_code = """
+import sys
+from xlib.mp import MPFrameRing
+
+ring = MPFrameRing.open(sys.argv[1])
+frame_nums = []
+while True:
+    result = ring.read_next(timeout=2.0)
+    if result is None:
+        break
+    img, frame_num, _ = result
+    if not (img == frame_num).all():
+        raise Exception(f'Torn frame {frame_num}')
+    frame_nums.append(frame_num)
+    if frame_num == int(sys.argv[2])-1:
+        break
+ring.close()
+print(' '.join(str(frame_num) for frame_num in frame_nums))
+"""
+
+def _check_frame_nums(stdout, count):
+    # Frames can be skipped if the reader is slow, but never reordered or lost at the end
+    frame_nums = [ int(x) for x in stdout.split() ]
+    assert len(frame_nums) >= count // 2, frame_nums
+    assert all( a < b for a, b in zip(frame_nums[:-1], frame_nums[1:]) ), frame_nums
+    assert frame_nums[-1] == count-1, frame_nums
+
+def _write_frames(ring, count):
+    for frame_num in range(count):
+        ring.write(np.full( (64,64,3), frame_num, np.uint8), frame_num)
+        time.sleep(0.005)
+
+def test_unrelated_reader_process():
+    # Reader with its own resource tracker must not unlink the ring at exit
+    name = 'test_MPFrameRing_unrelated'
+    count = 50
+    ring = MPFrameRing.create(name, slot_size=64*64*3)
+    try:
+        reader = subprocess.Popen([sys.executable, '-c', _reader_code, name, str(count)], cwd=_repo_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        time.sleep(1.0)
+        _write_frames(ring, count)
+        stdout, stderr = reader.communicate(timeout=60)
+        assert reader.returncode == 0, stderr
+        _check_frame_nums(stdout, count)
+
+        ring2 = MPFrameRing.open(name)
+        assert ring2 is not None
+        ring2.close()
+    finally:
+        ring.close()
+
+def test_child_reader_process(tmp_path):
+    # Reader spawned by the writer shares its resource tracker,
+    # unlink of the writer must not be reported by the tracker
+    code = textwrap.dedent(f"""
+    import multiprocessing, sys, time
+    import numpy as np
+    sys.path.insert(0, {str(_repo_path)!r})
+    from xlib.mp import MPFrameRing
+
+    def reader_proc(name, count, result_queue):
+        ring = MPFrameRing.open(name)
+        frame_nums = []
+        while True:
+            r = ring.read_next(timeout=2.0)
+            if r is None:
+                break
+            img, frame_num, _ = r
+            if not (img == frame_num).all():
+                raise Exception(f'Torn frame {{frame_num}}')
+            frame_nums.append(frame_num)
+            if frame_num == count-1:
+                break
+        ring.close()
+        result_queue.put(frame_nums)
+
+    if __name__ == '__main__':
+        multiprocessing.set_start_method('spawn', force=True)
+        ring = MPFrameRing.create('test_MPFrameRing_child', slot_size=64*64*3)
+        result_queue = multiprocessing.Queue()
+        p = multiprocessing.Process(target=reader_proc, args=('test_MPFrameRing_child', 50, result_queue))
+        p.start()
+        time.sleep(1.0)
+        for frame_num in range(50):
+            ring.write(np.full( (64,64,3), frame_num, np.uint8), frame_num)
+            time.sleep(0.005)
+        frame_nums = result_queue.get(timeout=10.0)
+        p.join()
+        ring.close()
+        print(' '.join(str(frame_num) for frame_num in frame_nums))
+    """)
+    # Spawned child imports the main module, so it must be a file
+    script_path = tmp_path / 'writer.py'
+    script_path.write_text(code)
+    proc = subprocess.run([sys.executable, str(script_path)], cwd=_repo_path, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    _check_frame_nums(proc.stdout, 50)
+    assert 'KeyError' not in proc.stderr, proc.stderr
+    assert 'leaked' not in proc.stderr, proc.stderr
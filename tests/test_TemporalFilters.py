@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from xlib.math import KalmanFilter, OneEuroFilter
+
+_fps = 30
+_noise = 0.002
+
+def _make_trace():
+    """
+    returns (truth, noisy) landmark traces of shape (frames, faces, points, 2) in uniform coordinates:
+    2 faces of 68 points are still for 2 sec, turn by 0.1 in 1/3 sec, are still for 2 sec
+    """
+    rnd = np.random.RandomState(0)
+    base_pts = rnd.uniform(0.3, 0.7, (2, 68, 2)).astype(np.float32)
+    offsets = np.concatenate([ np.zeros(_fps*2), np.linspace(0, 0.1, _fps//3, endpoint=False), np.full(_fps*2, 0.1) ]).astype(np.float32)
+    truth = base_pts[None,...] + offsets[:,None,None,None]
+    noisy = truth + rnd.normal(0, _noise, truth.shape).astype(np.float32)
+    return truth, noisy
+
+def _box_average(noisy, N):
+    """previous temporal smoothing of FaceDetector and FaceMarker: average of the last N samples"""
+    return np.float32([ noisy[max(0, i-N+1):i+1].mean(0) for i in range(len(noisy)) ])
+
+def _run_filter(temporal_filter, noisy):
+    return np.float32([ temporal_filter.step(pts, i / _fps) for i, pts in enumerate(noisy) ])
+
+def _measure(outputs, truth):
+    """
+    returns (jitter, lag) in frames
+
+     jitter     RMS frame-to-frame movement of output after the points are still for 1 sec,
+                relative to the noise
+
+     lag        RMS error to the truth during the turn and 5 frames after it,
+                relative to the movement per frame of the turn
+    """
+    turn_begin, turn_end = _fps*2, _fps*2 + _fps//3
+    still = np.r_[ _fps:turn_begin, turn_end+_fps:len(truth) ]
+
+    steps = np.linalg.norm(outputs[1:]-outputs[:-1], axis=-1).mean(axis=(1,2))
+    jitter = np.sqrt(np.square(steps[still-1]).mean()) / _noise
+
+    errors = np.linalg.norm(outputs-truth, axis=-1).mean(axis=(1,2))
+    turn_step = 0.1 / (turn_end-turn_begin)
+    lag = np.sqrt(np.square(errors[turn_begin:turn_end+5]).mean()) / turn_step
+    return jitter, lag
+
+@pytest.mark.parametrize('filter_cls, filter_kwargs, box_N', [ (OneEuroFilter, dict(min_cutoff=1.0, beta=10.0), 5),
+                                                               (KalmanFilter, dict(process_noise=1.0, measurement_noise=0.008**2), 3) ])
+def test_lag_vs_jitter(filter_cls, filter_kwargs, box_N):
+    # Filter has less lag than the box average of N samples with the same or less jitter
+    truth, noisy = _make_trace()
+
+    box_jitter, box_lag = _measure(_box_average(noisy, box_N), truth)
+    jitter, lag = _measure(_run_filter(filter_cls(**filter_kwargs), noisy), truth)
+
+    assert jitter <= box_jitter, (jitter, box_jitter)
+    assert lag < box_lag*0.9, (lag, box_lag)
+
+@pytest.mark.parametrize('filter_cls', [OneEuroFilter, KalmanFilter])
+def test_shape_and_reset(filter_cls):
+    temporal_filter = filter_cls()
+    assert temporal_filter.get_shape() is None
+    assert temporal_filter.get_output() is None
+
+    x = np.random.RandomState(0).uniform(0, 1, (2, 68, 2)).astype(np.float64)
+
+    # First sample is returned as is, as float32 of the same shape
+    out = temporal_filter.step(x, 0.0)
+    assert out.dtype == np.float32 and out.shape == x.shape
+    assert np.allclose(out, x)
+    assert temporal_filter.get_shape() == x.shape
+
+    # Returned value is a copy of the state
+    out[...] = 0
+    assert np.allclose(temporal_filter.get_output(), x)
+
+    out = temporal_filter.step(x + 0.01, 1 / _fps)
+    assert out.shape == x.shape
+    assert np.all(out > x) and np.all(out <= x + 0.01 + 1e-6)
+
+    # Different number of faces resets the state
+    y = x[:1] + 0.5
+    out = temporal_filter.step(y, 2 / _fps)
+    assert out.shape == y.shape
+    assert np.allclose(out, y)
+    assert temporal_filter.get_shape() == y.shape
+
+    temporal_filter.reset()
+    assert temporal_filter.get_shape() is None
+    assert temporal_filter.get_output() is None
+    assert np.allclose(temporal_filter.step(x, 3 / _fps), x)
@@ -0,0 +1,98 @@
+import threading
+import time
+from datetime import datetime
+from typing import Tuple, Union
+
+import cv2
+import numpy as np
+
+
+class VideoCaptureThread:
+    """
+    Continuously grabs frames of cv2.VideoCapture in a background thread
+    and keeps only the newest one, so the frames never become stale in the driver buffer.
+
+    The frame which is replaced before it is taken by .get_frame() is counted as dropped.
+
+    cv2.VideoCapture is not thread-safe,
+    use .get(), .set() and .is_opened() of this class while the thread is running.
+
+     vcap   opened cv2.VideoCapture, it is not released by .close()
+    """
+
+    def __init__(self, vcap : cv2.VideoCapture):
+        self._vcap = vcap
+        self._vcap_lock = threading.Lock()
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._grabbed_count = 0
+        self._dropped_count = 0
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._proc, daemon=True)
+        self._thread.start()
+
+    def get(self, prop_id : int) -> float:
+        with self._vcap_lock:
+            return self._vcap.get(prop_id)
+
+    def set(self, prop_id : int, value) -> bool:
+        with self._vcap_lock:
+            return self._vcap.set(prop_id, value)
+
+    def is_opened(self) -> bool:
+        with self._vcap_lock:
+            return self._vcap.isOpened()
+
+    def get_grabbed_count(self) -> int:
+        """returns number of grabbed frames"""
+        return self._grabbed_count
+
+    def get_dropped_count(self) -> int:
+        """returns number of grabbed frames which were replaced by newer ones before being taken"""
+        return self._dropped_count
+
+    def get_frame(self, timeout : float = 0) -> Union[Tuple[np.ndarray, float], None]:
+        """
+        take the newest frame
+
+         timeout(0)     time to wait for a new frame
+
+        returns (image, timestamp of the grab) or None if there is no new frame
+        """
+        with self._cond:
+            if self._frame is None and timeout != 0:
+                self._cond.wait_for(lambda: self._frame is not None or self._closed, timeout=timeout)
+            frame, self._frame = self._frame, None
+            return frame
+
+    def close(self):
+        """stop the thread"""
+        if not self._closed:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join()
+
+    def _proc(self):
+        vcap, vcap_lock = self._vcap, self._vcap_lock
+        while not self._closed:
+            with vcap_lock:
+                # grab() returns as soon as the frame is captured, decoding is done by retrieve()
+                ret = vcap.grab()
+                timestamp = datetime.now().timestamp()
+                if ret:
+                    ret, img = vcap.retrieve()
+
+            if not ret:
+                # Device is disconnected or not ready yet
+                time.sleep(0.005)
+                continue
+
+            with self._cond:
+                self._grabbed_count += 1
+                if self._frame is not None:
+                    self._dropped_count += 1
+                self._frame = (img, timestamp)
+                self._cond.notify_all()
@@ -1 +1,2 @@
-from .cv import imread, imwrite
+from .cv import imread, imwrite, warp_affine_roi
+from .VideoCaptureThread import VideoCaptureThread
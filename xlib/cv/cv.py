@@ -37,3 +37,55 @@ def imwrite(filepath, img, *args):
                 stream.write( buf )
         except:
             pass
+
+def warp_affine_roi(img : np.ndarray, mat : np.ndarray, out_size, interpolation=cv2.INTER_LINEAR) -> np.ndarray:
+    """
+    same as cv2.warpAffine(img, mat, out_size, flags=interpolation) with constant zero border,
+    but touches only the region of img that is covered by the output rect.
+
+    The output rect is projected back to img, the bounding box of the projection
+    (expanded by the interpolation kernel margin) is sliced from img,
+    and the mat is shifted by the integer slice origin.
+    The shift changes floating point rounding of the sample positions,
+    thus the result of interpolating modes is the same up to +-1 on a small fraction of pixels.
+    INTER_NEAREST would pick a neighbouring source pixel there,
+    so it is warped from the full img and matches cv2.warpAffine exactly.
+
+     mat            (2,3) matrix to transform img space to output space
+
+     out_size       (W,H)
+
+     interpolation(cv2.INTER_LINEAR)    cv2.INTER_*
+    """
+    out_w, out_h = out_size
+    H, W = img.shape[0:2]
+
+    if interpolation == cv2.INTER_NEAREST:
+        return cv2.warpAffine(img, mat, (out_w, out_h), flags=interpolation, borderMode=cv2.BORDER_CONSTANT)
+
+    mat = np.float64(mat)
+    inv_mat = cv2.invertAffineTransform(mat)
+
+    # Output rect corners in img space
+    pts = np.float64([ (0,0), (out_w,0), (out_w,out_h), (0,out_h) ])
+    pts = pts @ inv_mat[:,:2].T + inv_mat[:,2]
+
+    # Kernel margin of the interpolation
+    margin = 4 if interpolation == cv2.INTER_CUBIC else \
+             8 if interpolation == cv2.INTER_LANCZOS4 else 2
+
+    l = max(0, int(np.floor(pts[:,0].min())) - margin)
+    t = max(0, int(np.floor(pts[:,1].min())) - margin)
+    r = min(W, int(np.ceil(pts[:,0].max())) + margin + 1)
+    b = min(H, int(np.ceil(pts[:,1].max())) + margin + 1)
+
+    if l >= r or t >= b:
+        # Output rect is fully outside of img
+        return np.zeros( (out_h, out_w) + img.shape[2:], dtype=img.dtype)
+
+    if l != 0 or t != 0 or r != W or b != H:
+        img = img[t:b, l:r]
+        # Shift inverted mat to slice origin. Offsets are integers, so sample positions are not changed.
+        inv_mat[:,2] -= (l, t)
+
+    return cv2.warpAffine(img, inv_mat, (out_w, out_h), flags=interpolation | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_CONSTANT)
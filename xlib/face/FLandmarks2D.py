@@ -4,6 +4,8 @@ import cv2
 import numpy as np
 import numpy.linalg as npla
 
+from .. import cv as lib_cv
+from .. import math as lib_math
 from ..math import Affine2DMat, Affine2DUniMat
 from .ELandmarks2D import ELandmarks2D
 from .FRect import FRect
@@ -163,8 +165,8 @@ class FLandmarks2D(IState):
             src_lmrks = lmrks
             dst_lmrks = uni_landmarks_468
             if exclude_moving_parts:
-                src_lmrks = np.delete(src_lmrks, landmarks_468_moving_parts_indexes, 0)
-                dst_lmrks = np.delete(dst_lmrks, landmarks_468_moving_parts_indexes, 0)
+                src_lmrks = src_lmrks[landmarks_468_static_parts_indexes]
+                dst_lmrks = uni_landmarks_468_static_parts
 
             mat = Affine2DMat.umeyama(src_lmrks, dst_lmrks)
         else:
@@ -204,13 +206,79 @@ class FLandmarks2D(IState):
         return mat, uni_mat
 
 
+    @staticmethod
+    def calc_cut_batch(ulmrks : np.ndarray, h_w, coverage : float, output_size : int,
+                       exclude_moving_parts : bool = False,
+                       head_yaw : np.ndarray = None,
+                       x_offset : float = 0, y_offset : float = 0):
+        """
+        Batched calc_cut() for all L468 faces of a frame.
+
+            ulmrks      (F,468,2) uniform L468 landmarks
+
+            head_yaw(None)  (F,) yaw radian values, or None
+
+        returns
+             mats,      (F,2,3) matrices to transform img space to face_image space
+             uni_mats   (F,2,3) matrices to transform uniform img space to uniform face_image space
+        """
+        h,w = h_w
+        ulmrks = np.asarray(ulmrks, np.float32)
+        if ulmrks.ndim != 3 or ulmrks.shape[1:] != (468,2):
+            raise ValueError('ulmrks must have (F,468,2) shape')
+        F = ulmrks.shape[0]
+
+        lmrks = ulmrks * np.float32((w,h))
+
+        if exclude_moving_parts:
+            mat = lib_math.umeyama_2D_batch(lmrks[:,landmarks_468_static_parts_indexes], uni_landmarks_468_static_parts)
+        else:
+            mat = lib_math.umeyama_2D_batch(lmrks, uni_landmarks_468)
+
+        # get corner points in global space
+        inv_mat = lib_math.affine_2D_invert_batch(mat)
+        g_p = np.einsum('pk,fjk->fpj', _uni_cut_pts, inv_mat[:,:,:2]) + inv_mat[:,None,:,2]
+        g_c = g_p[:,4]
+
+        # calc diagonal vectors between corners in global space
+        tb_diag_vec = g_p[:,2]-g_p[:,0]
+        tb_diag_vec /= npla.norm(tb_diag_vec, axis=-1, keepdims=True)
+        bt_diag_vec = g_p[:,1]-g_p[:,3]
+        bt_diag_vec /= npla.norm(bt_diag_vec, axis=-1, keepdims=True)
+
+        # calc modifier of diagonal vectors for coverage value
+        mod = npla.norm(g_p[:,0]-g_p[:,2], axis=-1, keepdims=True)*(coverage*0.5)
+
+        x_offset = np.full( (F,1), x_offset, np.float64)
+        if head_yaw is not None:
+            # Damp near zero
+            head_yaw = np.asarray(head_yaw, np.float64).reshape( (F,1) )
+            x_offset += -(head_yaw * np.abs(np.tanh(head_yaw*2)) ) * 0.5
+
+        # adjust vertical offset to cover more forehead
+        h_vec = g_p[:,1]-g_p[:,0]
+        v_vec = g_p[:,3]-g_p[:,0]
+
+        g_c = g_c + h_vec*x_offset + v_vec*y_offset
+
+        l_t = np.stack( [ g_c - tb_diag_vec*mod,
+                          g_c + bt_diag_vec*mod,
+                          g_c + tb_diag_vec*mod ], 1 ).astype(np.float32)
+
+        # calc affine transform from 3 global space points to 3 local space points size of 'output_size'
+        mats     = lib_math.affine_2D_from_3_pairs_batch( l_t, np.float32(( (0,0),(output_size,0),(output_size,output_size) )) ).astype(np.float32)
+        uni_mats = lib_math.affine_2D_from_3_pairs_batch( l_t / np.float32((w,h)), np.float32(( (0,0),(1,0),(1,1) )) ).astype(np.float32)
+
+        return mats, uni_mats
+
     def cut(self, img : np.ndarray,
                   coverage : float,
                   output_size : int,
                   exclude_moving_parts : bool = False,
                   head_yaw : float = None,
                   x_offset : float = 0,
-                  y_offset : float = 0) -> Tuple[np.ndarray, Affine2DUniMat]:
+                  y_offset : float = 0,
+                  interpolation = cv2.INTER_LINEAR) -> Tuple[np.ndarray, Affine2DUniMat]:
         """
         Cut the face to square of output_size from img using landmarks with given parameters
 
@@ -229,6 +297,8 @@ class FLandmarks2D(IState):
             x_offset
             y_offset    float   uniform x/y offset
 
+            interpolation(cv2.INTER_LINEAR)    cv2.INTER_* flag
+
         returns face_image,
                 uni_mat         uniform affine matrix to transform uniform img space to uniform face_image space
         """
@@ -236,7 +306,7 @@ class FLandmarks2D(IState):
 
         mat, uni_mat = self.calc_cut( (h,w), coverage, output_size, exclude_moving_parts, head_yaw=head_yaw, x_offset=x_offset, y_offset=y_offset)
 
-        face_image = cv2.warpAffine(img, mat, (output_size, output_size), cv2.INTER_CUBIC )
+        face_image = lib_cv.warp_affine_roi(img, mat, (output_size, output_size), interpolation=interpolation)
         return face_image, uni_mat
 
     def draw(self, img : np.ndarray, color, radius=1):
@@ -1253,6 +1323,12 @@ uni_landmarks_468 = np.array(
        [ 0.8624742 ,  0.2089644 ],
        [ 0.8855709 ,  0.20027623]], dtype=np.float32)
 
+# Precomputed once: landmarks and templates without moving parts
+landmarks_468_static_parts_indexes = np.setdiff1d(np.arange(468), landmarks_468_moving_parts_indexes)
+uni_landmarks_468_static_parts = uni_landmarks_468[landmarks_468_static_parts_indexes]
+
+_uni_cut_pts = np.float64([(0,0),(1,0),(1,1),(0,1),(0.5,0.5)])
+
 
 # import numpy as np
 # import cv2
@@ -6,6 +6,7 @@ import cv2
 import numpy as np
 import numpy.linalg as npla
 
+from .. import cv as lib_cv
 from .. import math as lib_math
 from ..math import Affine2DMat, Affine2DUniMat
 from .IState import IState
@@ -174,10 +175,12 @@ class FRect(IState):
 
         return FRect.from_4pts(pts)
 
-    def cut(self, img : np.ndarray, coverage : float, output_size : int) -> Tuple[Affine2DMat, Affine2DUniMat]:
+    def cut(self, img : np.ndarray, coverage : float, output_size : int, interpolation=cv2.INTER_LINEAR) -> Tuple[Affine2DMat, Affine2DUniMat]:
         """
         Cut the face to square of output_size from img with given coverage using this rect
 
+            interpolation(cv2.INTER_LINEAR)    cv2.INTER_* flag
+
         returns image,
                 uni_mat     uniform matrix to transform uniform img space to uniform cutted space
         """
@@ -209,7 +212,7 @@ class FRect(IState):
         mat     = Affine2DMat.from_3_pairs ( l_t, np.float32(( (0,0),(output_size,0),(output_size,output_size) )))
         uni_mat = Affine2DUniMat.from_3_pairs ( (l_t/(w,h)).astype(np.float32), np.float32(( (0,0),(1,0),(1,1) )) )
 
-        face_image = cv2.warpAffine(img, mat, (output_size, output_size), cv2.INTER_CUBIC )
+        face_image = lib_cv.warp_affine_roi(img, mat, (output_size, output_size), interpolation=interpolation)
         return face_image, uni_mat
 
 
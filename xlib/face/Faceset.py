@@ -4,7 +4,6 @@ from pathlib import Path
 from typing import Generator, Iterable, List, Union
 
 import cv2
-import h5py
 import numpy as np
 
 from .. import console as lib_con
@@ -63,6 +62,8 @@ class Faceset:
 
     def _open(self):
         if self._f is None:
+            # h5py is heavy, import it only when faceset is really opened
+            import h5py
             self._f = f = h5py.File(self._path, mode=self._mode)
             self._UFaceMark_grp = f.require_group('UFaceMark')
             self._UImage_grp = f.require_group('UImage')
@@ -96,14 +97,14 @@ class Faceset:
         tmp_path.rename(self._path)
         self._open()
 
-    def _group_copy(self, group_dst : h5py.Group, group_src : h5py.Group, verbose=True):
+    def _group_copy(self, group_dst : 'h5py.Group', group_src : 'h5py.Group', verbose=True):
         for key, value in lib_con.progress_bar_iterator(group_src.items(), desc=f'Copying {group_src.name} -> {group_dst.name}', suppress_print=not verbose):
             d = group_dst.create_dataset(key, shape=value.shape, dtype=value.dtype )
             d[:] = value[:]
             for a_key, a_value in value.attrs.items():
                 d.attrs[a_key] = a_value
 
-    def _group_read_bytes(self, group : h5py.Group, key : str, check_key=True) -> Union[bytes, None]:
+    def _group_read_bytes(self, group : 'h5py.Group', key : str, check_key=True) -> Union[bytes, None]:
         if check_key and key not in group:
             return None
         dataset = group[key]
@@ -111,7 +112,7 @@ class Faceset:
         dataset.read_direct(np.frombuffer(data_bytes, dtype=np.uint8))
         return data_bytes
 
-    def _group_write_bytes(self, group : h5py.Group, key : str, data : bytes, update_existing=True) -> Union[h5py.Dataset, None]:
+    def _group_write_bytes(self, group : 'h5py.Group', key : str, data : bytes, update_existing=True) -> Union['h5py.Dataset', None]:
         if key in group:
             if not update_existing:
                 return None
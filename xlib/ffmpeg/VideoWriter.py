@@ -0,0 +1,110 @@
+import queue
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .ffmpeg import run
+
+
+class VideoWriter:
+    """
+    encodes uint8 HWC BGR frames to a video file with persistent ffmpeg process.
+
+    Raw frames are piped to ffmpeg stdin from a writer thread.
+
+     filepath       path of output video file
+
+     width, height  size of frames
+
+     fps            constant frame rate of the video
+
+     codec('libx264')
+
+     crf(18)        constant rate factor of the codec
+
+     max_queue_size(8)  max number of frames waiting to be written,
+                        .write() blocks while the queue is full
+
+    raises
+     Exception      if ffmpeg cannot be started
+    """
+
+    def __init__(self, filepath : Path, width : int, height : int, fps : float, codec='libx264', crf=18, max_queue_size=8):
+        self._width = width
+        self._height = height
+
+        args = ['-y', '-hide_banner', '-loglevel', 'error',
+                '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', f'{fps}', '-i', '-',
+                # yuv420p requires even size
+                '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                '-c:v', codec, '-crf', f'{crf}', '-pix_fmt', 'yuv420p',
+                str(filepath) ]
+
+        self._proc = proc = run(args, pipe_stdin=True)
+        if proc is None:
+            raise Exception('Unable to start ffmpeg.')
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._proc_func, daemon=True)
+        self._thread.start()
+
+    def get_size(self): return (self._width, self._height)
+
+    def get_error(self) -> str:
+        """returns error of the writer or None"""
+        return self._error
+
+    def get_pending_count(self) -> int:
+        """returns number of frames waiting to be written"""
+        return self._queue.qsize()
+
+    def write(self, img : np.ndarray, count=1):
+        """
+        queue uint8 HWC BGR frame of writer's size to be written count times.
+
+        Raw video has no timestamps, thus to keep the constant frame rate
+        the gap frames are the same buffer written again to the pipe,
+        the codec encodes them as skipped blocks.
+
+         img    must not be modified after the call
+        """
+        if self._closed:
+            raise Exception('VideoWriter is closed.')
+
+        H, W, C = img.shape
+        if (W, H) != (self._width, self._height) or C != 3 or img.dtype != np.uint8:
+            raise ValueError(f'Frame must be uint8 {self._width}x{self._height}x3')
+        self._queue.put( (img, count) )
+
+    def close(self):
+        """write all queued frames and finalize the video file"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            try:
+                self._proc.stdin.close()
+            except Exception:
+                pass
+            self._proc.wait()
+
+    def _proc_func(self):
+        stdin = self._proc.stdin
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if self._error is not None:
+                continue
+
+            img, count = job
+            try:
+                buf = img.data if img.flags.c_contiguous else np.ascontiguousarray(img).data
+                for _ in range(count):
+                    stdin.write(buf)
+            except Exception as e:
+                # ffmpeg has exited, the rest frames are skipped
+                self._error = f'ffmpeg error: {e}'
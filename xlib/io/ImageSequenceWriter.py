@@ -0,0 +1,158 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import cv2
+import numpy as np
+
+
+class ImageSequenceWriter:
+    """
+    writes images as numbered files in background.
+
+    Images are encoded in a pool of threads (cv2.imencode releases the GIL),
+    files are written by a writer thread in order of .write() calls.
+
+     max_queue_size(8)  max number of images waiting to be written,
+                        .write() blocks while the queue is full
+
+     num_workers(None)  number of encoding threads, None - number of logical cores
+
+     file_ext('.jpg')
+
+     encode_args(None)  args of cv2.imencode
+    """
+
+    def __init__(self, max_queue_size=8, num_workers=None, file_ext='.jpg', encode_args=None):
+        self._file_ext = file_ext
+        self._encode_args = encode_args if encode_args is not None else []
+
+        self._executor = ThreadPoolExecutor(max_workers=num_workers if num_workers is not None else multiprocessing.cpu_count())
+        self._queue = queue.Queue(maxsize=max_queue_size)
+
+        self._stats_lock = threading.Lock()
+        self._written_count = 0
+        self._blocked_count = 0
+        self._blocked_time = 0.0
+        self._failed_count = 0
+        self._error = None
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._proc, daemon=True)
+        self._thread.start()
+
+    def write(self, dir_path : Path, frame_nums : List[int], img : np.ndarray):
+        """
+        queue the image to be written once as the first frame num,
+        the rest frame nums are written as hard links to the first file,
+        or as copies of the encoded bytes if links are not supported.
+
+         img    uint8 image, must not be modified after the call
+        """
+        if self._closed:
+            raise Exception('ImageSequenceWriter is closed.')
+        if len(frame_nums) == 0:
+            return
+
+        future = self._executor.submit(cv2.imencode, self._file_ext, img, self._encode_args)
+        job = (Path(dir_path), frame_nums, future)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            # Backpressure: the caller waits for the writer
+            t = time.perf_counter()
+            self._queue.put(job)
+            with self._stats_lock:
+                self._blocked_count += 1
+                self._blocked_time += time.perf_counter() - t
+
+    def get_error(self) -> str:
+        """returns the last error of writing or None"""
+        return self._error
+
+    def get_pending_count(self) -> int:
+        """returns number of images waiting to be written"""
+        return self._queue.qsize()
+
+    def get_stats(self) -> dict:
+        """
+        returns dict of
+
+         pending        number of images waiting to be written
+         written        number of written images
+         failed         number of images failed to be encoded or written
+         error          last error or None
+         blocked        number of .write() calls blocked by full queue
+         blocked_time   total time of blocking in seconds
+        """
+        with self._stats_lock:
+            return {'pending'      : self._queue.qsize(),
+                    'written'      : self._written_count,
+                    'failed'       : self._failed_count,
+                    'error'        : self._error,
+                    'blocked'      : self._blocked_count,
+                    'blocked_time' : self._blocked_time }
+
+    def flush(self):
+        """wait until all queued images are written"""
+        self._queue.join()
+
+    def close(self):
+        """flush and stop the writer"""
+        if not self._closed:
+            self._closed = True
+            self.flush()
+            self._queue.put(None)
+            self._thread.join()
+            self._executor.shutdown()
+
+    def _proc(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                break
+
+            dir_path, frame_nums, future = job
+            error = None
+            try:
+                ret, buf = future.result()
+                if ret:
+                    self._write_files(dir_path, frame_nums, buf)
+                else:
+                    error = f'Unable to encode the image {frame_nums[0]:06}{self._file_ext}'
+            except Exception as e:
+                error = f'ImageSequenceWriter error: {e}'
+
+            with self._stats_lock:
+                if error is None:
+                    self._written_count += 1
+                else:
+                    self._failed_count += 1
+                    self._error = error
+            self._queue.task_done()
+
+    def _write_files(self, dir_path : Path, frame_nums : List[int], buf : np.ndarray):
+        file_ext = self._file_ext
+
+        first_path = None
+        for n in frame_nums:
+            filepath = dir_path / f'{n:06}{file_ext}'
+            if first_path is not None:
+                try:
+                    if filepath.exists():
+                        filepath.unlink()
+                    os.link(first_path, filepath)
+                    continue
+                except OSError:
+                    pass
+
+            with open(filepath, 'wb') as stream:
+                stream.write(buf)
+            if first_path is None:
+                first_path = filepath
@@ -1,2 +1,3 @@
 from .IO import FormattedMemoryViewIO, FormattedFileIO
-from .IOThreadLinesReader import IOThreadLinesReader
\ No newline at end of file
+from .IOThreadLinesReader import IOThreadLinesReader
+from .ImageSequenceWriter import ImageSequenceWriter
\ No newline at end of file
@@ -1,4 +1,4 @@
-from collections import deque
+import bisect
 from datetime import datetime
 
 
@@ -24,9 +24,18 @@ class DelayedBuffers:
         def __init__(self):
             self.new_data = None
 
-    def __init__(self):
-
-        self._buffers = deque()
+    def __init__(self, max_nbytes : int = None):
+        """
+         max_nbytes(None)   budget of the sum of .nbytes of buffered data,
+                            the oldest data is evicted to fit it, the newest is always kept.
+                            None - unlimited
+        """
+        # Sorted by timestamp
+        self._timestamps = []
+        self._datas = []
+        self._nbytes = []
+        self._total_nbytes = 0
+        self._max_nbytes = max_nbytes
         self._target_delay = 0
 
         self._last_ts = datetime.now().timestamp()
@@ -35,25 +44,51 @@ class DelayedBuffers:
         self._avg_delay = 1.0
 
     def _update_avg_frame_delay(self):
-        buffers = self._buffers
-        if len(buffers) >= 2:
-            x = tuple(buffer[0] for buffer in buffers)
-            self._avg_delay = min(1.0, (max(x)-min(x)) / (len(x)-1) )
+        # timestamps are sorted, so the span is the difference of the ends
+        timestamps = self._timestamps
+        if len(timestamps) >= 2:
+            self._avg_delay = min(1.0, (timestamps[-1]-timestamps[0]) / (len(timestamps)-1) )
+
+    def _evict(self, count):
+        """remove count oldest buffers in one batch"""
+        if count > 0:
+            self._total_nbytes -= sum(self._nbytes[:count])
+            del self._timestamps[:count]
+            del self._datas[:count]
+            del self._nbytes[:count]
+            self._update_avg_frame_delay()
 
     def get_avg_delay(self): return self._avg_delay
 
+    def get_buffers_count(self) -> int: return len(self._timestamps)
+    def get_nbytes(self) -> int: return self._total_nbytes
+
+    def set_max_nbytes(self, max_nbytes : int):
+        self._max_nbytes = max_nbytes
+        self._fit_max_nbytes()
+
+    def _fit_max_nbytes(self):
+        max_nbytes = self._max_nbytes
+        if max_nbytes is not None and self._total_nbytes > max_nbytes:
+            nbytes = self._nbytes
+            total_nbytes = self._total_nbytes
+            count = 0
+            while count < len(nbytes)-1 and total_nbytes > max_nbytes:
+                total_nbytes -= nbytes[count]
+                count += 1
+            self._evict(count)
+
     def add_buffer(self, timestamp : float, data):
-        buffers = self._buffers
-        buffers_len = len(buffers)
-        
-        for i in range(buffers_len):
-            if timestamp < buffers[i][0]:
-                buffers.insert( i, (timestamp, data))
-                self._update_avg_frame_delay()
-                return
-        
-        buffers.append( (timestamp, data) )
+        i = bisect.bisect_right(self._timestamps, timestamp)
+        nbytes = getattr(data, 'nbytes', 0)
+
+        self._timestamps.insert(i, timestamp)
+        self._datas.insert(i, data)
+        self._nbytes.insert(i, nbytes)
+        self._total_nbytes += nbytes
+
         self._update_avg_frame_delay()
+        self._fit_max_nbytes()
 
     def set_target_delay(self, target_delay_sec : float):
         self._target_delay = target_delay_sec
@@ -66,39 +101,28 @@ class DelayedBuffers:
         returns DelayedBuffers.ProcessResult()
         """
         result = DelayedBuffers.ProcessResult()
-        buffers = self._buffers
+        timestamps = self._timestamps
         now = datetime.now().timestamp()
 
-        
+
         if now - self._last_ts >= self._avg_delay:
             self._last_ts += self._avg_delay
 
-            if len(buffers) != 0:
-                # Find nearest to target_delay
-                nearest_i = -1
-                nearest_diff = 999999
-                target_delay = self._target_delay
-
-                buffers_to_remove = []
-                for i, buffer in enumerate(buffers):
-                    ts = buffer[0]
-
-                    diff = abs(now - ts - target_delay)
-                    if diff <= nearest_diff:
-                        nearest_i = i
-                        nearest_diff = diff
-                        buffers_to_remove.append(buffer)
-                    else:
-                        break
-                
-                if len(buffers_to_remove) >= 2:
-                    buffers_to_remove.pop(-1)
-                    for buffer in buffers_to_remove:
-                        buffers.remove(buffer)
-                    self._update_avg_frame_delay()
-                
-                if len(buffers) != 0:
-                    _, new_data = buffers[0]
+            if len(timestamps) != 0:
+                # Find nearest to target_delay, the later one on equal distance
+                target_ts = now - self._target_delay
+                i = bisect.bisect_right(timestamps, target_ts)
+                if i == len(timestamps) or \
+                   (i != 0 and target_ts - timestamps[i-1] < timestamps[i] - target_ts):
+                    nearest_i = i-1
+                else:
+                    nearest_i = bisect.bisect_right(timestamps, timestamps[i]) - 1
+
+                # All buffers before the nearest are outdated
+                self._evict(nearest_i)
+
+                if len(timestamps) != 0:
+                    new_data = self._datas[0]
                     if not self._last_data is new_data:
                         self._last_data = new_data
                         result.new_data = new_data
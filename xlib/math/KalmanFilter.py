@@ -0,0 +1,108 @@
+import numpy as np
+
+
+class KalmanFilter:
+    """
+    Constant-velocity Kalman filter.
+
+    Filters arrays of any shape (for example (faces, points, 2)) elementwise,
+    every value is an independent [position, velocity] state.
+    State is kept in buffers allocated once per input shape,
+    the state is reset if the shape of input is changed.
+
+     process_noise(1.0)         spectral density of acceleration (white noise acceleration model)
+
+     measurement_noise(1e-6)    variance of measurement
+
+     freq(30.0)                 sampling frequency in Hz, used if timestamp is not provided
+    """
+
+    def __init__(self, process_noise : float = 1.0, measurement_noise : float = 1e-6, freq : float = 30.0):
+        self._q = process_noise
+        self._r = measurement_noise
+        self._freq = freq
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._v = None
+        self._p00 = None
+        self._p01 = None
+        self._p11 = None
+        self._tmp = None
+        self._k = None
+        self._ts = None
+
+    def get_shape(self):
+        """returns shape of the current state or None"""
+        return self._x.shape if self._x is not None else None
+
+    def get_output(self) -> np.ndarray:
+        """returns copy of the last filtered value or None"""
+        return self._x.copy() if self._x is not None else None
+
+    def step(self, x : np.ndarray, timestamp : float = None) -> np.ndarray:
+        """
+        filter next sample
+
+            x           np.ndarray
+
+            timestamp   sec
+
+        returns filtered copy of x as float32
+        """
+        x = np.asarray(x, np.float32)
+
+        if self._x is None or self._x.shape != x.shape:
+            self._x = x.copy()
+            self._v = np.zeros_like(x)
+            self._p00 = np.full_like(x, self._r)
+            self._p01 = np.zeros_like(x)
+            self._p11 = np.full_like(x, self._r*self._freq**2)
+            self._tmp = np.empty_like(x)
+            self._k = np.empty_like(x)
+            self._ts = timestamp
+            return self._x.copy()
+
+        dt = 1.0 / self._freq
+        if timestamp is not None and self._ts is not None and timestamp > self._ts:
+            dt = timestamp - self._ts
+        self._ts = timestamp
+
+        q, r = self._q, self._r
+        p00, p01, p11, tmp, k = self._p00, self._p01, self._p11, self._tmp, self._k
+
+        # Predict
+        # x = x + v*dt
+        np.multiply(self._v, dt, out=tmp)
+        self._x += tmp
+
+        # P = F P F^T + Q
+        p00 += (2*dt)*p01
+        np.multiply(p11, dt*dt, out=tmp)
+        p00 += tmp
+        p00 += q*dt**4 / 4
+        np.multiply(p11, dt, out=tmp)
+        p01 += tmp
+        p01 += q*dt**3 / 2
+        p11 += q*dt**2
+
+        # Update
+        # S = P00 + r ; K = P[:,0] / S ; y = z - x
+        np.add(p00, r, out=tmp)
+        np.divide(p01, tmp, out=k)
+        np.divide(p00, tmp, out=tmp)
+
+        # P11 -= K1*P01 ; P01 -= K0*P01 ; P00 -= K0*P00
+        p11 -= k*p01
+        p01 -= tmp*p01
+        p00 -= tmp*p00
+
+        # x += K0*y ; v += K1*y
+        y = x - self._x
+        k *= y
+        self._v += k
+        tmp *= y
+        self._x += tmp
+
+        return self._x.copy()
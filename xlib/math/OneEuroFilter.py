@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al., CHI 2012) with speed-adaptive cutoff.
+
+    Low speed -> low cutoff -> less jitter,
+    high speed -> high cutoff -> less lag.
+
+    Filters arrays of any shape (for example (faces, points, 2)) elementwise,
+    speed is measured per point over the last axis.
+    State is kept in buffers allocated once per input shape,
+    the state is reset if the shape of input is changed.
+
+     min_cutoff(1.0)    minimum cutoff frequency in Hz
+
+     beta(0.0)          speed coefficient of cutoff
+
+     d_cutoff(1.0)      cutoff frequency in Hz for the speed
+
+     freq(30.0)         sampling frequency in Hz, used if timestamp is not provided
+    """
+
+    def __init__(self, min_cutoff : float = 1.0, beta : float = 0.0, d_cutoff : float = 1.0, freq : float = 30.0):
+        self._min_cutoff = min_cutoff
+        self._beta = beta
+        self._d_cutoff = d_cutoff
+        self._freq = freq
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._tmp = None
+        self._speed = None
+        self._ts = None
+
+    def get_shape(self):
+        """returns shape of the current state or None"""
+        return self._x.shape if self._x is not None else None
+
+    def get_output(self) -> np.ndarray:
+        """returns copy of the last filtered value or None"""
+        return self._x.copy() if self._x is not None else None
+
+    def step(self, x : np.ndarray, timestamp : float = None) -> np.ndarray:
+        """
+        filter next sample
+
+            x           np.ndarray
+
+            timestamp   sec
+
+        returns filtered copy of x as float32
+        """
+        x = np.asarray(x, np.float32)
+
+        if self._x is None or self._x.shape != x.shape:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            self._tmp = np.empty_like(x)
+            self._speed = np.empty(x.shape[:-1]+(1,), np.float32)
+            self._ts = timestamp
+            return self._x.copy()
+
+        te = 1.0 / self._freq
+        if timestamp is not None and self._ts is not None and timestamp > self._ts:
+            te = timestamp - self._ts
+        self._ts = timestamp
+
+        dx, tmp, speed = self._dx, self._tmp, self._speed
+
+        # dx += (((x - self._x) / te) - dx) * alpha(d_cutoff)
+        np.subtract(x, self._x, out=tmp)
+        tmp /= te
+        tmp -= dx
+        tmp *= _alpha(te, self._d_cutoff)
+        dx += tmp
+
+        # cutoff = min_cutoff + beta*|dx|
+        np.sqrt( np.square(dx).sum(-1, keepdims=True), out=speed)
+        speed *= self._beta
+        speed += self._min_cutoff
+
+        # alpha = 1 / (1 + tau/te) , tau = 1 / (2*pi*cutoff)
+        speed *= 2*math.pi*te
+        np.divide(speed, speed+1, out=speed)
+
+        # x_hat += (x - x_hat) * alpha
+        np.subtract(x, self._x, out=tmp)
+        tmp *= speed
+        self._x += tmp
+
+        return self._x.copy()
+
+def _alpha(te : float, cutoff : float) -> float:
+    r = 2*math.pi*cutoff*te
+    return r / (r + 1)
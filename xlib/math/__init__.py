@@ -1,4 +1,7 @@
 from .Affine2DMat import Affine2DMat, Affine2DUniMat
-from .math_ import (intersect_two_line, polygon_area, rotation_matrix_to_euler,
-                    segment_length, segment_to_vector)
+from .KalmanFilter import KalmanFilter
+from .math_ import (affine_2D_from_3_pairs_batch, affine_2D_invert_batch,
+                    intersect_two_line, polygon_area, rotation_matrix_to_euler,
+                    segment_length, segment_to_vector, umeyama_2D_batch)
 from .nms import nms
+from .OneEuroFilter import OneEuroFilter
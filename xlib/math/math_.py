@@ -60,3 +60,78 @@ def polygon_area(poly : np.ndarray) -> float:
     """
     return float( np.abs(np.sum( poly[:,0] * np.roll( poly[:,1], -1  ) - poly[:,1] * np.roll( poly[:,0], -1  )  ) / 2) )
 
+
+def umeyama_2D_batch(src : np.ndarray, dst : np.ndarray) -> np.ndarray:
+    """
+    Batched 2D similarity transformation estimation with scaling (Umeyama, PAMI 1991).
+
+    Same as Affine2DMat.umeyama(src[i], dst) for every i, but using batched SVD
+    and plain np.ndarray.
+
+        src     (F,N,2)     source coordinates
+
+        dst     (N,2)       destination coordinates shared across the batch
+
+    returns np.ndarray (F,2,3) float64
+    """
+    src = np.asarray(src, np.float64)
+    dst = np.asarray(dst, np.float64)
+    F, N, _ = src.shape
+
+    src_mean = src.mean(axis=1)
+    dst_mean = dst.mean(axis=0)
+
+    src_demean = src - src_mean[:,None,:]
+    dst_demean = dst - dst_mean
+
+    # Eq. (38).
+    A = np.einsum('nj,fnk->fjk', dst_demean, src_demean) / N
+
+    # Eq. (39).
+    d = np.ones( (F,2), dtype=np.float64)
+    d[npla.det(A) < 0, 1] = -1
+
+    U, S, V = npla.svd(A)
+
+    # Eq. (40) and (43).
+    R = np.matmul(U, d[:,:,None]*V)
+
+    # Eq. (41) and (42).
+    scale = (S*d).sum(-1) / src_demean.var(axis=1).sum(-1)
+
+    mats = np.empty( (F,2,3), dtype=np.float64)
+    mats[:,:,:2] = R*scale[:,None,None]
+    mats[:,:,2] = dst_mean - np.einsum('fjk,fk->fj', mats[:,:,:2], src_mean)
+    return mats
+
+def affine_2D_invert_batch(mats : np.ndarray) -> np.ndarray:
+    """
+    Batched inversion of (F,2,3) affine matrices.
+
+    returns np.ndarray (F,2,3)
+    """
+    a, b, c = mats[:,0,0], mats[:,0,1], mats[:,0,2]
+    d, e, f = mats[:,1,0], mats[:,1,1], mats[:,1,2]
+    D = a*e - b*d
+    D = np.divide(1.0, D, out=np.zeros_like(D), where=D != 0.0)
+
+    out = np.empty_like(mats)
+    out[:,0,0], out[:,0,1], out[:,0,2] = e*D, -b*D, (b*f-e*c)*D
+    out[:,1,0], out[:,1,1], out[:,1,2] = -d*D, a*D, (d*c-a*f)*D
+    return out
+
+def affine_2D_from_3_pairs_batch(src_pts : np.ndarray, dst_pts : np.ndarray) -> np.ndarray:
+    """
+    Batched version of cv2.getAffineTransform.
+
+        src_pts     (F,3,2)
+
+        dst_pts     (3,2) or (F,3,2)
+
+    returns np.ndarray (F,2,3)
+    """
+    src_pts = np.asarray(src_pts, np.float64)
+    F = src_pts.shape[0]
+    P = np.concatenate([src_pts, np.ones( (F,3,1), np.float64)], -1)
+    Q = np.broadcast_to(np.asarray(dst_pts, np.float64), (F,3,2))
+    return npla.solve(P, Q).transpose(0,2,1)
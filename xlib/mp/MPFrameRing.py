@@ -0,0 +1,240 @@
+import os
+import struct
+import sys
+import time
+from enum import IntEnum
+from multiprocessing import resource_tracker, shared_memory
+from typing import Tuple, Union
+
+import numpy as np
+
+
+class MPFrameRing:
+    """
+    Named shared memory ring of raw frames,
+    single writer process, any number of reader processes,
+    readers do not need to be spawned from the writer.
+
+    Create the ring in the writer process
+
+        ring = MPFrameRing.create('name', slot_size=1920*1080*3)
+        ring.write(img, frame_num, timestamp)
+
+    open it in any local process
+
+        ring = MPFrameRing.open('name')
+        result = ring.read_next(timeout=1.0)
+        if result is not None:
+            img, frame_num, timestamp = result
+
+    Layout of the memory
+
+        header      magic, closed flag, slot count, slot size, write id, resource tracker id of the writer
+        slots       slot header: seq_begin, frame num, timestamp, width, height, format, data size, seq_end
+                    frame data
+
+    Each slot is a seqlock: the writer sets seq_begin before the data and seq_end after,
+    the reader validates that both are equal to the id it reads, so torn frames are never returned.
+    """
+
+    class Format(IntEnum):
+        BGR24 = 0
+        BGRA32 = 1
+        GRAY8 = 2
+
+    _format_channels = {Format.BGR24 : 3, Format.BGRA32 : 4, Format.GRAY8 : 1}
+
+    _MAGIC = b'FRMRING2'
+    # magic, closed, slot_count, slot_size, write_id, tracker_id
+    _header_fmt = '=8sIIQQQ'
+    _header_size = 64
+    _write_id_offset = struct.calcsize('=8sIIQ')
+    # seq_begin, frame_num, timestamp, width, height, format, data_size, seq_end
+    _slot_header_fmt = '=QqdIIIQQ'
+    _slot_header_size = 64
+
+    @staticmethod
+    def create(name : str, slot_size : int, slot_count : int = 4) -> 'MPFrameRing':
+        """
+        create the ring for writing, existing ring with the same name is replaced
+
+         slot_size      max size of frame data in bytes
+        """
+        try:
+            old_shm = shared_memory.SharedMemory(name=name)
+            old_shm.close()
+            old_shm.unlink()
+        except FileNotFoundError:
+            pass
+
+        slot_size = slot_size + (-slot_size & 63)
+        size = MPFrameRing._header_size + slot_count*(MPFrameRing._slot_header_size + slot_size)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        struct.pack_into(MPFrameRing._header_fmt, shm.buf, 0, MPFrameRing._MAGIC, 0, slot_count, slot_size, 0, _get_resource_tracker_id())
+        return MPFrameRing(shm, is_writer=True)
+
+    @staticmethod
+    def open(name : str) -> Union['MPFrameRing', None]:
+        """
+        open existing ring for reading, returns None if the ring does not exist
+        """
+        try:
+            if sys.version_info >= (3,13):
+                shm = shared_memory.SharedMemory(name=name, track=False)
+            else:
+                shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            return None
+
+        if bytes(shm.buf[0:8]) != MPFrameRing._MAGIC:
+            shm.close()
+            return None
+
+        if sys.version_info < (3,13):
+            # Attaching registers the memory in the resource tracker, which unlinks it at exit,
+            # but the reader must not unlink it. A process shares the tracker with its
+            # multiprocessing children, in this case the registration belongs to the writer.
+            *_, tracker_id = struct.unpack_from(MPFrameRing._header_fmt, shm.buf, 0)
+            if tracker_id == 0 or tracker_id != _get_resource_tracker_id():
+                try:
+                    resource_tracker.unregister(shm._name, 'shared_memory')
+                except Exception:
+                    pass
+
+        return MPFrameRing(shm, is_writer=False)
+
+    def __init__(self, shm : shared_memory.SharedMemory, is_writer : bool):
+        self._shm = shm
+        self._is_writer = is_writer
+        self._name = shm.name
+        _, _, self._slot_count, self._slot_size, _, _ = struct.unpack_from(MPFrameRing._header_fmt, shm.buf, 0)
+        self._mv_write_id = shm.buf[MPFrameRing._write_id_offset:MPFrameRing._write_id_offset+8].cast('Q')
+        self._read_id = self._mv_write_id[0]
+
+    def __del__(self):
+        self.close()
+
+    def get_name(self) -> str: return self._name
+    def get_slot_size(self) -> int: return self._slot_size
+    def get_write_id(self) -> int: return self._mv_write_id[0]
+
+    def is_closed(self) -> bool:
+        """returns True if the writer has closed the ring, reader should reopen it"""
+        return self._shm is None or struct.unpack_from('=I', self._shm.buf, 8)[0] != 0
+
+    def close(self):
+        shm = self._shm
+        if shm is not None:
+            if self._is_writer:
+                struct.pack_into('=I', shm.buf, 8, 1)
+            self._mv_write_id.release()
+            self._shm = None
+            shm.close()
+            if self._is_writer:
+                shm.unlink()
+
+    def _get_slot_offset(self, id) -> int:
+        return MPFrameRing._header_size + (id % self._slot_count)*(MPFrameRing._slot_header_size + self._slot_size)
+
+    def write(self, img : np.ndarray, frame_num : int = 0, timestamp : float = None):
+        """
+        write uint8 HW/HWC image of BGR24, BGRA32 or GRAY8 format
+
+        raises
+         ValueError     if image does not fit slot_size or has unsupported format
+        """
+        if img.dtype != np.uint8:
+            raise ValueError('img must be uint8')
+
+        C = img.shape[2] if img.ndim == 3 else 1
+        fmt = { 3 : MPFrameRing.Format.BGR24, 4 : MPFrameRing.Format.BGRA32, 1 : MPFrameRing.Format.GRAY8 }.get(C, None)
+        if fmt is None:
+            raise ValueError(f'Unsupported number of channels {C}')
+        if img.nbytes > self._slot_size:
+            raise ValueError(f'Image size {img.nbytes} is more than slot size {self._slot_size}')
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        buf = self._shm.buf
+        id = self._mv_write_id[0] + 1
+        offset = self._get_slot_offset(id)
+        data_offset = offset + MPFrameRing._slot_header_size
+        H, W = img.shape[:2]
+
+        struct.pack_into('=Q', buf, offset, id)
+        np.ndarray( img.shape, np.uint8, buffer=buf, offset=data_offset)[...] = img
+        struct.pack_into(MPFrameRing._slot_header_fmt, buf, offset, id, frame_num, timestamp, W, H, fmt, img.nbytes, id)
+        self._mv_write_id[0] = id
+
+    def read_by_id(self, id, copy=True) -> Union[Tuple[np.ndarray, int, float], None]:
+        """
+        returns (image, frame_num, timestamp) of frame with id,
+        or None if the frame is overwritten or not written yet.
+
+         copy(True)     if False, image is a view of the shared memory,
+                        it can be overwritten by the writer after slot_count writes
+        """
+        if self._shm is None or id == 0:
+            return None
+        buf = self._shm.buf
+        offset = self._get_slot_offset(id)
+
+        _, frame_num, timestamp, W, H, fmt, data_size, seq_end = struct.unpack_from(MPFrameRing._slot_header_fmt, buf, offset)
+        if seq_end != id:
+            return None
+
+        C = MPFrameRing._format_channels[fmt]
+        shape = (H, W, C) if C != 1 else (H, W)
+        img = np.ndarray(shape, np.uint8, buffer=buf, offset=offset + MPFrameRing._slot_header_size)
+        if copy:
+            img = img.copy()
+
+        # Validate that the writer did not start to overwrite the slot during the read
+        seq_begin, = struct.unpack_from('=Q', buf, offset)
+        if seq_begin != id:
+            return None
+        return img, frame_num, timestamp
+
+    def read_last(self, copy=True) -> Union[Tuple[np.ndarray, int, float], None]:
+        """
+        returns (image, frame_num, timestamp) of the last written frame or None
+        """
+        return self.read_by_id(self.get_write_id(), copy=copy)
+
+    def read_next(self, timeout : float = 0, copy=True) -> Union[Tuple[np.ndarray, int, float], None]:
+        """
+        returns (image, frame_num, timestamp) of the next frame after the previously read one,
+        skipping frames which are already overwritten,
+        or None if no new frame during timeout
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            write_id = self.get_write_id()
+            # Frames older than slot_count are overwritten
+            read_id = max(self._read_id, write_id - self._slot_count)
+            while read_id < write_id:
+                read_id += 1
+                result = self.read_by_id(read_id, copy=copy)
+                if result is not None:
+                    self._read_id = read_id
+                    return result
+            self._read_id = read_id
+
+            if self.is_closed() or time.perf_counter() >= deadline:
+                return None
+            time.sleep(0.001)
+
+def _get_resource_tracker_id() -> int:
+    """
+    returns id of the resource tracker of this process, 0 if it is not running,
+    the id is the same in the processes which share the tracker
+    """
+    fd = getattr(resource_tracker._resource_tracker, '_fd', None)
+    if fd is None:
+        return 0
+    try:
+        # Inode of the pipe to the tracker, the pipe is inherited by the child processes
+        return os.fstat(fd).st_ino
+    except OSError:
+        return 0
@@ -6,4 +6,5 @@ from .PMPI import PMPI
 from .MPAtomicInt32 import MPAtomicInt32
 from .MPSPSCMRRingData import MPSPSCMRRingData
 from .MPWeakHeap import MPWeakHeap
-from .MPWorker import MPWorker
\ No newline at end of file
+from .MPWorker import MPWorker
+from .MPFrameRing import MPFrameRing
\ No newline at end of file
@@ -0,0 +1,238 @@
+import socket
+import socketserver
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple, Union
+
+import cv2
+import numpy as np
+
+
+class FrameStreamServer:
+    """
+    Serves the stream of frames to network clients.
+
+        http://host:http_port/      MJPEG stream, viewable in a browser or VLC
+
+        host:tcp_port               length-prefixed frames, see .recv_frame()
+
+    Frames are encoded once by a dedicated encode thread and shared by all clients.
+    Every client is served by its own thread with the latest encoded frame,
+    so slow clients skip frames without slowing down the others.
+
+     host('0.0.0.0')
+
+     http_port(None)    None - no HTTP server
+
+     tcp_port(None)     None - no TCP server
+
+     tcp_raw(False)     send raw BGR24 frames instead of JPEG over TCP
+
+     jpeg_quality(90)
+
+    raises
+     OSError    if a port cannot be bound
+    """
+
+    class Format:
+        JPEG = 0
+        BGR24 = 1
+
+    # magic, format, frame_num, timestamp, width, height, data_size
+    _tcp_header_fmt = '<4sIqdIII'
+    _tcp_header_size = struct.calcsize(_tcp_header_fmt)
+    _TCP_MAGIC = b'FRM0'
+
+    def __init__(self, host='0.0.0.0', http_port=None, tcp_port=None, tcp_raw=False, jpeg_quality=90):
+        self._tcp_raw = tcp_raw
+        self._jpeg_quality = jpeg_quality
+
+        self._cond = threading.Condition()
+        self._closed = False
+        self._clients_count = 0
+        self._http_clients_count = 0
+        # Frame waiting to be encoded
+        self._new_frame = None
+        # Latest encoded packet, (id, frame_num, timestamp, width, height, jpeg, raw)
+        self._packet = None
+
+        self._servers = []
+        try:
+            if http_port is not None:
+                self._servers.append( ThreadingHTTPServer((host, http_port), self._make_http_handler()) )
+            if tcp_port is not None:
+                self._servers.append( socketserver.ThreadingTCPServer((host, tcp_port), self._make_tcp_handler()) )
+        except:
+            self.close()
+            raise
+
+        for server in self._servers:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.1}, daemon=True).start()
+
+        self._encode_thread = threading.Thread(target=self._encode_proc, daemon=True)
+        self._encode_thread.start()
+
+    def get_clients_count(self) -> int: return self._clients_count
+
+    def get_server_addresses(self):
+        """returns list of (host, port) of running servers"""
+        return [ server.server_address for server in self._servers ]
+
+    def publish(self, img : np.ndarray, frame_num : int = 0, timestamp : float = None):
+        """
+        publish uint8 HWC BGR frame, does not block.
+        If the encode thread is busy, the previous unencoded frame is replaced.
+
+         img    must not be modified after the call
+        """
+        if self._clients_count == 0:
+            return
+        with self._cond:
+            self._new_frame = (img, frame_num, timestamp if timestamp is not None else time.time())
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+    def _encode_proc(self):
+        packet_id = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self._new_frame is not None)
+                if self._closed:
+                    break
+                (img, frame_num, timestamp), self._new_frame = self._new_frame, None
+
+            H, W = img.shape[:2]
+            jpeg = raw = None
+            if not self._tcp_raw or self._http_clients_count != 0:
+                ret, buf = cv2.imencode('.jpg', img, [int(cv2.IMWRITE_JPEG_QUALITY), self._jpeg_quality])
+                jpeg = buf.tobytes() if ret else None
+            if self._tcp_raw:
+                raw = np.ascontiguousarray(img).tobytes()
+
+            packet_id += 1
+            with self._cond:
+                self._packet = (packet_id, frame_num, timestamp, W, H, jpeg, raw)
+                self._cond.notify_all()
+
+    def _wait_packet(self, last_id):
+        """returns the latest packet newer than last_id or None if closed"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._closed or (self._packet is not None and self._packet[0] != last_id))
+            return None if self._closed else self._packet
+
+    def _serve_client(self, send_func, is_http):
+        with self._cond:
+            self._clients_count += 1
+            if is_http:
+                self._http_clients_count += 1
+        try:
+            last_id = None
+            while True:
+                packet = self._wait_packet(last_id)
+                if packet is None:
+                    break
+                last_id = packet[0]
+                send_func(packet)
+        except (OSError, ValueError):
+            # Client is disconnected
+            pass
+        finally:
+            with self._cond:
+                self._clients_count -= 1
+                if is_http:
+                    self._http_clients_count -= 1
+
+    def _make_http_handler(self):
+        stream_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=frame')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+
+                def send_func(packet):
+                    jpeg = packet[5]
+                    if jpeg is not None:
+                        self.wfile.write(b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n' % len(jpeg))
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b'\r\n')
+                        self.wfile.flush()
+
+                stream_server._serve_client(send_func, is_http=True)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _make_tcp_handler(self):
+        stream_server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sock = self.request
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+                def send_func(packet):
+                    _, frame_num, timestamp, W, H, jpeg, raw = packet
+                    if raw is not None:
+                        fmt, data = FrameStreamServer.Format.BGR24, raw
+                    elif jpeg is not None:
+                        fmt, data = FrameStreamServer.Format.JPEG, jpeg
+                    else:
+                        return
+                    sock.sendall(struct.pack(FrameStreamServer._tcp_header_fmt, FrameStreamServer._TCP_MAGIC,
+                                             fmt, frame_num, timestamp, W, H, len(data)))
+                    sock.sendall(data)
+
+                stream_server._serve_client(send_func, is_http=False)
+
+        return Handler
+
+    @staticmethod
+    def recv_frame(sock : socket.socket) -> Union[Tuple[np.ndarray, int, float], None]:
+        """
+        client side: receive a frame from TCP stream of FrameStreamServer
+
+        returns (uint8 HWC BGR image, frame_num, timestamp) or None if the connection is closed
+        """
+        def recv_exact(size):
+            buf = bytearray(size)
+            mv = memoryview(buf)
+            while size != 0:
+                n = sock.recv_into(mv, size)
+                if n == 0:
+                    return None
+                mv = mv[n:]
+                size -= n
+            return buf
+
+        header = recv_exact(FrameStreamServer._tcp_header_size)
+        if header is None:
+            return None
+        magic, fmt, frame_num, timestamp, W, H, data_size = struct.unpack(FrameStreamServer._tcp_header_fmt, header)
+        if magic != FrameStreamServer._TCP_MAGIC:
+            raise ValueError('Invalid stream.')
+
+        data = recv_exact(data_size)
+        if data is None:
+            return None
+
+        if fmt == FrameStreamServer.Format.BGR24:
+            img = np.frombuffer(data, np.uint8).reshape(H, W, 3)
+        else:
+            img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        return img, frame_num, timestamp
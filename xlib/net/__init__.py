@@ -0,0 +1 @@
+from .FrameStreamServer import FrameStreamServer
\ No newline at end of file
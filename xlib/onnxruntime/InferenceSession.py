@@ -1,5 +1,3 @@
-import onnx
-import onnxruntime as rt
 from io import BytesIO
 from .device import ORTDeviceInfo
 
@@ -12,11 +10,15 @@ def InferenceSession_with_device(onnx_model_or_path, device_info : ORTDeviceInfo
 
     can raise Exception
     """
-
-    if isinstance(onnx_model_or_path, onnx.ModelProto):
-        b = BytesIO()
-        onnx.save(onnx_model_or_path, b)
-        onnx_model_or_path = b.getvalue()
+    # Heavy imports are deferred until the first session is created in the worker process
+    import onnxruntime as rt
+
+    if not isinstance(onnx_model_or_path, (str, bytes)):
+        import onnx
+        if isinstance(onnx_model_or_path, onnx.ModelProto):
+            b = BytesIO()
+            onnx.save(onnx_model_or_path, b)
+            onnx_model_or_path = b.getvalue()
 
     device_ep = device_info.get_execution_provider()
     if device_ep not in rt.get_available_providers():
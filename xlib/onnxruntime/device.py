@@ -3,8 +3,6 @@ import itertools
 import os
 from typing import List
 
-import onnxruntime as rt
-
 from .. import appargs as lib_appargs
 
 
@@ -73,6 +71,9 @@ def get_cpu_device_info() -> ORTDeviceInfo:
 def get_available_devices_info(include_cpu=True, cpu_only=False) -> List[ORTDeviceInfo]:
     """
     returns a list of available ORTDeviceInfo
+
+    Devices are probed on the first call and cached,
+    the result is inherited by subprocesses spawned after the call.
     """
     devices = []
     if not cpu_only: 
@@ -102,6 +103,8 @@ def _initialize_ort_devices_info():
     Using only python ctypes and default lib provided with NVIDIA drivers.
     """
     if int(os.environ.get('ORT_DEVICES_INITIALIZED', 0)) == 0:
+        import onnxruntime as rt
+
         os.environ['ORT_DEVICES_INITIALIZED'] = '1'
         os.environ['ORT_DEVICES_COUNT'] = '0'
 
@@ -184,5 +187,3 @@ def _initialize_ort_devices_info():
             os.environ[f'ORT_DEVICE_{i}_NAME'] = device['name']
             os.environ[f'ORT_DEVICE_{i}_TOTAL_MEM'] = str(device['total_mem'])
             os.environ[f'ORT_DEVICE_{i}_FREE_MEM'] = str(device['free_mem'])
-        
-_initialize_ort_devices_info()
@@ -3,12 +3,14 @@ from typing import Tuple
 
 import numpy as np
 from ..image import ImageProcessor
-from ..python import Disposable
+from ..python import Disposable, LRUCache
 
 
 class FramePlayer(Disposable):
     """
     Base class for players based on fixed number of frames
+
+     cache_max_nbytes   memory budget of the cache of recently got frames
     """
 
     class Frame:
@@ -29,7 +31,7 @@ class FramePlayer(Disposable):
             self.frame_count = None
             self.name = None
 
-    def __init__(self, default_fps, frame_count):
+    def __init__(self, default_fps, frame_count, cache_max_nbytes=256*1024*1024):
         if frame_count == 0:
             raise Exception('Frames count are 0.')
 
@@ -49,8 +51,7 @@ class FramePlayer(Disposable):
         self._req_is_playing = None
         self._req_frame_seek_idx = None
 
-        self._cached_frames = {}
-        self._cached_frames_idxs = []
+        self._cached_frames = LRUCache(max_nbytes=cache_max_nbytes)
 
     def is_playing(self): return self._is_playing
     def get_frame_count(self): return self._frame_count
@@ -108,6 +109,12 @@ class FramePlayer(Disposable):
         """@overridable"""
     def _on_target_width_changed(self):
         """@overridable"""
+    def _on_frame_idx(self, idx):
+        """
+        @overridable
+
+        called on every update of the frame idx, after the frame is taken from the cache or from _on_get_frame()
+        """
 
     def _on_get_frame(self, idx) -> Tuple[np.ndarray, str]:
         """
@@ -227,15 +234,14 @@ class FramePlayer(Disposable):
             # Frame changed, construct Frame() with current values
             _frame_idx = self._frame_idx
             _cached_frames = self._cached_frames
-            _cached_frames_idxs = self._cached_frames_idxs
 
             frame_tuple = _cached_frames.get(_frame_idx, None)
             if frame_tuple is None:
                 frame_tuple = self._on_get_frame(_frame_idx)
-                _cached_frames[_frame_idx] = frame_tuple
-                _cached_frames_idxs.insert(0, _frame_idx)
-                if len(_cached_frames_idxs) > 5:
-                    _cached_frames.pop(_cached_frames_idxs.pop(-1))
+                if frame_tuple[0] is not None:
+                    # Errors are not cached
+                    _cached_frames.put(_frame_idx, frame_tuple, frame_tuple[0].nbytes)
+            self._on_frame_idx(_frame_idx)
 
             frame_image, name_or_err = frame_tuple
 
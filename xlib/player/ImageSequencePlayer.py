@@ -1,3 +1,5 @@
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple
 
@@ -26,6 +28,12 @@ class ImageSequencePlayer(FramePlayer):
 
         target_width(None)  int     if None : resolution will be not modified
 
+        prefetch_count(8)   int     number of next frames in the playback direction
+                                    which are decoded in advance
+
+        num_workers(None)   int     number of decoding threads,
+                                    None - number of logical cores
+
     raises
 
         Exception   path does not exists
@@ -36,7 +44,12 @@ class ImageSequencePlayer(FramePlayer):
     def __init__(self, dir_path,
                         on_error_func=None,
                         on_player_state_func=None,
-                        on_frame_update_func=None):
+                        on_frame_update_func=None,
+                        prefetch_count=8,
+                        num_workers=None):
+        self._executor = None
+        # frame idx -> future of ._read_frame()
+        self._prefetch_futures = {}
 
         dir_path = Path(dir_path)
         if not dir_path.exists():
@@ -55,15 +68,71 @@ class ImageSequencePlayer(FramePlayer):
         self._images_paths = images_paths
         self._dir_path = dir_path
 
+        self._prefetch_count = prefetch_count
+        # cv2.imdecode releases the GIL, so the threads decode in parallel
+        self._executor = ThreadPoolExecutor(max_workers=num_workers if num_workers is not None else multiprocessing.cpu_count())
+        self._last_idx = None
 
-    def _on_get_frame(self, idx) -> Tuple[np.ndarray, str]:
+    def _on_dispose(self):
+        self._cancel_prefetch()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        super()._on_dispose()
+
+    def _cancel_prefetch(self):
+        for future in self._prefetch_futures.values():
+            future.cancel()
+        self._prefetch_futures = {}
+
+    def _read_frame(self, idx) -> Tuple[np.ndarray, str]:
         filepath = self._images_paths[idx]
 
         try:
             img = lib_cv.imread(filepath)
+            if img is None:
+                return None, f'cv2.imread error: unable to decode {filepath.name}'
             return img, filepath.name
         except Exception as e:
             return None, 'cv2.imread error: '+str(e)
 
+    def _prefetch(self, idx, direction):
+        """
+        keep decoding of the next frames after idx in the direction,
+        the rest decodings are cancelled, thus a seek drops the outstanding work
+        """
+        frame_count = self._frame_count
+
+        next_idxs = []
+        for i in range(1, self._prefetch_count+1):
+            next_idx = idx + direction*i
+            if next_idx < 0 or next_idx >= frame_count:
+                if not self._is_autorewind:
+                    break
+                next_idx %= frame_count
+            if next_idx == idx:
+                break
+            next_idxs.append(next_idx)
+
+        futures = self._prefetch_futures
+        for future_idx in list(futures.keys()):
+            if future_idx not in next_idxs:
+                futures.pop(future_idx).cancel()
+
+        for next_idx in next_idxs:
+            if next_idx not in futures and next_idx not in self._cached_frames:
+                futures[next_idx] = self._executor.submit(self._read_frame, next_idx)
 
-
+    def _on_get_frame(self, idx) -> Tuple[np.ndarray, str]:
+        future = self._prefetch_futures.pop(idx, None)
+        if future is not None and not future.cancelled():
+            return future.result()
+        return self._read_frame(idx)
+
+    def _on_frame_idx(self, idx):
+        # Called for cached frames too, so the read-ahead keeps going while playing through the cache.
+        # Playback is forward only, stepping back by one frame continues backward,
+        # any other jump is a seek after which playback is expected
+        last_idx, self._last_idx = self._last_idx, idx
+        direction = -1 if last_idx is not None and idx == last_idx-1 else 1
+        self._prefetch(idx, direction)
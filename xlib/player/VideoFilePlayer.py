@@ -152,6 +152,8 @@ class VideoFilePlayer(FramePlayer):
 
     def _on_target_width_changed(self):
         self._ffmpeg_need_restart = True
+        # Cached frames are decoded with the previous width
+        self._cached_frames.clear()
 
     def _on_get_frame(self, idx) -> Tuple[np.ndarray, str]:
 
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Least recently used cache with a memory budget.
+
+     max_nbytes     budget of the sum of nbytes of all values,
+                    least recently used values are evicted to fit it
+    """
+
+    def __init__(self, max_nbytes : int):
+        self._max_nbytes = max_nbytes
+        self._od = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self): return len(self._od)
+    def __contains__(self, key): return key in self._od
+
+    def get_nbytes(self) -> int:
+        """returns sum of nbytes of all values"""
+        return self._nbytes
+
+    def get_max_nbytes(self) -> int: return self._max_nbytes
+    def set_max_nbytes(self, max_nbytes : int):
+        self._max_nbytes = max_nbytes
+        self._evict()
+
+    def get(self, key, default=None):
+        """
+        returns value and marks it as recently used, or default
+        """
+        item = self._od.get(key, None)
+        if item is None:
+            return default
+        self._od.move_to_end(key)
+        return item[0]
+
+    def put(self, key, value, nbytes : int):
+        """
+        put value with size of nbytes.
+        Value larger than the whole budget is not stored.
+        """
+        item = self._od.pop(key, None)
+        if item is not None:
+            self._nbytes -= item[1]
+
+        if nbytes <= self._max_nbytes:
+            self._od[key] = (value, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+
+    def remove(self, key):
+        item = self._od.pop(key, None)
+        if item is not None:
+            self._nbytes -= item[1]
+
+    def clear(self):
+        self._od.clear()
+        self._nbytes = 0
+
+    def _evict(self):
+        od = self._od
+        while self._nbytes > self._max_nbytes:
+            _, (_, nbytes) = od.popitem(last=False)
+            self._nbytes -= nbytes
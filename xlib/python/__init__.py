@@ -5,6 +5,7 @@ class dotdict(dict):
     __delattr__ = dict.__delitem__
 
 from .EventListener import EventListener
+from .LRUCache import LRUCache
 
 def all_is_not_None(*args): return all(x is not None for x in args)
 def all_is_None(*args): return all(x is None for x in args)